@@ -1,29 +1,387 @@
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from flask_cors import CORS
-import pandas as pd
 import os
+import sys
+import numpy as np
+import pandas as pd
+
+# ✅ 프로젝트 루트 (backend 상위 폴더)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "scripts"))  # processed_store 공용 모듈
+
+from roadkill_dataset import COMPRESSORS, RoadkillDataset, json_records
+from roadkill_hotspots import RoadkillHotspots, to_week_number, week_end_date, week_start_date
+from roadkill_index import to_day_number
+from roadkill_ingest import ReportIngestor
+from roadkill_statistics import RoadkillStatistics
+from region_index import REGIONS_PATH, RegionIndexCache
 
 # Flask 앱 생성
 app = Flask(__name__)
 CORS(app)
 
 # ✅ 프로젝트 루트 기준으로 CSV 파일 경로 지정
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # backend 상위 폴더
 data_path = os.path.join(BASE_DIR, "data", "processed", "roadkill_data.csv")
 
+# ✅ 데이터셋은 한 번만 읽고, 파일이 바뀔 때만 다시 로드 (JSON 본문도 미리 직렬화)
+roadkill_dataset = RoadkillDataset(
+    data_path, encode=lambda records: app.json.dumps(records, separators=(",", ":")) + "\n"
+)
+
+# ✅ 통계 API용 집계 큐브 (데이터셋/결과 테이블이 바뀔 때만 갱신)
+roadkill_statistics = RoadkillStatistics(os.path.dirname(data_path))
+
+# ✅ 격자 × 주 단위 핫스팟 큐브 (데이터셋이 바뀔 때만 갱신, 뒤에 추가된 행만 반영)
+roadkill_hotspots = RoadkillHotspots()
+
+# ✅ 신고 접수 (WAL 기록 후 데이터셋에 바로 반영, 관측소/날씨 매칭과 결과 테이블 반영은 백그라운드)
+report_ingestor = ReportIngestor(
+    roadkill_dataset,
+    processed_dir=os.path.dirname(data_path),
+    roadkill_dir=os.path.join(BASE_DIR, "data", "raw", "roadkill"),
+    stations_path=os.path.join(BASE_DIR, "data", "raw", "weather", "weather_stations.csv"),
+    weather_path=os.path.join(BASE_DIR, "data", "raw", "weather", "weather_data.csv"),
+)
+
+# ✅ 좌표 → 행정구역 인덱스 (경계 파일이 바뀔 때만 다시 구축)
+region_index = RegionIndexCache(REGIONS_PATH)
+
+
+# ✅ 필터/페이지 조회 파라미터
+QUERY_PARAMS = ('bbox', 'start', 'end', 'startDate', 'endDate', 'agency', 'limit', 'offset', 'cursor')
+
+# ✅ 기간 파라미터 (Express API와 같은 startDate/endDate, 같은 뜻으로 start/end도 허용)
+DATE_PARAMS = (('startDate', 'start'), ('endDate', 'end'))
+MAX_PAGE_SIZE = 10000
+NDJSON_CHUNK_ROWS = 1000
+MAX_LOOKUP_POINTS = 1_000_000
+MAX_INGEST_REPORTS = 1000
+DEFAULT_HOTSPOT_WEEKS = 4
+DEFAULT_HOTSPOT_LIMIT = 20
+MAX_HOTSPOT_LIMIT = 500
+
+
+def parse_bbox(args):
+    """bbox=최소경도,최소위도,최대경도,최대위도 → [4개 float] (없으면 None, 형식이 틀리면 ValueError)"""
+    if not args.get('bbox'):
+        return None
+    bbox = [float(v) for v in args['bbox'].split(',')]
+    if len(bbox) != 4:
+        raise ValueError("bbox는 '최소경도,최소위도,최대경도,최대위도' 형식이어야 합니다")
+    if not np.all(np.isfinite(bbox)):
+        raise ValueError("bbox 값은 유한한 숫자여야 합니다")
+    min_lon, min_lat, max_lon, max_lat = bbox
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError("bbox의 최소경도/최소위도는 최대경도/최대위도보다 클 수 없습니다")
+    return bbox
+
+
+def parse_date_range(args):
+    """기간 파라미터 → (시작 일수, 끝 일수) (YYYY-MM-DD, 양 끝 포함, 없으면 None, 형식이 틀리면 ValueError)
+
+    - 모든 API 공통: startDate/endDate 또는 start/end (같은 쪽을 둘 다 다른 값으로 주면 ValueError)
+    """
+    days = []
+    for names in DATE_PARAMS:
+        values = {args[name] for name in names if args.get(name)}
+        if len(values) > 1:
+            raise ValueError(f"{names[0]}와 {names[1]} 값이 서로 다릅니다")
+        days.append(to_day_number(values.pop()) if values else None)
+    return tuple(days)
+
+
+def parse_roadkill_query(args):
+    """조회 파라미터 해석 (형식이 틀리면 ValueError)
+
+    - bbox=최소경도,최소위도,최대경도,최대위도
+    - startDate/endDate (또는 start/end): 접수일자 범위 (YYYY-MM-DD, 양 끝 포함)
+    - agency: 관할기관 (예: "경기" 또는 "경기 부천시")
+    - limit, offset 또는 cursor(이전 응답의 next_cursor)
+    """
+    query = {}
+    bbox = parse_bbox(args)
+    if bbox is not None:
+        query['bbox'] = bbox
+    start_day, end_day = parse_date_range(args)
+    if start_day is not None:
+        query['start_day'] = start_day
+    if end_day is not None:
+        query['end_day'] = end_day
+    if args.get('agency'):
+        query['agency'] = args['agency'].strip()
+
+    limit = int(args.get('limit', MAX_PAGE_SIZE))
+    offset = int(args.get('offset', 0))
+    cursor = int(args['cursor']) if args.get('cursor') else None
+    if limit <= 0 or offset < 0:
+        raise ValueError("limit은 1 이상, offset은 0 이상이어야 합니다")
+    return query, min(limit, MAX_PAGE_SIZE), offset, cursor
+
+
+def query_roadkill_data(snapshot, args):
+    """인덱스로 조건에 맞는 행만 골라 페이지 단위로 반환"""
+    try:
+        query, limit, offset, cursor = parse_roadkill_query(args)
+    except ValueError as e:
+        return jsonify({"success": False, "error": f"잘못된 조회 조건: {e}"}), 400
+
+    rows = snapshot.index.query(**query)
+    if cursor is not None:
+        rows = rows[rows.searchsorted(cursor, side='right'):]
+    total = len(rows)
+    page = rows[offset:offset + limit]
+    has_more = offset + limit < total
+
+    return jsonify({
+        "success": True,
+        "total": total,
+        "count": len(page),
+        "next_cursor": int(page[-1]) if has_more and len(page) else None,
+        "data": [snapshot.records[i] for i in page]
+    })
+
+
+def iter_ndjson(snapshot, rows):
+    """행 위치 순서대로 한 줄에 한 행씩 JSON 출력 (전체 records 목록 없이 청크 단위로 직렬화)"""
+    for start in range(0, len(rows), NDJSON_CHUNK_ROWS):
+        chunk = snapshot.take(rows[start:start + NDJSON_CHUNK_ROWS])
+        records = json_records(chunk)
+        yield ''.join(app.json.dumps(record, separators=(',', ':')) + '\n' for record in records)
+
+
+def stream_roadkill_data(snapshot, args):
+    """NDJSON 스트리밍 응답 (bbox/기간/agency 조건만 적용, 페이지 없이 결과 전체 전송)"""
+    try:
+        query, _, _, _ = parse_roadkill_query(args)
+    except ValueError as e:
+        return jsonify({"success": False, "error": f"잘못된 조회 조건: {e}"}), 400
+
+    rows = snapshot.index.query(**query)
+    return app.response_class(iter_ndjson(snapshot, rows), mimetype='application/x-ndjson')
+
+
+def start_report_ingestor():
+    """WAL 복구 + 백그라운드 매칭 스레드 시작 (서버 시작 때 한 번)
+
+    - 복구가 실패해도 조회 API는 그대로 동작하고, 오류는 /api/roadkill/reports/status의 last_error로 확인
+    - 다른 WSGI 서버로 실행하면 첫 신고 접수 때 시작
+    """
+    report_ingestor.ensure_started()
+
+
+@app.route('/api/roadkill/reports', methods=['POST'])
+def ingest_roadkill_reports():
+    """신고 접수 → WAL 기록 후 /api/roadkill에 바로 반영 (관측소/날씨 매칭은 몇 초 안에 백그라운드에서)
+
+    - 요청 본문: 신고 객체 하나, 신고 배열, 또는 {"reports": [...]}
+    - 신고 객체: latitude, longitude (필수), incident_date (YYYY-MM-DD, 2020년 ~ 오늘), incident_time (HH:MM), agency (관할기관)
+    """
+    try:
+        body = request.get_json(silent=True)
+        items = body.get('reports', [body]) if isinstance(body, dict) else body
+        try:
+            if not isinstance(items, list) or not items:
+                raise ValueError("신고 객체나 신고 배열이 필요합니다")
+            if len(items) > MAX_INGEST_REPORTS:
+                raise ValueError(f"한 번에 최대 {MAX_INGEST_REPORTS:,}건까지 접수할 수 있습니다")
+            records = report_ingestor.ingest(items)
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"잘못된 신고: {e}"}), 400
+        except RuntimeError as e:
+            return jsonify({"success": False, "error": str(e)}), 503
+
+        data = [
+            {"일련번호": r["일련번호"], "접수일자": r["접수일자"], "접수시각": r["접수시각"],
+             "관할기관": r["관할기관"], "위도": r["GPS Y"], "경도": r["GPS X"]}
+            for r in records
+        ]
+        return jsonify({"success": True, "count": len(data), "data": data}), 201
+
+    except Exception as e:
+        print(f"[❌ Error] {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/roadkill/reports/status')
+def get_ingest_status():
+    """접수 처리 상태 (매칭 대기/압축 대기 건수, 마지막 배치·압축 시각, 마지막 오류)"""
+    return jsonify({"success": True, "data": report_ingestor.status()})
+
 
 @app.route('/api/roadkill')
 def get_roadkill_data():
     try:
-        # CSV 파일 읽기
-        df = pd.read_csv(data_path, encoding='utf-8-sig')
+        snapshot = roadkill_dataset.load()
+
+        # format=ndjson: 한 줄에 한 행씩 스트리밍
+        if request.args.get('format') == 'ndjson':
+            return stream_roadkill_data(snapshot, request.args)
+
+        # 조회 조건이 있으면 인덱스로 필터링한 페이지 응답 ({success, total, count, next_cursor, data})
+        if any(param in request.args for param in QUERY_PARAMS):
+            return query_roadkill_data(snapshot, request.args)
+
+        # 미리 만든 JSON 본문 + ETag (If-None-Match 일치 시 304)
+        # Accept-Encoding에 따라 br/gzip 압축본 사용 (스냅샷에 캐시되어 한 번만 압축)
+        encoding = request.accept_encodings.best_match(list(COMPRESSORS))
+        if encoding:
+            response = app.response_class(snapshot.compressed_body(encoding), mimetype='application/json')
+            response.headers['Content-Encoding'] = encoding
+            response.set_etag(f"{snapshot.etag}-{encoding}")
+        else:
+            response = app.response_class(snapshot.body, mimetype='application/json')
+            response.set_etag(snapshot.etag)
+        response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+    except FileNotFoundError:
+        return jsonify({"error": f"파일을 찾을 수 없습니다: {data_path}"}), 404
+    except Exception as e:
+        print(f"[❌ Error] {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/roadkill/clusters')
+def get_roadkill_clusters():
+    """줌 레벨/뷰포트별 사전 집계 클러스터 (GeoJSON FeatureCollection)
+
+    - zoom: 지도 줌 레벨 (정수, 0 ~ 14 밖이면 가장 가까운 레벨)
+    - bbox: 최소경도,최소위도,최대경도,최대위도 (생략 시 전체)
+    """
+    try:
+        snapshot = roadkill_dataset.load()
+
+        try:
+            zoom = int(float(request.args.get('zoom', 0)))
+            bbox = parse_bbox(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"잘못된 조회 조건: {e}"}), 400
+
+        response = jsonify(snapshot.clusters.to_geojson(zoom, bbox))
+        response.set_etag(f"{snapshot.etag}-{request.query_string.decode('utf-8', 'replace')}")
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+    except FileNotFoundError:
+        return jsonify({"error": f"파일을 찾을 수 없습니다: {data_path}"}), 404
+    except Exception as e:
+        print(f"[❌ Error] {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/roadkill/hotspots')
+def get_roadkill_hotspots():
+    """격자 칸별 평활 밀도 상위 핫스팟
+
+    - startDate/endDate: 기간 (YYYY-MM-DD, 해당 날짜가 속한 주 포함), 생략 시 데이터 마지막 주까지 최근 weeks주
+    - weeks: 최근 몇 주 (기본 4), limit: 상위 칸 수 (기본 20, 최대 500)
+    - bbox: 최소경도,최소위도,최대경도,최대위도 (칸 중심 기준)
+    """
+    try:
+        snapshot = roadkill_dataset.load()
+        cube = roadkill_hotspots.load(snapshot)
+
+        try:
+            start_day, end_day = parse_date_range(request.args)
+            weeks = int(request.args.get('weeks', DEFAULT_HOTSPOT_WEEKS))
+            limit = int(request.args.get('limit', DEFAULT_HOTSPOT_LIMIT))
+            if weeks <= 0 or limit <= 0:
+                raise ValueError("weeks와 limit은 1 이상이어야 합니다")
+            limit = min(limit, MAX_HOTSPOT_LIMIT)
+            bbox = parse_bbox(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"잘못된 조회 조건: {e}"}), 400
+
+        last_week = cube.last_week
+        if last_week is None:
+            return jsonify({"success": True, "start": None, "end": None, "data": []})
+        end_week = int(to_week_number(end_day)) if end_day is not None else last_week
+        start_week = int(to_week_number(start_day)) if start_day is not None else end_week - weeks + 1
+
+        response = jsonify({
+            "success": True,
+            "start": week_start_date(start_week),
+            "end": week_end_date(end_week),
+            "cellDeg": cube.cell_deg,
+            "data": cube.top(start_week, end_week, limit, bbox),
+        })
+        response.set_etag(f"{snapshot.etag}-{request.query_string.decode('utf-8', 'replace')}")
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+    except FileNotFoundError:
+        return jsonify({"error": f"파일을 찾을 수 없습니다: {data_path}"}), 404
+    except Exception as e:
+        print(f"[❌ Error] {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/roadkill/statistics/by-region')
+def get_statistics_by_region():
+    """시도별 로드킬 건수 (startDate/endDate로 기간 제한 가능)"""
+    try:
+        cube = roadkill_statistics.load(roadkill_dataset.load())
+        try:
+            start_day, end_day = parse_date_range(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"잘못된 조회 조건: {e}"}), 400
+
+        return jsonify({"success": True, "data": cube.by_region(start_day, end_day)})
+
+    except FileNotFoundError:
+        return jsonify({"error": f"파일을 찾을 수 없습니다: {data_path}"}), 404
+    except Exception as e:
+        print(f"[❌ Error] {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/roadkill/statistics/by-date')
+def get_statistics_by_date():
+    """월별 로드킬 건수 (startDate/endDate 기간, region으로 시도 제한 가능)"""
+    try:
+        cube = roadkill_statistics.load(roadkill_dataset.load())
+        try:
+            start_day, end_day = parse_date_range(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"잘못된 조회 조건: {e}"}), 400
+
+        data = cube.by_month(start_day, end_day, request.args.get('region'))
+        return jsonify({"success": True, "total": sum(row["count"] for row in data), "data": data})
+
+    except FileNotFoundError:
+        return jsonify({"error": f"파일을 찾을 수 없습니다: {data_path}"}), 404
+    except Exception as e:
+        print(f"[❌ Error] {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/roadkill/statistics/animals')
+def get_statistics_animals():
+    """동물 종별 로드킬 건수/비율 (animalType_data)"""
+    try:
+        roadkill_statistics.load(roadkill_dataset.load())
+        data = roadkill_statistics.animal_records
+        return jsonify({"success": True, "count": len(data), "data": data})
 
-        # ✅ NaN → None (JSON 변환 시 오류 방지)
-        df = df.where(pd.notnull(df), None)
+    except FileNotFoundError:
+        return jsonify({"error": f"파일을 찾을 수 없습니다: {data_path}"}), 404
+    except Exception as e:
+        print(f"[❌ Error] {e}")
+        return jsonify({"error": str(e)}), 500
 
-        # JSON 형식으로 변환
-        data = df.to_dict(orient='records')
-        return jsonify(data)
+
+@app.route('/api/roadkill/statistics/weather')
+def get_statistics_weather():
+    """월별 로드킬 건수 + 매칭된 관측소의 평균 날씨 (startDate/endDate 기간 제한 가능)"""
+    try:
+        cube = roadkill_statistics.load(roadkill_dataset.load())
+        try:
+            start_day, end_day = parse_date_range(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"잘못된 조회 조건: {e}"}), 400
+
+        return jsonify({"success": True, "data": cube.weather_by_month(start_day, end_day)})
 
     except FileNotFoundError:
         return jsonify({"error": f"파일을 찾을 수 없습니다: {data_path}"}), 404
@@ -32,6 +390,65 @@ def get_roadkill_data():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/api/roadkill/weather')
+def get_weather_data():
+    """날씨 데이터 (일자 내림차순, limit/offset 페이지)"""
+    try:
+        roadkill_statistics.load(roadkill_dataset.load())
+        try:
+            limit = int(request.args.get('limit', 100))
+            offset = int(request.args.get('offset', 0))
+            if limit <= 0 or offset < 0:
+                raise ValueError("limit은 1 이상, offset은 0 이상이어야 합니다")
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"잘못된 조회 조건: {e}"}), 400
+
+        records = roadkill_statistics.weather_records
+        page = records[offset:offset + limit]
+        return jsonify({"success": True, "total": len(records), "returned": len(page), "data": page})
+
+    except FileNotFoundError:
+        return jsonify({"error": f"파일을 찾을 수 없습니다: {data_path}"}), 404
+    except Exception as e:
+        print(f"[❌ Error] {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/regions/lookup', methods=['POST'])
+def lookup_regions():
+    """좌표 배열 → 행정구역 이름 배열 (DB 조회 없이 경계 인덱스로 일괄 판정)
+
+    - 요청 본문: {"latitude": [...], "longitude": [...]} (같은 길이, 숫자 하나도 가능)
+    - 응답 data: 좌표 순서대로 지역 이름 (어느 지역에도 속하지 않으면 null)
+    """
+    try:
+        try:
+            body = request.get_json(silent=True) or {}
+            if body.get('latitude') is None or body.get('longitude') is None:
+                raise ValueError("latitude, longitude가 필요합니다")
+            lat = np.atleast_1d(np.asarray(body.get('latitude'), dtype=np.float64))
+            lon = np.atleast_1d(np.asarray(body.get('longitude'), dtype=np.float64))
+            if lat.ndim != 1 or lat.shape != lon.shape:
+                raise ValueError("latitude와 longitude는 같은 길이의 숫자 배열이어야 합니다")
+            if len(lat) > MAX_LOOKUP_POINTS:
+                raise ValueError(f"한 번에 최대 {MAX_LOOKUP_POINTS:,}개 좌표까지 조회할 수 있습니다")
+        except (TypeError, ValueError) as e:
+            return jsonify({"success": False, "error": f"잘못된 조회 조건: {e}"}), 400
+
+        names = region_index.load().assign(lat, lon)
+        return jsonify({"success": True, "count": len(names), "data": names.tolist()})
+
+    except FileNotFoundError:
+        return jsonify({"error": f"파일을 찾을 수 없습니다: {region_index.path}"}), 404
+    except Exception as e:
+        print(f"[❌ Error] {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 if __name__ == '__main__':
+    # 디버그 리로더의 감시 프로세스가 아니라 요청을 처리하는 자식 프로세스에서만 신고 접수 시작
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_report_ingestor()
+
     # Flask 서버 실행
     app.run(debug=True, host='0.0.0.0', port=5000)
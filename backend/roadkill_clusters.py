@@ -0,0 +1,154 @@
+"""
+Module: roadkill_clusters
+Description: 줌 레벨별 로드킬 클러스터(계층 격자 집계) 사전 계산 및 뷰포트 조회.
+"""
+
+import copy
+
+import numpy as np
+
+MAX_ZOOM = 14   # 프론트엔드 clusterMaxZoom과 동일, 이보다 크게 확대하면 가장 세밀한 격자 사용
+CELL_BITS = 2   # 타일 한 장을 2^CELL_BITS × 2^CELL_BITS 칸으로 나눔 (512px 타일 기준 한 칸 128px)
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def mercator_xy(lat, lon):
+    """위경도 → 0~1 범위의 웹 메르카토르 좌표"""
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT)
+    x = (np.asarray(lon, dtype=np.float64) + 180.0) / 360.0
+    y = 0.5 - np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) / (2 * np.pi)
+    return np.clip(x, 0.0, 1.0 - 1e-12), np.clip(y, 0.0, 1.0 - 1e-12)
+
+
+class ClusterLevel:
+    """한 줌 레벨의 격자 집계 (x, y 순으로 정렬된 칸별 건수 / 평균 위경도)"""
+
+    def __init__(self, cell_x, cell_y, counts, lat_sum, lon_sum):
+        self.keys = (cell_x << 32) | cell_y
+        self.cell_x = cell_x
+        self.cell_y = cell_y
+        self.counts = counts
+        self.lat_sum = lat_sum
+        self.lon_sum = lon_sum
+
+    def __len__(self):
+        return len(self.keys)
+
+    def coarser(self):
+        """한 단계 위(줌 -1) 레벨: 인접한 2×2 칸을 합침"""
+        return aggregate_cells(self.cell_x >> 1, self.cell_y >> 1, self.counts, self.lat_sum, self.lon_sum)
+
+
+def aggregate_cells(cell_x, cell_y, counts, lat_sum, lon_sum):
+    """같은 칸끼리 건수/위경도 합계를 더해 ClusterLevel 생성"""
+    keys = (cell_x << 32) | cell_y
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, dtype=np.int64)
+    return ClusterLevel(
+        cell_x[order][starts],
+        cell_y[order][starts],
+        np.add.reduceat(counts[order], starts) if len(keys) else counts[:0],
+        np.add.reduceat(lat_sum[order], starts) if len(keys) else lat_sum[:0],
+        np.add.reduceat(lon_sum[order], starts) if len(keys) else lon_sum[:0],
+    )
+
+
+class ClusterPyramid:
+    """줌 0 ~ MAX_ZOOM 클러스터 피라미드
+
+    - 가장 세밀한 레벨만 점에서 직접 집계하고, 나머지는 아래 레벨 칸을 2×2씩 합쳐서 생성
+    - 조회 비용은 뷰포트 안의 칸 수에만 비례 (전체 점 수와 무관)
+    - tail: 뒤에 덧붙인 점(API 접수 신고)만 따로 만든 작은 피라미드, 조회할 때 같은 칸끼리 합침
+    """
+
+    def __init__(self, lat, lon):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        located = np.isfinite(lat) & np.isfinite(lon)
+        lat, lon = lat[located], lon[located]
+
+        scale = 1 << (MAX_ZOOM + CELL_BITS)
+        x, y = mercator_xy(lat, lon)
+        level = aggregate_cells(
+            (x * scale).astype(np.int64), (y * scale).astype(np.int64),
+            np.ones(len(lat), dtype=np.int64), lat, lon
+        )
+
+        self.levels = [None] * (MAX_ZOOM + 1)
+        for zoom in range(MAX_ZOOM, -1, -1):
+            self.levels[zoom] = level
+            if zoom > 0:
+                level = level.coarser()
+        self.tail = None
+
+    def appended(self, lat, lon):
+        """뒤에 점(지금까지 덧붙인 점 전체)을 더한 피라미드 (기존 레벨은 공유하고 덧붙인 점만 집계)"""
+        pyramid = copy.copy(self)
+        pyramid.tail = ClusterPyramid(lat, lon)
+        return pyramid
+
+    def query(self, zoom, bbox=None):
+        """줌 레벨과 뷰포트(최소경도, 최소위도, 최대경도, 최대위도)의 클러스터 목록
+
+        - 반환: (경도, 위도, 건수) 배열 3개
+        """
+        zoom = int(min(max(zoom, 0), MAX_ZOOM))
+        level = self._select(zoom, bbox)
+        if self.tail is not None:
+            tail = self.tail._select(zoom, bbox)
+            level = aggregate_cells(*(
+                np.concatenate([getattr(level, field), getattr(tail, field)])
+                for field in ("cell_x", "cell_y", "counts", "lat_sum", "lon_sum")
+            ))
+        return level.lon_sum / level.counts, level.lat_sum / level.counts, level.counts
+
+    def _select(self, zoom, bbox):
+        """줌 레벨에서 뷰포트와 겹치는 칸만 고른 ClusterLevel"""
+        level = self.levels[zoom]
+        if bbox is None or len(level) == 0:
+            return level
+
+        min_lon, min_lat, max_lon, max_lat = bbox
+        scale = 1 << (zoom + CELL_BITS)
+        (x0, x1), (y1, y0) = (
+            (v * scale).astype(np.int64)
+            for v in mercator_xy([min_lat, max_lat], [min_lon, max_lon])
+        )
+        lo = np.searchsorted(level.keys, x0 << 32, side="left")
+        hi = np.searchsorted(level.keys, ((x1 + 1) << 32), side="left")
+        selected = lo + np.flatnonzero(
+            (level.cell_y[lo:hi] >= y0) & (level.cell_y[lo:hi] <= y1)
+        )
+        return ClusterLevel(
+            level.cell_x[selected], level.cell_y[selected],
+            level.counts[selected], level.lat_sum[selected], level.lon_sum[selected]
+        )
+
+    def to_geojson(self, zoom, bbox=None):
+        """Mapbox 소스로 바로 쓸 수 있는 GeoJSON FeatureCollection"""
+        lons, lats, counts = self.query(zoom, bbox)
+        return {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [round(lon, 6), round(lat, 6)]},
+                    "properties": cluster_properties(count),
+                }
+                for lon, lat, count in zip(lons.tolist(), lats.tolist(), counts.tolist())
+            ],
+        }
+
+
+def cluster_properties(count):
+    """Mapbox 클러스터 소스와 같은 속성 (1건짜리 칸은 개별 포인트로 취급해 속성 없음)"""
+    if count == 1:
+        return {}
+    if count >= 10000:
+        abbreviated = f"{round(count / 1000)}k"
+    elif count >= 1000:
+        abbreviated = f"{round(count / 100) / 10}k"
+    else:
+        abbreviated = count
+    return {"cluster": True, "point_count": count, "point_count_abbreviated": abbreviated}
@@ -0,0 +1,216 @@
+"""
+Module: roadkill_dataset
+Description: roadkill_data.csv를 한 번만 읽어 메모리에 두고, 미리 직렬화한 JSON 본문과 ETag를 제공하는 캐시.
+"""
+
+import gzip
+import hashlib
+import itertools
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import brotli  # 선택 의존성 (설치되어 있지 않으면 gzip만 제공)
+except ImportError:
+    brotli = None
+
+from merge_manifest import row_keys
+from processed_store import read_table, to_csv_frame
+from roadkill_clusters import ClusterPyramid
+from roadkill_index import RoadkillIndex
+
+# ✅ 응답 압축 방식 (Content-Encoding 이름 → 압축 함수, 앞에 있을수록 우선)
+COMPRESSORS = {}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=9)
+COMPRESSORS["gzip"] = lambda body: gzip.compress(body, compresslevel=6, mtime=0)
+
+# 스냅샷 계보 번호 (파일을 다시 읽을 때마다 증가)
+_lineages = itertools.count(1)
+
+
+def json_records(frame):
+    """DataFrame → 행별 dict 목록 (결측값은 None)
+
+    - float 컬럼에 where(..., None)만 쓰면 다시 NaN이 되어 JSON에 NaN이 그대로 나가므로 object로 바꾼 뒤 치환
+    """
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
+
+
+def join_json_arrays(bodies):
+    """JSON 배열 본문 여러 개("[...]\n")를 하나의 배열 본문으로 이어 붙임 (빈 배열은 건너뜀)"""
+    items = [memoryview(body)[1:len(body) - (2 if body.endswith(b"\n") else 1)] for body in bodies]
+    return b"[" + b",".join(item for item in items if len(item)) + b"]\n"
+
+
+class DatasetSnapshot:
+    """특정 시점의 데이터셋 (요청 처리 중에는 바뀌지 않음)
+
+    - frame: 원본 DataFrame (덧붙인 행이 있으면 처음 쓸 때 파일 행 뒤에 한 번만 이어 붙임)
+    - file_frame: 파일에서 읽은 행 DataFrame
+    - appended: 파일 뒤에 덧붙인 행 DataFrame (API로 접수한 신고, 없으면 None)
+    - records: 행별 dict 목록 (NaN → None, 필터 조회 응답에 재사용)
+      덧붙인 스냅샷끼리 공유하며 뒤에만 추가하므로 앞 size개가 이 스냅샷의 행
+    - index: 날짜/격자/관할기관 조회 인덱스
+    - clusters: 줌 레벨별 클러스터 피라미드
+    - body: /api/roadkill 응답용 JSON 본문 (bytes, body_parts의 파일 행/덧붙인 행 본문을 처음 쓸 때 한 번만 이어 붙임)
+    - etag: 파일 내용 해시 기반 ETag
+    - lineage: 파일을 읽을 때마다 새로 정하는 번호 (같으면 앞 행은 그대로이고 뒤에 행만 추가된 스냅샷)
+    """
+
+    def __init__(self, frame, records, index, clusters, body_parts, etag, lineage, appended=None):
+        self.file_frame = frame
+        self.appended = appended
+        self.records = records
+        self.index = index
+        self.clusters = clusters
+        self.etag = etag
+        self.lineage = lineage
+        self.size = len(frame) + (0 if appended is None else len(appended))
+        self.body_parts = body_parts
+        self._frame = frame if appended is None else None
+        self._body = body_parts[0] if len(body_parts) == 1 else None
+        self._compressed = {}
+        self._lazy_lock = threading.Lock()
+
+    @property
+    def frame(self):
+        if self._frame is None:
+            with self._lazy_lock:
+                if self._frame is None:
+                    self._frame = pd.concat([self.file_frame, self.appended], ignore_index=True)
+        return self._frame
+
+    @property
+    def body(self):
+        if self._body is None:
+            with self._lazy_lock:
+                if self._body is None:
+                    self._body = join_json_arrays(self.body_parts)
+        return self._body
+
+    def take(self, rows):
+        """행 위치(오름차순) → DataFrame (전체 frame을 이어 붙이지 않고 파일 행/덧붙인 행에서 각각 꺼냄)"""
+        if self.appended is None:
+            return self.file_frame.iloc[rows]
+        n = len(self.file_frame)
+        split = np.searchsorted(rows, n)
+        return pd.concat([self.file_frame.iloc[rows[:split]], self.appended.iloc[rows[split:] - n]])
+
+    def compressed_body(self, encoding):
+        """압축한 JSON 본문 (방식별로 처음 요청될 때 한 번만 압축하고 스냅샷과 함께 보관)"""
+        body = self.body
+        if encoding not in self._compressed:
+            with self._lazy_lock:
+                if encoding not in self._compressed:
+                    self._compressed[encoding] = COMPRESSORS[encoding](body)
+        return self._compressed[encoding]
+
+
+class RoadkillDataset:
+    """CSV 파일 기반 데이터셋 캐시
+
+    - 요청마다 파일 mtime/크기만 확인하고, 바뀌었을 때만 내용 해시를 계산
+    - 내용 해시까지 바뀌면 다시 읽어 JSON 본문을 새로 만들고 스냅샷을 교체
+    - 읽기는 processed_store 사용 (같은 이름의 최신 Parquet이 있으면 CSV 파싱 없이 로드)
+    - encode: records(list[dict]) → JSON 문자열 (Flask app.json.dumps와 같은 형식 유지)
+    - append_rows: 아직 파일에 없는 행(API로 접수한 신고)을 스냅샷 뒤에 덧붙임,
+      파일을 다시 읽을 때 파일에 들어간 (연도, 일련번호) 행은 덧붙인 목록에서 제외
+    """
+
+    def __init__(self, path, encode):
+        self.path = path
+        self.encode = encode
+        self._lock = threading.Lock()
+        self._signature = None
+        self._digest = None
+        self._snapshot = None
+        self._overlay = None
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _file_digest(self):
+        digest = hashlib.sha256()
+        with open(self.path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _build_snapshot(self, digest):
+        name = os.path.splitext(os.path.basename(self.path))[0]
+        frame = to_csv_frame(read_table(name, processed_dir=os.path.dirname(self.path)), name)
+
+        records = json_records(frame)
+        body = self.encode(records).encode("utf-8")
+        index = RoadkillIndex(frame)
+        clusters = ClusterPyramid(index.lat, index.lon)
+        return DatasetSnapshot(frame, records, index, clusters, [body], digest[:32], next(_lineages))
+
+    def _extend_snapshot(self, snapshot, rows):
+        """스냅샷 뒤에 행 추가 → 같은 계보의 새 스냅샷
+
+        - 파일 행의 인덱스/클러스터/JSON 본문은 그대로 공유하고, 덧붙인 행 전체만 작은 인덱스/클러스터로 만듦
+        - records는 같은 목록 뒤에 추가, JSON 본문은 추가 행만 직렬화해 두고 처음 요청될 때 이어 붙임
+        - 비용은 파일 행 수와 무관하게 덧붙인 행 수에만 비례 (파일을 다시 읽을 때 하나로 합쳐짐)
+        """
+        appended = rows if snapshot.appended is None else pd.concat([snapshot.appended, rows], ignore_index=True)
+        new_records = json_records(rows)
+        new_body = self.encode(new_records).encode("utf-8")
+
+        records = snapshot.records
+        if len(records) != snapshot.size:
+            records = records[:snapshot.size]  # 다른 스냅샷이 이미 뒤에 추가한 목록이면 복사해서 사용
+        records.extend(new_records)
+
+        index = snapshot.index.appended(appended)
+        clusters = snapshot.clusters.appended(index.tail.lat, index.tail.lon)
+        etag = hashlib.sha256(snapshot.etag.encode("ascii") + new_body).hexdigest()[:32]
+        return DatasetSnapshot(
+            snapshot.file_frame, records, index, clusters, snapshot.body_parts + [new_body], etag,
+            snapshot.lineage, appended
+        )
+
+    def _load_locked(self):
+        signature = self._file_signature()
+        if signature != self._signature or self._snapshot is None:
+            digest = self._file_digest()
+            if digest != self._digest or self._snapshot is None:
+                snapshot = self._build_snapshot(digest)
+                if self._overlay is not None and len(self._overlay):
+                    file_keys = row_keys(snapshot.frame["일련번호"], snapshot.frame["접수일자"])
+                    overlay_keys = row_keys(self._overlay["일련번호"], self._overlay["접수일자"])
+                    self._overlay = self._overlay[~np.isin(overlay_keys, file_keys)].reset_index(drop=True)
+                    if len(self._overlay):
+                        snapshot = self._extend_snapshot(snapshot, self._overlay)
+                self._snapshot = snapshot
+                self._digest = digest
+            self._signature = signature
+        return self._snapshot
+
+    def load(self):
+        """최신 스냅샷 반환 (파일이 바뀌었으면 다시 로드, 없으면 FileNotFoundError)"""
+        signature = self._file_signature()
+        if signature == self._signature and self._snapshot is not None:
+            return self._snapshot
+
+        with self._lock:
+            return self._load_locked()
+
+    def append_rows(self, rows):
+        """파일에 아직 없는 행(roadkill_data 컬럼, CSV 표기) 추가 → 새 스냅샷"""
+        with self._lock:
+            snapshot = self._load_locked()
+            rows = rows.reset_index(drop=True)
+            self._overlay = rows if self._overlay is None else pd.concat([self._overlay, rows], ignore_index=True)
+            self._snapshot = self._extend_snapshot(snapshot, rows)
+            return self._snapshot
+
+    @property
+    def overlay_rows(self):
+        """파일에 아직 반영되지 않은 추가 행 수"""
+        return 0 if self._overlay is None else len(self._overlay)
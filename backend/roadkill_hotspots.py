@@ -0,0 +1,212 @@
+"""
+Module: roadkill_hotspots
+Description: 위경도 격자 × 주 단위 로드킬 건수 큐브와 분리 가능한(separable) 가우시안 평활 밀도 기반 핫스팟 조회.
+"""
+
+import copy
+import threading
+
+import numpy as np
+from scipy.ndimage import convolve1d
+
+from roadkill_consolidate import KOREA_LAT, KOREA_LON
+from roadkill_index import EPOCH, GRID_CELL_DEG, MISSING_DAY
+
+SIGMA_CELLS = 1.0   # 평활 가우시안 표준편차 (격자 칸 수, 약 5km)
+KERNEL_RADIUS = 3   # 커널 반경 (σ의 배수)
+WEEK_SHIFT = 3      # 1970-01-01은 목요일 → (일수 + 3) // 7 로 월요일 시작 주 번호
+
+
+def to_week_number(days):
+    """1970-01-01 기준 일수 → 주 번호 (1969-12-29 월요일 기준)"""
+    return (np.asarray(days, dtype=np.int64) + WEEK_SHIFT) // 7
+
+
+def week_start_date(week):
+    """주 번호 → 그 주 월요일 (YYYY-MM-DD)"""
+    return str(EPOCH + np.timedelta64(int(week) * 7 - WEEK_SHIFT, "D"))
+
+
+def week_end_date(week):
+    """주 번호 → 그 주 일요일 (YYYY-MM-DD)"""
+    return str(EPOCH + np.timedelta64(int(week) * 7 - WEEK_SHIFT + 6, "D"))
+
+
+def gaussian_kernel(sigma):
+    """합이 1인 1차원 가우시안 커널 (가로/세로 방향에 각각 적용)"""
+    radius = max(int(np.ceil(KERNEL_RADIUS * sigma)), 1)
+    x = np.arange(-radius, radius + 1, dtype=np.float64)
+    kernel = np.exp(-0.5 * (x / sigma) ** 2)
+    return kernel / kernel.sum()
+
+
+class HotspotCube:
+    """핫스팟 큐브
+
+    - 남한 범위를 GRID_CELL_DEG 격자로 나누고, 주마다 칸별 건수와 평활 밀도(가우시안 가중 건수)를 보관
+    - 점을 추가하면 해당 주만 다시 평활 (가로·세로 1차원 컨볼루션 두 번, 비용은 격자 크기에 비례)
+    - 조회는 기간 안 주들의 밀도를 더해 상위 칸을 고르므로 점 수와 무관
+    """
+
+    def __init__(self, cell_deg=GRID_CELL_DEG, sigma=SIGMA_CELLS):
+        self.cell_deg = cell_deg
+        self.lat0, self.lon0 = KOREA_LAT[0], KOREA_LON[0]
+        self.n_lat = int(np.ceil((KOREA_LAT[1] - KOREA_LAT[0]) / cell_deg))
+        self.n_lon = int(np.ceil((KOREA_LON[1] - KOREA_LON[0]) / cell_deg))
+        self.kernel = gaussian_kernel(sigma)
+        self.week0 = 0
+        self.counts = np.zeros((0, self.n_lat, self.n_lon), dtype=np.int32)
+        self.density = np.zeros((0, self.n_lat, self.n_lon), dtype=np.float32)
+        self.n_points = 0
+        self.n_skipped = 0  # 접수일자가 없거나 격자 범위 밖인 점
+
+    @property
+    def n_weeks(self):
+        return len(self.counts)
+
+    @property
+    def last_week(self):
+        """건수가 있는 마지막 주 번호 (없으면 None)"""
+        weeks = np.flatnonzero(self.counts.reshape(self.n_weeks, -1).any(axis=1))
+        return int(self.week0 + weeks[-1]) if len(weeks) else None
+
+    def _extend(self, first_week, last_week):
+        """주 범위를 [first_week, last_week]까지 넓힘 (앞뒤에 빈 주 추가)"""
+        if self.n_weeks == 0:
+            self.week0 = first_week
+        before = max(self.week0 - first_week, 0)
+        after = max(last_week - (self.week0 + self.n_weeks - 1), 0)
+        if before or after:
+            pad = ((before, after), (0, 0), (0, 0))
+            self.counts = np.pad(self.counts, pad)
+            self.density = np.pad(self.density, pad)
+            self.week0 -= before
+
+    def add_points(self, days, lat, lon):
+        """점 추가 (days: 1970-01-01 기준 일수 또는 MISSING_DAY)"""
+        days = np.asarray(days, dtype=np.int64)
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        with np.errstate(invalid="ignore"):
+            iy = np.floor((lat - self.lat0) / self.cell_deg)
+            ix = np.floor((lon - self.lon0) / self.cell_deg)
+            valid = (
+                (days != MISSING_DAY)
+                & (iy >= 0) & (iy < self.n_lat) & (ix >= 0) & (ix < self.n_lon)  # NaN은 False
+            )
+        self.n_points += int(valid.sum())
+        self.n_skipped += int(len(days) - valid.sum())
+        if not valid.any():
+            return
+
+        weeks = to_week_number(days[valid])
+        self._extend(int(weeks.min()), int(weeks.max()))
+
+        # 추가된 점이 있는 주만 건수 갱신 후 다시 평활
+        touched, week_pos = np.unique(weeks - self.week0, return_inverse=True)
+        cells = iy[valid].astype(np.int64) * self.n_lon + ix[valid].astype(np.int64)
+        grid_size = self.n_lat * self.n_lon
+        added = np.bincount(week_pos * grid_size + cells, minlength=len(touched) * grid_size)
+        self.counts[touched] += added.reshape(len(touched), self.n_lat, self.n_lon).astype(np.int32)
+        self.density[touched] = self._smooth(self.counts[touched])
+
+    def _smooth(self, counts):
+        """주별 건수 격자 → 평활 밀도 (세로·가로 방향 1차원 컨볼루션, 격자 밖은 0)"""
+        smoothed = convolve1d(counts.astype(np.float32), self.kernel, axis=1, mode="constant")
+        return convolve1d(smoothed, self.kernel, axis=2, mode="constant")
+
+    def _week_slice(self, start_week, end_week):
+        a = min(max(start_week - self.week0, 0), self.n_weeks)
+        b = min(max(end_week - self.week0 + 1, 0), self.n_weeks)
+        return slice(a, max(a, b))
+
+    def top(self, start_week, end_week, limit, bbox=None):
+        """[start_week, end_week] 기간 밀도 상위 limit개 칸 (밀도 내림차순, 밀도 0인 칸 제외)
+
+        - bbox: (최소경도, 최소위도, 최대경도, 최대위도), 칸 중심이 안에 있는 칸만
+        """
+        weeks = self._week_slice(start_week, end_week)
+        density = self.density[weeks].sum(axis=0, dtype=np.float64).ravel()
+        counts = self.counts[weeks].sum(axis=0, dtype=np.int64).ravel()
+
+        center_lat = self.lat0 + (np.arange(self.n_lat) + 0.5) * self.cell_deg
+        center_lon = self.lon0 + (np.arange(self.n_lon) + 0.5) * self.cell_deg
+        candidates = density > 0
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            inside_lat = (center_lat >= min_lat) & (center_lat <= max_lat)
+            inside_lon = (center_lon >= min_lon) & (center_lon <= max_lon)
+            candidates &= (inside_lat[:, None] & inside_lon[None, :]).ravel()
+
+        cells = np.flatnonzero(candidates)
+        if len(cells) > limit:
+            cells = cells[np.argpartition(-density[cells], limit - 1)[:limit]]
+        cells = cells[np.lexsort((cells, -density[cells]))]  # 밀도 내림차순, 같으면 칸 번호 순
+
+        rows, cols = np.divmod(cells, self.n_lon)
+        return [
+            {
+                "rank": rank,
+                "lat": round(float(center_lat[row]), 6),
+                "lon": round(float(center_lon[col]), 6),
+                "bounds": [
+                    round(float(center_lon[col] - self.cell_deg / 2), 6),
+                    round(float(center_lat[row] - self.cell_deg / 2), 6),
+                    round(float(center_lon[col] + self.cell_deg / 2), 6),
+                    round(float(center_lat[row] + self.cell_deg / 2), 6),
+                ],
+                "density": round(float(density[cell]), 3),
+                "count": int(counts[cell]),
+            }
+            for rank, (cell, row, col) in enumerate(zip(cells, rows, cols), start=1)
+        ]
+
+
+class RoadkillHotspots:
+    """데이터셋 스냅샷 → 핫스팟 큐브 캐시
+
+    - 스냅샷이 바뀔 때만 갱신
+    - 같은 계보의 스냅샷(API 접수 신고를 덧붙인 스냅샷)이면 이전 행 수 뒤의 행만 큐브에 반영
+    - 파일을 다시 읽었어도 새 (일자, 위도, 경도) 행 목록이 이전 목록 뒤에 행만 추가된 형태면 추가된 행만 반영
+    """
+
+    def __init__(self, cell_deg=GRID_CELL_DEG, sigma=SIGMA_CELLS):
+        self.cell_deg = cell_deg
+        self.sigma = sigma
+        self._lock = threading.Lock()
+        self._etag = None
+        self._lineage = None
+        self._size = 0
+        self._index = None
+        self.cube = None
+
+    def load(self, snapshot):
+        """스냅샷에 맞는 최신 큐브 반환"""
+        if snapshot.etag == self._etag:
+            return self.cube
+
+        with self._lock:
+            if snapshot.etag == self._etag:
+                return self.cube
+
+            index = snapshot.index
+            previous, n = self._index, self._size
+            if snapshot.lineage == self._lineage and n <= snapshot.size:
+                # 덧붙인 행만 추가 (요청 처리 중인 큐브는 건드리지 않도록 복사본에 추가)
+                cube = copy.deepcopy(self.cube)
+            elif previous is not None and n <= snapshot.size and all(
+                np.array_equal(old, new[:n], equal_nan=True)
+                for old, new in zip(previous.row_fields(), index.row_fields())
+            ):
+                cube = copy.deepcopy(self.cube)
+            else:
+                cube, n = HotspotCube(self.cell_deg, self.sigma), 0
+            if n < snapshot.size:
+                cube.add_points(*index.row_fields(n))
+
+            self.cube = cube
+            self._index = index
+            self._lineage = snapshot.lineage
+            self._size = snapshot.size
+            self._etag = snapshot.etag
+            return self.cube
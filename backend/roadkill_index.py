@@ -0,0 +1,194 @@
+"""
+Module: roadkill_index
+Description: 로드킬 데이터 조회용 인덱스 (접수일자 정렬 인덱스, 위경도 격자 인덱스, 관할기관 인덱스).
+"""
+
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+GRID_CELL_DEG = 0.05  # 격자 한 칸 크기 (도, 약 5km)
+EPOCH = np.datetime64("1970-01-01", "D")
+MISSING_DAY = np.iinfo(np.int64).min
+
+
+def to_day_number(value):
+    """"YYYY-MM-DD"/"YYYYMMDD" 문자열 → 1970-01-01 기준 일수 (형식이 틀리면 ValueError)"""
+    return int((np.datetime64(pd.Timestamp(value).date(), "D") - EPOCH).astype(np.int64))
+
+
+class RoadkillIndex:
+    """DataFrame(접수일자, 관할기관, 위도, 경도) 위의 조회 인덱스
+
+    - 조건마다 후보 행 위치(정렬된 배열)를 전체 스캔 없이 구하고 교집합으로 결합
+    - 결과 행 위치는 원본 순서(오름차순)
+    """
+
+    def __init__(self, frame):
+        self.size = len(frame)
+
+        # 접수일자 정렬 인덱스
+        dates = pd.to_datetime(frame["접수일자"], errors="coerce")
+        days = dates.values.astype("datetime64[D]")
+        self.days = np.where(dates.notna(), (days - EPOCH).astype(np.int64), MISSING_DAY)
+        self.date_order = np.argsort(self.days, kind="stable")
+        self.sorted_days = self.days[self.date_order]
+
+        # 위경도 격자 인덱스 (격자 번호 순으로 정렬한 행 위치 + 격자별 시작 위치)
+        self.lat = pd.to_numeric(frame["위도"], errors="coerce").to_numpy(dtype=np.float64)
+        self.lon = pd.to_numeric(frame["경도"], errors="coerce").to_numpy(dtype=np.float64)
+        located = np.isfinite(self.lat) & np.isfinite(self.lon)
+        if located.any():
+            self.lat0 = np.floor(self.lat[located].min() / GRID_CELL_DEG) * GRID_CELL_DEG
+            self.lon0 = np.floor(self.lon[located].min() / GRID_CELL_DEG) * GRID_CELL_DEG
+            self.n_rows = int((self.lat[located].max() - self.lat0) // GRID_CELL_DEG) + 1
+            self.n_cols = int((self.lon[located].max() - self.lon0) // GRID_CELL_DEG) + 1
+        else:
+            self.lat0 = self.lon0 = 0.0
+            self.n_rows = self.n_cols = 0
+        cells = np.full(self.size, -1, dtype=np.int64)
+        cells[located] = (
+            self._grid_row(self.lat[located]) * self.n_cols + self._grid_col(self.lon[located])
+        )
+        located_rows = np.flatnonzero(located)
+        self.cell_order = located_rows[np.argsort(cells[located], kind="stable")]
+        self.cell_starts = np.searchsorted(
+            cells[self.cell_order], np.arange(self.n_rows * self.n_cols + 1)
+        )
+
+        # 관할기관 인덱스
+        agencies = frame["관할기관"].fillna("").astype(str)
+        self.agency_rows = {
+            name: np.sort(rows) for name, rows in agencies.groupby(agencies.to_numpy()).indices.items()
+        }
+
+    def _grid_row(self, lat):
+        return np.floor((lat - self.lat0) / GRID_CELL_DEG).astype(np.int64)
+
+    def _grid_col(self, lon):
+        return np.floor((lon - self.lon0) / GRID_CELL_DEG).astype(np.int64)
+
+    def rows_in_date_range(self, start_day=None, end_day=None):
+        """접수일자가 [start_day, end_day] 안인 행 위치 (정렬 인덱스 이진 탐색)"""
+        if start_day is None:
+            lo = np.searchsorted(self.sorted_days, MISSING_DAY, side="right")  # 날짜 없는 행 제외
+        else:
+            lo = np.searchsorted(self.sorted_days, start_day, side="left")
+        if end_day is None:
+            hi = len(self.sorted_days)
+        else:
+            hi = np.searchsorted(self.sorted_days, end_day, side="right")
+        return np.sort(self.date_order[lo:hi])
+
+    def rows_in_bbox(self, min_lon, min_lat, max_lon, max_lat):
+        """경계 상자 안의 행 위치 (겹치는 격자 칸의 행만 살펴본 뒤 좌표로 정확히 거름)"""
+        if self.n_rows == 0:
+            return np.empty(0, dtype=np.int64)
+        r0, r1 = np.clip(self._grid_row(np.array([min_lat, max_lat])), 0, self.n_rows - 1)
+        c0, c1 = np.clip(self._grid_col(np.array([min_lon, max_lon])), 0, self.n_cols - 1)
+        slices = [
+            self.cell_order[self.cell_starts[r * self.n_cols + c0]:self.cell_starts[r * self.n_cols + c1 + 1]]
+            for r in range(r0, r1 + 1)
+        ]
+        rows = np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+        inside = (
+            (self.lat[rows] >= min_lat) & (self.lat[rows] <= max_lat)
+            & (self.lon[rows] >= min_lon) & (self.lon[rows] <= max_lon)
+        )
+        return np.sort(rows[inside])
+
+    def rows_for_agency(self, agency):
+        """관할기관이 agency와 같거나 "agency ..."로 시작하는 행 위치 (예: "경기" → 경기 전체)"""
+        prefix = agency + " "
+        matches = [
+            rows for name, rows in self.agency_rows.items()
+            if name == agency or name.startswith(prefix)
+        ]
+        if not matches:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(matches))
+
+    def row_fields(self, start=0):
+        """행 위치 start부터의 (일수, 위도, 경도) 배열"""
+        return self.days[start:], self.lat[start:], self.lon[start:]
+
+    def appended(self, frame):
+        """뒤에 frame 행(지금까지 덧붙인 행 전체)을 이어 붙인 인덱스 (이 인덱스는 다시 만들지 않음)"""
+        return AppendedIndex(self, RoadkillIndex(frame))
+
+    def query(self, bbox=None, start_day=None, end_day=None, agency=None):
+        """조건을 모두 만족하는 행 위치 (조건이 없으면 전체)"""
+        candidates = []
+        if start_day is not None or end_day is not None:
+            candidates.append(self.rows_in_date_range(start_day, end_day))
+        if bbox is not None:
+            candidates.append(self.rows_in_bbox(*bbox))
+        if agency:
+            candidates.append(self.rows_for_agency(agency))
+        if not candidates:
+            return np.arange(self.size)
+
+        candidates.sort(key=len)
+        rows = candidates[0]
+        for other in candidates[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+
+class AppendedIndex:
+    """파일 행 인덱스(base) 뒤에 덧붙인 행 인덱스(tail)를 이어 붙인 인덱스 (RoadkillIndex와 같은 조회 API)
+
+    - 덧붙인 행(API 접수 신고)만 작은 RoadkillIndex로 날짜 정렬/격자/관할기관 색인, base는 그대로 공유
+    - 행 추가 비용은 덧붙인 행 수에만 비례 (파일을 다시 읽으면 하나의 RoadkillIndex로 다시 구축)
+    - 조회는 base 결과 뒤에 tail 결과(행 위치 + base 행 수)를 이어 붙여 원본 순서 유지
+    """
+
+    def __init__(self, base, tail):
+        self.base = base
+        self.tail = tail
+        self.size = base.size + tail.size
+
+    # 전체 행 배열은 처음 쓸 때 한 번만 이어 붙임 (덧붙인 행만 필요하면 row_fields 사용)
+    @cached_property
+    def days(self):
+        return np.concatenate([self.base.days, self.tail.days])
+
+    @cached_property
+    def lat(self):
+        return np.concatenate([self.base.lat, self.tail.lat])
+
+    @cached_property
+    def lon(self):
+        return np.concatenate([self.base.lon, self.tail.lon])
+
+    def row_fields(self, start=0):
+        """행 위치 start부터의 (일수, 위도, 경도) 배열 (start가 덧붙인 행이면 tail만 사용)"""
+        if start >= self.base.size:
+            return self.tail.row_fields(start - self.base.size)
+        return tuple(
+            np.concatenate([head, rest])
+            for head, rest in zip(self.base.row_fields(start), self.tail.row_fields())
+        )
+
+    def appended(self, frame):
+        """덧붙인 행을 frame(지금까지 덧붙인 행 전체)으로 바꾼 인덱스"""
+        return AppendedIndex(self.base, RoadkillIndex(frame))
+
+    def _combine(self, method, *args, **kwargs):
+        rows = getattr(self.base, method)(*args, **kwargs)
+        tail_rows = getattr(self.tail, method)(*args, **kwargs)
+        return np.concatenate([rows, tail_rows + self.base.size])
+
+    def rows_in_date_range(self, start_day=None, end_day=None):
+        return self._combine("rows_in_date_range", start_day, end_day)
+
+    def rows_in_bbox(self, min_lon, min_lat, max_lon, max_lat):
+        return self._combine("rows_in_bbox", min_lon, min_lat, max_lon, max_lat)
+
+    def rows_for_agency(self, agency):
+        return self._combine("rows_for_agency", agency)
+
+    def query(self, bbox=None, start_day=None, end_day=None, agency=None):
+        """조건을 모두 만족하는 행 위치 (base/tail 각각 조회 후 이어 붙임)"""
+        return self._combine("query", bbox=bbox, start_day=start_day, end_day=end_day, agency=agency)
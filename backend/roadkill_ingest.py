@@ -0,0 +1,444 @@
+"""
+Module: roadkill_ingest
+Description: API 신고 접수 (WAL 기록 → 데이터셋에 즉시 반영 → 백그라운드 관측소/날씨 마이크로 배치 매칭 → 결과 테이블 압축).
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from merge_manifest import (
+    MANIFEST_FILE, OUTPUT_TABLES, add_manifest_rows, file_sha256, load_processed_outputs, merge_incremental,
+    row_hashes, row_keys
+)
+from processed_store import append_table, read_table, table_paths, write_table
+from roadkill_consolidate import (
+    INGEST_SOURCE, KOREA_LAT, KOREA_LON, MERGED_COLUMNS, MERGED_TABLE, STATE_FILE,
+    file_state, load_state, save_state
+)
+from weather_matcher import DAY_TOLERANCE, WeatherMatcher, order_weather_table
+from weather_reader import empty_weather_frame, read_weather_data
+
+WAL_FILE = "ingest_wal.jsonl"
+BATCH_SECONDS = 5       # 마이크로 배치 매칭 주기
+COMPACT_SECONDS = 60    # 매칭된 신고를 결과 테이블에 반영하는 주기
+COMPACT_ROWS = 1000     # 이만큼 쌓이면 주기와 관계없이 반영
+MAX_AGENCY_LENGTH = 50
+
+# API 접수 신고 일련번호 (연도별로 이 값 다음부터, 원본 파일 일련번호와 겹치지 않도록)
+INGEST_SERIAL_BASE = 5_000_000
+
+# 접수일자 하한 (원본 로드킬 데이터 첫 연도, roadkill_2020.csv)
+MIN_INCIDENT_YEAR = 2020
+
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+TIME_PATTERN = re.compile(r"^(\d{1,2}):(\d{2})$")
+
+
+def parse_report(item, now=None):
+    """요청 JSON 객체 하나 → 원본 컬럼 dict (형식이 틀리면 ValueError)
+
+    - latitude, longitude: 필수 (남한 좌표 범위)
+    - incident_date: YYYY-MM-DD (생략 시 오늘, MIN_INCIDENT_YEAR년 1월 1일 ~ 오늘), incident_time: HH:MM (생략 시 현재 시각)
+    - agency: 관할기관 (생략 가능)
+    """
+    if not isinstance(item, dict):
+        raise ValueError("신고는 JSON 객체여야 합니다")
+    now = now or pd.Timestamp.now()
+    try:
+        lat = float(item["latitude"])
+        lon = float(item["longitude"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("latitude, longitude는 숫자여야 합니다")
+    if not (KOREA_LAT[0] <= lat <= KOREA_LAT[1] and KOREA_LON[0] <= lon <= KOREA_LON[1]):
+        raise ValueError(f"좌표가 남한 범위를 벗어났습니다: ({lat}, {lon})")
+
+    date = str(item.get("incident_date") or now.strftime("%Y-%m-%d"))
+    try:
+        if not DATE_PATTERN.match(date):
+            raise ValueError
+        day = datetime.strptime(date, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"incident_date는 YYYY-MM-DD 형식이어야 합니다: {date}")
+    if day > now.date():
+        raise ValueError(f"incident_date가 오늘 이후입니다: {date}")
+    if day.year < MIN_INCIDENT_YEAR:
+        raise ValueError(f"incident_date는 {MIN_INCIDENT_YEAR}년 이후여야 합니다: {date}")
+
+    report_time = item.get("incident_time") or now.strftime("%H:%M")
+    match = TIME_PATTERN.match(str(report_time))
+    if not match or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+        raise ValueError(f"incident_time은 HH:MM 형식이어야 합니다: {report_time}")
+
+    agency = item.get("agency")
+    if agency is not None:
+        agency = str(agency).strip()[:MAX_AGENCY_LENGTH] or None
+
+    return {
+        "접수일자": date,
+        "접수시각": f"{int(match.group(1))}:{match.group(2)}",  # 원본 표기 (예: 0:20)
+        "관할기관": agency,
+        "GPS X": lon,
+        "GPS Y": lat,
+    }
+
+
+def dataset_rows(records):
+    """WAL 기록 → roadkill_data 컬럼(CSV 표기) DataFrame"""
+    return pd.DataFrame({
+        "일련번호": np.array([r["일련번호"] for r in records], dtype=np.int64),
+        "접수일자": np.array([r["접수일자"] for r in records], dtype=object),
+        "접수시각": np.array([r["접수시각"] for r in records], dtype=object),
+        "관할기관": np.array([r["관할기관"] for r in records], dtype=object),  # 없으면 None (JSON null)
+        "위도": np.array([r["GPS Y"] for r in records], dtype=np.float64),
+        "경도": np.array([r["GPS X"] for r in records], dtype=np.float64),
+    })
+
+
+def matcher_rows(records):
+    """WAL 기록 → 매칭 입력 DataFrame (weather_roadkill_marged 전처리 결과와 같은 형식)"""
+    frame = pd.DataFrame(records, columns=MERGED_COLUMNS)
+    frame["일련번호"] = frame["일련번호"].astype(np.int64)
+    frame["접수일자"] = pd.to_datetime(frame["접수일자"])
+    frame["GPS X"] = frame["GPS X"].astype(np.float64)
+    frame["GPS Y"] = frame["GPS Y"].astype(np.float64)
+    return frame
+
+
+class IngestLog:
+    """접수 신고 WAL (한 줄에 JSON 하나, 추가할 때마다 fsync)"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, records):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self):
+        """기록 전체 (마지막 줄이 쓰다 만 줄이면 무시)"""
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records
+
+    def rewrite(self, records):
+        """남길 기록만으로 다시 쓰기 (임시 파일에 쓴 뒤 교체)"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class ReportIngestor:
+    """신고 접수 → 즉시 조회 → 마이크로 배치 매칭 → 압축
+
+    - ingest: 검증 후 일련번호를 붙여 WAL에 기록하고 데이터셋 스냅샷 뒤에 바로 덧붙임 (/api/roadkill에서 즉시 조회)
+    - 백그라운드 스레드가 batch_seconds마다 새 신고를 관측소/날씨와 매칭 (관측소·기상 파일은 바뀔 때만 다시 읽음)
+    - compact_seconds마다(또는 compact_rows건 이상 쌓이면) 매칭 결과를 원본(roadkill_ingest.csv, 병합 테이블)과
+      결과 테이블 3개, 증분 처리 기록에 반영하고 WAL에서 제거
+    - 압축 각 단계는 (연도, 일련번호) 키 기준이라 중간에 멈춘 뒤 WAL로 다시 실행해도 중복되지 않음
+    """
+
+    def __init__(self, dataset, processed_dir, roadkill_dir, stations_path, weather_path,
+                 day_tolerance=DAY_TOLERANCE, batch_seconds=BATCH_SECONDS,
+                 compact_seconds=COMPACT_SECONDS, compact_rows=COMPACT_ROWS):
+        self.dataset = dataset
+        self.processed_dir = processed_dir
+        self.roadkill_dir = roadkill_dir
+        self.stations_path = stations_path
+        self.weather_path = weather_path
+        self.day_tolerance = day_tolerance
+        self.batch_seconds = batch_seconds
+        self.compact_seconds = compact_seconds
+        self.compact_rows = compact_rows
+        self.log = IngestLog(os.path.join(processed_dir, WAL_FILE))
+
+        self._lock = threading.Lock()       # WAL, 대기 목록, 일련번호
+        self._work_lock = threading.Lock()  # 매칭/압축 (한 번에 하나)
+        self._thread = None
+        self._stop = threading.Event()
+        self._pending = []   # 아직 매칭하지 않은 기록
+        self._matched = []   # (기록 목록, 매칭 결과) - 압축 대기
+        self._next_seq = 1
+        self._next_serial = None
+        self._recovered = False  # WAL 복구 완료 전에는 접수하지 않음
+        self._matcher = None
+        self._matcher_signature = None
+        self._last_compaction = time.monotonic()
+        self.counters = {"ingested": 0, "matched": 0, "compacted": 0}
+        self.last_batch_at = None
+        self.last_compaction_at = None
+        self.last_error = None
+
+    # ---------- 접수 ----------
+
+    def ensure_started(self):
+        """처음 호출될 때 WAL 복구 후 백그라운드 스레드 시작
+
+        - 복구가 실패해도 예외를 던지지 않고 last_error에 남김 (스레드가 batch_seconds마다 다시 시도)
+        """
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._try_recover()
+            self._thread = threading.Thread(target=self._run, name="roadkill-ingest", daemon=True)
+            self._thread.start()
+
+    @property
+    def ready(self):
+        """WAL 복구가 끝나 신고를 접수할 수 있는지"""
+        return self._recovered
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _file_keys(self):
+        """병합 테이블에 이미 있는 (연도, 일련번호) 키"""
+        try:
+            merged = read_table(MERGED_TABLE, columns=["일련번호", "접수일자"], processed_dir=self.roadkill_dir)
+        except FileNotFoundError:
+            return np.empty(0, dtype=np.int64)
+        merged = merged.dropna()
+        return row_keys(merged["일련번호"], merged["접수일자"])
+
+    def _try_recover(self):
+        """WAL 복구 (self._lock 안에서 호출, 실패하면 last_error에 기록하고 False)"""
+        try:
+            self._recover()
+        except Exception as e:
+            error = f"WAL 복구 실패 - {type(e).__name__}: {e}"
+            if error != self.last_error:
+                print(f"[❌ ingest] {error}")
+            self.last_error = error
+            return False
+        self._recovered = True
+        return True
+
+    def _recover(self):
+        """WAL에 남은 기록 → 대기 목록 + 데이터셋 (이미 데이터셋 파일에 있는 행은 덧붙이지 않음)"""
+        records = self.log.read()
+        keys = self._file_keys()
+        years = keys // 10_000_000
+        serials = keys % 10_000_000
+        ingested = serials > INGEST_SERIAL_BASE
+        self._next_serial = {}
+        for year, serial in zip(years[ingested], serials[ingested]):
+            self._next_serial[int(year)] = max(self._next_serial.get(int(year), 0), int(serial) + 1)
+        if not records:
+            return
+        for record in records:
+            year = int(record["접수일자"][:4])
+            self._next_serial[year] = max(self._next_serial.get(year, 0), record["일련번호"] + 1)
+        self._next_seq = max(record["seq"] for record in records) + 1
+        self._pending = records
+
+        snapshot = self.dataset.load()
+        shown = row_keys(snapshot.frame["일련번호"], snapshot.frame["접수일자"])
+        record_keys = row_keys([r["일련번호"] for r in records], [r["접수일자"] for r in records])
+        missing = [r for r, shown_row in zip(records, np.isin(record_keys, shown)) if not shown_row]
+        if missing:
+            self.dataset.append_rows(dataset_rows(missing))
+        print(f"[ingest] WAL 복구: {len(records):,}건 (매칭 대기)")
+
+    def ingest(self, items):
+        """신고 목록 접수 → 일련번호를 붙인 기록 목록
+
+        - 하나라도 형식이 틀리면 아무것도 기록하지 않고 ValueError
+        - WAL 복구가 아직 성공하지 못했으면 RuntimeError (일련번호가 WAL 기록과 겹치지 않도록)
+        """
+        now = pd.Timestamp.now()
+        parsed = []
+        for i, item in enumerate(items):
+            try:
+                parsed.append(parse_report(item, now))
+            except ValueError as e:
+                raise ValueError(f"{i}번째 신고: {e}")
+
+        self.ensure_started()
+        with self._lock:
+            if not self._recovered:
+                raise RuntimeError(f"WAL 복구 전이라 신고를 접수할 수 없습니다 ({self.last_error})")
+            records = []
+            for report in parsed:
+                year = int(report["접수일자"][:4])
+                serial = max(self._next_serial.get(year, 0), INGEST_SERIAL_BASE + 1)
+                self._next_serial[year] = serial + 1
+                records.append({"seq": self._next_seq, "일련번호": serial, **report})
+                self._next_seq += 1
+            self.log.append(records)
+            self._pending.extend(records)
+            self.dataset.append_rows(dataset_rows(records))
+            self.counters["ingested"] += len(records)
+        return records
+
+    # ---------- 백그라운드 매칭 / 압축 ----------
+
+    def _run(self):
+        while not self._stop.wait(self.batch_seconds):
+            if not self._recovered:
+                with self._lock:
+                    if not self._try_recover():
+                        continue
+            try:
+                self.process()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"[❌ ingest] {self.last_error}")
+
+    def process(self, compact=None):
+        """대기 중인 신고 매칭 + (주기가 되었거나 compact=True면) 압축 → (매칭 건수, 압축 건수)"""
+        with self._work_lock:
+            matched = self.match_pending()
+            waiting = sum(len(records) for records, _ in self._matched)
+            if compact is None:
+                compact = waiting >= self.compact_rows or (
+                    waiting > 0 and time.monotonic() - self._last_compaction >= self.compact_seconds
+                )
+            compacted = self._compact() if compact and waiting else 0
+            return matched, compacted
+
+    def _get_matcher(self):
+        """관측소/기상 파일이 바뀌었을 때만 WeatherMatcher 다시 구축 (관측소 파일이 없으면 FileNotFoundError)"""
+        signature = []
+        for path in (self.stations_path, self.weather_path):
+            stat = os.stat(path) if os.path.exists(path) else None
+            signature.append((stat.st_mtime_ns, stat.st_size) if stat else None)
+        if signature[0] is None:
+            raise FileNotFoundError(f"관측소 파일이 없습니다: {self.stations_path}")
+        if self._matcher is None or signature != self._matcher_signature:
+            stations_df = pd.read_csv(self.stations_path, encoding="utf-8-sig")
+            if signature[1] is not None:
+                weather_df_valid, operating_station_ids = read_weather_data(self.weather_path)
+            else:
+                weather_df_valid, operating_station_ids = empty_weather_frame(), set()
+            self._matcher = WeatherMatcher(stations_df, weather_df_valid, operating_station_ids, self.day_tolerance)
+            self._matcher_signature = signature
+        return self._matcher
+
+    def match_pending(self):
+        """대기 중인 신고를 한 번에 매칭 → 매칭한 건수 (실패하면 대기 목록에 되돌림)"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        try:
+            results = self._get_matcher().match(matcher_rows(batch), verbose=False)
+        except Exception:
+            with self._lock:
+                self._pending = batch + self._pending
+            raise
+        self._matched.append((batch, results))
+        self.counters["matched"] += len(batch)
+        self.last_batch_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        return len(batch)
+
+    def _append_source(self, raw, keys):
+        """roadkill_ingest.csv에 없는 행만 추가 (roadkill_consolidate.py로 다시 통합해도 유지)"""
+        path = os.path.join(self.roadkill_dir, INGEST_SOURCE)
+        if os.path.exists(path):
+            existing = pd.read_csv(path, encoding="utf-8-sig", usecols=["일련번호", "접수일자"], dtype=str)
+            raw = raw[~np.isin(keys, row_keys(existing["일련번호"], existing["접수일자"]))]
+            raw.to_csv(path, mode="a", header=False, index=False, encoding="utf-8")
+        else:
+            raw.to_csv(path, index=False, encoding="utf-8-sig")
+        return path
+
+    def _append_merged(self, raw, keys, source_path):
+        """병합 테이블에 없는 행만 추가하고 통합 상태에 roadkill_ingest.csv 현재 상태 기록"""
+        new = raw[~np.isin(keys, self._file_keys())]
+        if len(new):
+            append_table(new, MERGED_TABLE, self.roadkill_dir)
+        state_path = os.path.join(self.roadkill_dir, STATE_FILE)
+        state = load_state(state_path)
+        if state is not None:
+            sources = dict(state["sources"])
+            sources[INGEST_SOURCE] = file_state(source_path)
+            last_date = max(filter(None, [state["last_date"], raw["접수일자"].max()]))
+            save_state(state_path, sources, state["rows"] + len(new), last_date)
+
+    def _upsert_processed(self, existing, updates, keys):
+        """기존 결과 테이블 3개에 upsert (접수 신고는 기존 행 뒤에)"""
+        old_keys = row_keys(existing[0]["일련번호"], existing[0]["접수일자"])
+        order_keys = np.concatenate([old_keys[~np.isin(old_keys, keys)], keys])
+        results = merge_incremental(existing, updates, order_keys)
+        for table, name in zip(results, OUTPUT_TABLES):
+            write_table(table, name, self.processed_dir)
+
+    def _compact(self):
+        """매칭이 끝난 신고를 원본/병합 테이블/결과 테이블/처리 기록에 반영하고 WAL에서 제거 → 반영 건수
+
+        - 결과 테이블이 하나라도 없으면 아무것도 쓰지 않고 FileNotFoundError
+          (접수 신고만으로 테이블을 덮어쓰지 않도록, 기록은 WAL과 덧붙인 행에 남아 다음 주기에 다시 시도)
+        """
+        self._last_compaction = time.monotonic()
+        existing = load_processed_outputs(self.processed_dir, missing_ok=False)
+
+        parts = self._matched
+        records = [record for batch, _ in parts for record in batch]
+        roadkill = pd.concat([results[0] for _, results in parts], ignore_index=True)
+        matching = pd.concat([results[2] for _, results in parts], ignore_index=True)
+        weather_pool = pd.concat([results[1] for _, results in parts], ignore_index=True)
+        weather = order_weather_table(weather_pool, matching) if len(matching) else weather_pool.iloc[:0]
+
+        raw = pd.DataFrame(records, columns=MERGED_COLUMNS)
+        keys = row_keys(raw["일련번호"], raw["접수일자"])
+
+        # 1️⃣ 원본 + 병합 테이블 (다음 전체/증분 병합에도 포함되도록)
+        source_path = self._append_source(raw, keys)
+        self._append_merged(raw, keys, source_path)
+
+        # 2️⃣ 결과 테이블 (API 데이터셋이 파일 변경을 감지해 다시 읽고, 덧붙인 행 목록에서 제외)
+        self._upsert_processed(existing, (roadkill, weather, matching), keys)
+
+        # 3️⃣ 증분 처리 기록 (weather_roadkill_marged.py --incremental이 이 행들을 다시 매칭하지 않도록)
+        exact = matching[matching["일자_오프셋"] == 0]
+        merged_path = table_paths(MERGED_TABLE, self.roadkill_dir)[0]
+        add_manifest_rows(
+            os.path.join(self.processed_dir, MANIFEST_FILE), {"roadkill": file_sha256(merged_path)},
+            keys, row_hashes(matcher_rows(records)), row_keys(exact["일련번호"], exact["접수일자"])
+        )
+
+        # 4️⃣ WAL에는 아직 매칭하지 않은 기록만 남김
+        with self._lock:
+            self.log.rewrite(self._pending)
+        self._matched = []
+        self._last_compaction = time.monotonic()
+        self.counters["compacted"] += len(records)
+        self.last_compaction_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        print(f"[ingest] {len(records):,}건 반영 (날씨 매칭 {len(matching):,}건)")
+        return len(records)
+
+    def status(self):
+        return {
+            **self.counters,
+            "recovered": self._recovered,
+            "pending": len(self._pending),
+            "awaiting_compaction": sum(len(records) for records, _ in self._matched),
+            "overlay_rows": self.dataset.overlay_rows,
+            "last_batch_at": self.last_batch_at,
+            "last_compaction_at": self.last_compaction_at,
+            "last_error": self.last_error,
+        }
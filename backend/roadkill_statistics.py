@@ -0,0 +1,409 @@
+"""
+Module: roadkill_statistics
+Description: 통계 API용 집계 큐브 (일자 × 관할기관 × 관측소 건수, 일자별 매칭 날씨 합계)와 캐시.
+"""
+
+import copy
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from merge_manifest import row_keys
+from processed_store import read_table, table_paths, to_csv_frame
+from roadkill_dataset import json_records
+from roadkill_index import EPOCH, MISSING_DAY
+from weather_index import pack_keys, to_day_numbers
+from weather_matcher import MAX_DAY_TOLERANCE, WEATHER_FIELDS
+
+# 셀 키 비트 배치: (일자 + 1) << 40 | 관할기관 코드 << 20 | (일자_오프셋 + 8) << 16 | (지점번호 + 1)
+FIELD_BITS = 20
+FIELD_MASK = (1 << FIELD_BITS) - 1
+STATION_BITS = 16
+STATION_MASK = (1 << STATION_BITS) - 1
+OFFSET_BIAS = MAX_DAY_TOLERANCE + 1  # 일자_오프셋 -7~7 → 1~15 (4비트)
+
+
+class StatisticsCube:
+    """로드킬 집계 큐브
+
+    - 기본 셀: (접수일자, 관할기관, 매칭 관측소, 관측일 오프셋) → 건수 (희소 배열, 행을 추가할 때만 갱신)
+    - 요약: 일자별/시도별 누적합과 일자별 날씨 합계 (행을 추가하면 새 행 몫만 더하고, 날씨가 바뀌면 셀에서 다시 계산)
+    - 조회: 누적합 차이로 구간 합을 구하므로 원본 행을 다시 훑지 않음
+    """
+
+    def __init__(self, weather=None):
+        self.agencies = []
+        self._agency_codes = {}
+        self.cell_keys = np.empty(0, dtype=np.int64)
+        self.cell_counts = np.empty(0, dtype=np.int64)
+        self.n_rows = 0
+        self.set_weather(weather)
+
+    def set_weather(self, weather):
+        """날씨 테이블(지점번호, 일자, WEATHER_FIELDS) 지정 → (지점번호, 일자) 키 정렬 배열"""
+        if weather is None or len(weather) == 0:
+            self.weather_keys = np.empty(0, dtype=np.int64)
+            self.weather_values = np.empty((0, len(WEATHER_FIELDS)))
+        else:
+            keys = pack_keys(weather["지점번호"].to_numpy(), to_day_numbers(weather["일자"]))
+            keys, first = np.unique(keys, return_index=True)  # 같은 키는 첫 행 사용
+            self.weather_keys = keys
+            self.weather_values = weather[WEATHER_FIELDS].to_numpy(dtype=np.float64)[first]
+        self._rollup()
+
+    def add_rows(self, days, agencies, stations, offsets=None):
+        """행 추가
+
+        - days: 1970-01-01 기준 일수 또는 MISSING_DAY, agencies: 관할기관 문자열, stations: 지점번호 또는 -1
+        - offsets: 매칭 날씨의 관측일 - 접수일 (없으면 0)
+        - 새 행의 건수/날씨 합계만 요약 누적 배열에 더함 (처음이거나 새 시도가 생기면 요약 전체를 다시 계산)
+        """
+        days = np.asarray(days, dtype=np.int64)
+        codes, new_agencies = self._encode_agencies(agencies)
+        stations = np.asarray(stations, dtype=np.int64)
+        offsets = np.zeros(len(days), dtype=np.int64) if offsets is None else np.asarray(offsets, dtype=np.int64)
+        keys = (
+            (np.where(days == MISSING_DAY, 0, days + 1) << (2 * FIELD_BITS))
+            | (codes << FIELD_BITS) | ((offsets + OFFSET_BIAS) << STATION_BITS) | (stations + 1)
+        )
+        keys, counts = np.unique(keys, return_counts=True)
+        self._merge_cells(keys, counts)
+        self.n_rows += int(counts.sum())
+
+        new_regions = {name.split(" ")[0] for name in new_agencies if name} - set(self.regions)
+        if self.n_days == 0 or new_regions:
+            self._rollup()
+        else:
+            self._extend_days(keys)
+            self._add_summary(*self._summarize(keys, counts))
+
+    def _encode_agencies(self, agencies):
+        """관할기관 문자열 배열 → (코드 배열, 처음 보는 관할기관 목록)
+
+        - 행마다 사전을 찾지 않고 고유값으로 묶은 뒤 기존 목록과 한 번에 대조, 새 고유값만 코드 부여
+        """
+        positions, uniques = pd.factorize(pd.Series(agencies, dtype=object).fillna(""))
+        unique_codes = pd.Index(self.agencies, dtype=object).get_indexer(uniques)
+        new_agencies = [name for name, code in zip(uniques, unique_codes) if code < 0]
+        unique_codes[unique_codes < 0] = [self._agency_code(name) for name in new_agencies]
+        return unique_codes.astype(np.int64)[positions], new_agencies
+
+    def _agency_code(self, name):
+        name = name or ""
+        if name not in self._agency_codes:
+            self._agency_codes[name] = len(self.agencies)
+            self.agencies.append(name)
+        return self._agency_codes[name]
+
+    def _merge_cells(self, keys, counts):
+        """정렬된 셀 배열에 (키, 건수) 더하기 (keys는 정렬·중복 없음, 있는 셀은 건수만 더하고 없는 셀은 끼워 넣음)"""
+        pos = np.searchsorted(self.cell_keys, keys)
+        found = np.zeros(len(keys), dtype=bool)
+        inside = pos < len(self.cell_keys)
+        found[inside] = self.cell_keys[pos[inside]] == keys[inside]
+        cell_counts = self.cell_counts.copy()
+        cell_counts[pos[found]] += counts[found]
+        self.cell_keys = np.insert(self.cell_keys, pos[~found], keys[~found])
+        self.cell_counts = np.insert(cell_counts, pos[~found], counts[~found])
+
+    def _rollup(self):
+        """셀 → 요약 배열 (일자별/시도별 누적 건수, 일자별 날씨 누적 합계)"""
+        # 시도 = 관할기관 첫 단어 (관할기관이 없으면 제외)
+        self.regions = sorted({name.split(" ")[0] for name in self.agencies if name})
+
+        # 일자 범위 (접수일자가 있는 셀만)
+        days = (self.cell_keys >> (2 * FIELD_BITS)) - 1
+        dated = days >= 0
+        if dated.any():
+            self.first_day = int(days[dated].min())
+            self.n_days = int(days[dated].max()) - self.first_day + 1
+        else:
+            self.first_day, self.n_days = 0, 0
+
+        n_fields = len(WEATHER_FIELDS)
+        self.region_totals = np.zeros(len(self.regions), dtype=np.int64)
+        self.cum_daily = np.zeros(self.n_days + 1, dtype=np.int64)
+        self.cum_region = np.zeros((len(self.regions), self.n_days + 1), dtype=np.int64)
+        self.cum_matched = np.zeros(self.n_days + 1, dtype=np.int64)
+        self.cum_weather_sum = np.zeros((self.n_days + 1, n_fields))
+        self.cum_weather_n = np.zeros((self.n_days + 1, n_fields))
+        self._add_summary(*self._summarize(self.cell_keys, self.cell_counts))
+        self._month_boundaries()
+
+    def _summarize(self, cell_keys, counts):
+        """셀 → 요약 (시도별 건수, 일자별/시도×일자별 건수, 일자별 매칭 건수·날씨 합계·관측 건수)
+
+        - 현재 시도 목록과 일자 범위 기준 (셀의 시도/일자가 모두 그 안에 있어야 함)
+        """
+        days = (cell_keys >> (2 * FIELD_BITS)) - 1
+        codes = (cell_keys >> FIELD_BITS) & FIELD_MASK
+        stations = (cell_keys & STATION_MASK) - 1
+        weather_offsets = ((cell_keys & FIELD_MASK) >> STATION_BITS) - OFFSET_BIAS
+
+        region_of_agency = np.array(
+            [self.regions.index(name.split(" ")[0]) if name else -1 for name in self.agencies] or [-1],
+            dtype=np.int64
+        )
+        cell_regions = region_of_agency[codes] if len(codes) else codes
+        has_region = cell_regions >= 0
+        region_totals = np.bincount(
+            cell_regions[has_region], weights=counts[has_region], minlength=len(self.regions)
+        ).astype(np.int64)
+
+        dated = days >= 0
+        offsets = days[dated] - self.first_day
+        dated_counts = counts[dated]
+        daily = np.bincount(offsets, weights=dated_counts, minlength=self.n_days)
+
+        region_daily = np.zeros((len(self.regions), self.n_days))
+        mask = has_region[dated]
+        np.add.at(region_daily, (cell_regions[dated][mask], offsets[mask]), dated_counts[mask])
+
+        # 매칭 관측소의 관측일(접수일 + 오프셋) 날씨를 건수만큼 가중해 접수 일자별 합계/관측 건수
+        n_fields = len(WEATHER_FIELDS)
+        weather_sum = np.zeros((self.n_days, n_fields))
+        weather_n = np.zeros((self.n_days, n_fields))
+        matched = np.zeros(self.n_days)
+        joined = stations[dated] >= 0
+        if joined.any() and len(self.weather_keys):
+            keys = pack_keys(stations[dated][joined], (days + weather_offsets)[dated][joined])
+            pos = np.minimum(np.searchsorted(self.weather_keys, keys), len(self.weather_keys) - 1)
+            found = self.weather_keys[pos] == keys
+            values = np.where(found[:, None], self.weather_values[pos], np.nan)
+            weights = dated_counts[joined]
+            np.add.at(matched, offsets[joined], weights)
+            np.add.at(weather_sum, offsets[joined], np.nan_to_num(values) * weights[:, None])
+            np.add.at(weather_n, offsets[joined], ~np.isnan(values) * weights[:, None])
+        return region_totals, daily, region_daily, matched, weather_sum, weather_n
+
+    def _add_summary(self, region_totals, daily, region_daily, matched, weather_sum, weather_n):
+        """요약을 누적 배열에 더함"""
+        def cumulative(values, axis=0):
+            shape = list(values.shape)
+            shape[axis] = 1
+            return np.concatenate([np.zeros(shape), np.cumsum(values, axis=axis)], axis=axis)
+
+        self.region_totals = self.region_totals + region_totals
+        self.cum_daily = self.cum_daily + cumulative(daily).astype(np.int64)
+        self.cum_region = self.cum_region + cumulative(region_daily, axis=1).astype(np.int64)
+        self.cum_matched = self.cum_matched + cumulative(matched).astype(np.int64)
+        self.cum_weather_sum = self.cum_weather_sum + cumulative(weather_sum)
+        self.cum_weather_n = self.cum_weather_n + cumulative(weather_n)
+
+    def _extend_days(self, cell_keys):
+        """셀 일자가 현재 범위 밖이면 누적 배열 앞뒤로 일자 추가 (앞은 0, 뒤는 마지막 누적값)"""
+        days = (cell_keys >> (2 * FIELD_BITS)) - 1
+        days = days[days >= 0]
+        if not len(days):
+            return
+        before = max(self.first_day - int(days.min()), 0)
+        after = max(int(days.max()) - (self.first_day + self.n_days - 1), 0)
+        if not before and not after:
+            return
+        for name, axis in (
+            ("cum_daily", 0), ("cum_region", 1), ("cum_matched", 0), ("cum_weather_sum", 0), ("cum_weather_n", 0)
+        ):
+            pad = [(0, 0)] * getattr(self, name).ndim
+            pad[axis] = (before, 0)
+            values = np.pad(getattr(self, name), pad)
+            pad[axis] = (0, after)
+            setattr(self, name, np.pad(values, pad, mode="edge"))
+        self.first_day -= before
+        self.n_days += before + after
+        self._month_boundaries()
+
+    def _month_boundaries(self):
+        """월 경계 (일자 위치 기준 월 시작 위치)"""
+        months = (EPOCH + self.first_day + np.arange(self.n_days)).astype("datetime64[M]")
+        starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]]) if self.n_days else np.empty(0, np.int64)
+        self.month_starts = np.append(starts, self.n_days)
+        self.month_labels = [str(m) for m in months[starts]]
+
+    def _day_range(self, start_day=None, end_day=None):
+        """[start_day, end_day] → 일자 위치 구간 [i0, i1) (범위 밖은 잘라냄)"""
+        i0 = 0 if start_day is None else int(np.clip(start_day - self.first_day, 0, self.n_days))
+        i1 = self.n_days if end_day is None else int(np.clip(end_day - self.first_day + 1, 0, self.n_days))
+        return i0, max(i0, i1)
+
+    def _month_segments(self, i0, i1):
+        """구간 [i0, i1)과 겹치는 월별 (라벨, 시작, 끝) 목록"""
+        m0 = np.searchsorted(self.month_starts, i0, side="right") - 1
+        m1 = np.searchsorted(self.month_starts, i1, side="left")
+        return [
+            (self.month_labels[m], max(self.month_starts[m], i0), min(self.month_starts[m + 1], i1))
+            for m in range(max(m0, 0), m1)
+        ]
+
+    def by_region(self, start_day=None, end_day=None):
+        """시도별 건수 (건수 내림차순)"""
+        if start_day is None and end_day is None:
+            counts = self.region_totals
+        else:
+            i0, i1 = self._day_range(start_day, end_day)
+            counts = self.cum_region[:, i1] - self.cum_region[:, i0]
+        order = np.argsort(-counts, kind="stable")
+        return [
+            {"region": self.regions[i], "count": int(counts[i])} for i in order if counts[i] > 0
+        ]
+
+    def by_month(self, start_day=None, end_day=None, region=None):
+        """월별 건수 (region을 주면 해당 시도만)"""
+        if region is None:
+            cum = self.cum_daily
+        elif region in self.regions:
+            cum = self.cum_region[self.regions.index(region)]
+        else:
+            return []
+        rows = []
+        for label, a, b in self._month_segments(*self._day_range(start_day, end_day)):
+            count = int(cum[b] - cum[a])
+            if count:
+                rows.append({"month": label, "count": count})
+        return rows
+
+    def weather_by_month(self, start_day=None, end_day=None):
+        """월별 건수 + 매칭된 관측소 날씨 평균 (로드킬 건수 가중)"""
+        rows = []
+        for label, a, b in self._month_segments(*self._day_range(start_day, end_day)):
+            count = int(self.cum_daily[b] - self.cum_daily[a])
+            if not count:
+                continue
+            sums = self.cum_weather_sum[b] - self.cum_weather_sum[a]
+            ns = self.cum_weather_n[b] - self.cum_weather_n[a]
+            row = {"month": label, "count": count, "matched": int(self.cum_matched[b] - self.cum_matched[a])}
+            for field, total, n in zip(WEATHER_FIELDS, sums, ns):
+                row[field] = round(float(total / n), 2) if n else None
+            rows.append(row)
+        return rows
+
+
+class RoadkillStatistics:
+    """데이터셋 스냅샷 + 매칭/날씨/동물 결과 테이블 → 통계 큐브 캐시
+
+    - 스냅샷이나 결과 테이블 파일이 바뀔 때만 갱신
+    - 결과 테이블은 그대로이고 같은 계보의 스냅샷(API 접수 신고를 덧붙인 스냅샷)이면
+      테이블을 다시 읽지 않고 이전 행 수 뒤의 행만 큐브에 반영
+    - 새 (일자, 관할기관, 관측소) 행 목록이 이전 목록 뒤에 행만 추가된 형태면 추가된 행만 큐브에 반영
+    """
+
+    def __init__(self, processed_dir):
+        self.processed_dir = processed_dir
+        self._lock = threading.Lock()
+        self._signature = None
+        self._lineage = None
+        self._row_chunks = []
+        self._matches = None
+        self.cube = None
+        self.weather_records = []
+        self.animal_records = []
+
+    @property
+    def _size(self):
+        return sum(len(chunk[0]) for chunk in self._row_chunks)
+
+    def _tables_signature(self):
+        signature = []
+        for name in ("roadkill_weather_matching", "weather_data", "animalType_data"):
+            path = table_paths(name, self.processed_dir)[0]
+            stat = os.stat(path) if os.path.exists(path) else None
+            signature.append((stat.st_mtime_ns, stat.st_size) if stat else None)
+        return tuple(signature)
+
+    def _read(self, name):
+        try:
+            return read_table(name, processed_dir=self.processed_dir)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _match_lookup(matching):
+        """매칭 테이블 → (정렬된 (연도, 일련번호) 키, 지점번호, 관측일 오프셋) 배열 (없으면 None)"""
+        if matching is None or len(matching) == 0:
+            return None
+        match_keys = row_keys(matching["일련번호"], matching["접수일자"])
+        match_keys, first = np.unique(match_keys, return_index=True)
+        match_stations = matching["지점번호"].to_numpy(dtype=np.int64)[first]
+        match_offsets = (
+            matching["일자_오프셋"].to_numpy(dtype=np.int64)[first] if "일자_오프셋" in matching.columns
+            else np.zeros(len(first), dtype=np.int64)
+        )
+        return match_keys, match_stations, match_offsets
+
+    def _row_fields(self, snapshot, start=0):
+        """스냅샷 행 위치 start부터의 (일수, 관할기관, 매칭 지점번호, 관측일 오프셋) 배열"""
+        frame = snapshot.take(np.arange(start, snapshot.size))
+        days = snapshot.index.row_fields(start)[0]
+        agencies = frame["관할기관"].fillna("").astype(str).to_numpy()
+        stations = np.full(len(frame), -1, dtype=np.int64)
+        offsets = np.zeros(len(frame), dtype=np.int64)
+        if self._matches is not None:
+            match_keys, match_stations, match_offsets = self._matches
+            dated = days != MISSING_DAY
+            years = (EPOCH + days[dated]).astype("datetime64[Y]").astype(np.int64) + 1970
+            keys = years * 10_000_000 + frame["일련번호"].to_numpy(dtype=np.int64)[dated]
+            pos = np.minimum(np.searchsorted(match_keys, keys), len(match_keys) - 1)
+            found = match_keys[pos] == keys
+            stations[np.flatnonzero(dated)[found]] = match_stations[pos[found]]
+            offsets[np.flatnonzero(dated)[found]] = match_offsets[pos[found]]
+        return days, agencies, stations, offsets
+
+    def load(self, snapshot):
+        """스냅샷에 맞는 최신 큐브 반환"""
+        signature = (snapshot.etag, self._tables_signature())
+        if signature == self._signature:
+            return self.cube
+
+        with self._lock:
+            tables_signature = self._tables_signature()
+            if (snapshot.etag, tables_signature) == self._signature:
+                return self.cube
+
+            n = self._size
+            if (
+                self._signature is not None and tables_signature == self._signature[1]
+                and snapshot.lineage == self._lineage and n <= snapshot.size
+            ):
+                # 덧붙인 행만 추가 (요청 처리 중인 큐브는 건드리지 않도록 복사본에 추가)
+                rows = self._row_fields(snapshot, n)
+                self.cube = copy.deepcopy(self.cube)
+                self.cube.add_rows(*rows)
+                self._row_chunks.append(rows)
+                self._signature = (snapshot.etag, tables_signature)
+                return self.cube
+
+            weather = self._read("weather_data")
+            self._matches = self._match_lookup(self._read("roadkill_weather_matching"))
+            rows = self._row_fields(snapshot)
+            days = rows[0]
+
+            previous = self._row_chunks
+            appended = previous and n <= len(days) and all(
+                np.array_equal(np.concatenate(old), new[:n])
+                for old, new in zip(zip(*previous), rows)
+            )
+            if appended:
+                # 요청 처리 중인 큐브는 건드리지 않도록 복사본에 추가
+                self.cube = copy.deepcopy(self.cube)
+                self.cube.set_weather(weather)
+            else:
+                self.cube, n = StatisticsCube(weather), 0
+            if n < len(days):
+                self.cube.add_rows(*(field[n:] for field in rows))
+            self._row_chunks = [rows]
+            self._lineage = snapshot.lineage
+
+            # /api/weather: 일자 내림차순 날씨 행, /statistics/animals: 건수 내림차순 동물 통계
+            self.weather_records = []
+            if weather is not None:
+                weather = to_csv_frame(weather.sort_values("일자", ascending=False, kind="stable"), "weather_data")
+                self.weather_records = json_records(weather)
+            animals = self._read("animalType_data")
+            self.animal_records = []
+            if animals is not None:
+                animals = animals.sort_values("건수", ascending=False, kind="stable")
+                self.animal_records = json_records(animals)
+
+            self._signature = (snapshot.etag, tables_signature)
+            return self.cube
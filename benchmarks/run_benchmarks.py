@@ -0,0 +1,244 @@
+"""
+Module: run_benchmarks
+Description: 매칭 파이프라인/API 성능 측정 (가상 데이터 생성 → 단계별 처리량, 최대 메모리 JSON 기록).
+"""
+
+import argparse
+import gzip
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, "scripts"))
+sys.path.insert(0, os.path.join(BASE_DIR, "backend"))
+
+from synthetic_data import write_dataset
+from weather_matcher import match_by_month
+from weather_reader import read_weather_data
+from weather_roadkill_marged import parse_weather_line
+
+try:
+    import resource  # 유닉스 전용 (윈도우에서는 하위 프로세스 최대 메모리 생략)
+except ImportError:
+    resource = None
+
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+PARSE_LINE_SAMPLE = 200_000  # parse_weather_line은 느리므로 앞부분 줄만 측정
+
+
+def measure(name, fn, items, unit="rows"):
+    """fn() 실행 시간과 최대 할당 메모리(tracemalloc) 측정 → (결과 dict, fn 반환값)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = fn()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if callable(items):
+        items = items(value)
+    result = {
+        "name": name,
+        "seconds": round(seconds, 4),
+        "items": items,
+        "unit": unit,
+        "throughput_per_s": round(items / seconds, 1) if seconds > 0 else None,
+        "peak_mem_mb": round(peak / 2**20, 1),
+    }
+    print(f"  {name:<28} {seconds:8.3f}초  {result['throughput_per_s'] or 0:>14,.0f} {unit}/s  최대 {result['peak_mem_mb']:,} MB")
+    return result, value
+
+
+def child_peak_rss_mb():
+    """지금까지 끝난 하위 프로세스 중 최대 RSS (MB, 측정 불가면 None)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)  # macOS는 바이트, 리눅스는 KB
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_weather_parsing(work_dir, scale):
+    weather_path = os.path.join(work_dir, "data", "raw", "weather", "weather_data.csv")
+    results = []
+
+    def parse_lines():
+        parsed = 0
+        with open(weather_path, "r", encoding="utf-8") as f:
+            next(f)
+            for i, line in enumerate(f):
+                if i >= PARSE_LINE_SAMPLE:
+                    break
+                parsed += parse_weather_line(line) is not None
+        return parsed
+
+    result, _ = measure("parse_weather_line", parse_lines, lambda parsed: parsed, unit="lines")
+    results.append(result)
+
+    result, loaded = measure(
+        "read_weather_data", lambda: read_weather_data(weather_path), scale["weather_rows"], unit="lines"
+    )
+    results.append(result)
+    return results, loaded
+
+
+def bench_matching(work_dir, loaded, workers):
+    weather_df_valid, operating_station_ids = loaded
+    roadkill = pd.read_csv(
+        os.path.join(work_dir, "data", "raw", "roadkill", "roadkill_merged.csv"), encoding="utf-8-sig"
+    )
+    roadkill["접수일자"] = pd.to_datetime(roadkill["접수일자"])
+    stations = pd.read_csv(
+        os.path.join(work_dir, "data", "raw", "weather", "weather_stations.csv"), encoding="utf-8-sig"
+    )
+    result, _ = measure(
+        "match_by_month",
+        lambda: match_by_month(roadkill, stations, weather_df_valid, operating_station_ids, workers=workers),
+        len(roadkill),
+    )
+    return [result]
+
+
+def bench_full_run(work_dir, scale, workers):
+    """weather_roadkill_marged.py 전체 실행 (가상 데이터 폴더에 복사한 스크립트로 하위 프로세스 실행)"""
+    shutil.copytree(os.path.join(BASE_DIR, "scripts"), os.path.join(work_dir, "scripts"),
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    command = [sys.executable, os.path.join(work_dir, "scripts", "weather_roadkill_marged.py"), "--workers", str(workers)]
+    start = time.perf_counter()
+    subprocess.run(command, cwd=work_dir, check=True, stdout=subprocess.DEVNULL)
+    seconds = time.perf_counter() - start
+    result = {
+        "name": "create_full_weather_dataset",
+        "seconds": round(seconds, 4),
+        "items": scale["roadkill_rows"],
+        "unit": "rows",
+        "throughput_per_s": round(scale["roadkill_rows"] / seconds, 1),
+        "peak_mem_mb": child_peak_rss_mb(),
+    }
+    print(f"  {'create_full_weather_dataset':<28} {seconds:8.3f}초  {result['throughput_per_s']:>14,.0f} rows/s  "
+          f"최대 RSS {result['peak_mem_mb']} MB")
+    return [result]
+
+
+def bench_api(work_dir, requests):
+    """/api/roadkill (Flask 테스트 클라이언트, 가상 데이터 처리 결과 사용)"""
+    import app as backend_app
+    from roadkill_dataset import RoadkillDataset
+    from roadkill_hotspots import RoadkillHotspots
+    from roadkill_statistics import RoadkillStatistics
+
+    data_path = os.path.join(work_dir, "data", "processed", "roadkill_data.csv")
+    backend_app.roadkill_dataset = RoadkillDataset(data_path, encode=backend_app.roadkill_dataset.encode)
+    backend_app.roadkill_statistics = RoadkillStatistics(os.path.dirname(data_path))
+    backend_app.roadkill_hotspots = RoadkillHotspots()
+    client = backend_app.app.test_client()
+    results = []
+
+    def get(url, headers=None, expect=200):
+        response = client.get(url, headers=headers)
+        if response.status_code != expect:
+            raise RuntimeError(f"{url}: HTTP {response.status_code}")
+        return response
+
+    result, response = measure("api_roadkill_cold", lambda: get("/api/roadkill"), 1, unit="requests")
+    results.append(result)
+    etag = response.headers["ETag"]
+    n_rows = len(json.loads(response.data))
+
+    cases = [
+        ("api_roadkill_warm", "/api/roadkill", None, 200),
+        ("api_roadkill_304", "/api/roadkill", {"If-None-Match": etag}, 304),
+        ("api_roadkill_gzip", "/api/roadkill", {"Accept-Encoding": "gzip"}, 200),
+        ("api_roadkill_bbox", "/api/roadkill?bbox=126.5,36.5,127.5,37.5&limit=1000", None, 200),
+        ("api_roadkill_clusters", "/api/roadkill/clusters?zoom=8", None, 200),
+        ("api_statistics_by_date", "/api/roadkill/statistics/by-date", None, 200),
+        ("api_roadkill_hotspots", "/api/roadkill/hotspots?weeks=4&limit=20", None, 200),
+    ]
+    for name, url, headers, expect in cases:
+        result, _ = measure(
+            name, lambda: [get(url, headers, expect) for _ in range(requests)], requests, unit="requests"
+        )
+        results.append(result)
+
+    body = get("/api/roadkill").data
+    print(f"  응답 크기: {len(body) / 2**20:.1f} MB (gzip {len(gzip.compress(body)) / 2**20:.1f} MB), {n_rows:,}행")
+    return results
+
+
+def run_benchmarks(rows, stations, operating, days, workers, requests, output, keep=False):
+    work_dir = tempfile.mkdtemp(prefix="roadkill_bench_")
+    try:
+        print(f"가상 데이터 생성 중... ({work_dir})")
+        start = time.perf_counter()
+        scale = write_dataset(work_dir, rows, stations, operating, days)
+        print(f"  로드킬 {scale['roadkill_rows']:,}행, 기상 {scale['weather_rows']:,}행 ({time.perf_counter() - start:.1f}초)")
+
+        results = []
+        print("기상 데이터 읽기")
+        parsing, loaded = bench_weather_parsing(work_dir, scale)
+        results += parsing
+        print("관측소 매칭")
+        results += bench_matching(work_dir, loaded, workers)
+        del loaded
+        print("전체 실행")
+        results += bench_full_run(work_dir, scale, workers)
+        print("API")
+        results += bench_api(work_dir, requests)
+    finally:
+        if keep:
+            print(f"가상 데이터 폴더 유지: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "scale": {**scale, "workers": workers, "requests": requests},
+        "results": results,
+    }
+    if output is None:
+        os.makedirs(DEFAULT_RESULTS_DIR, exist_ok=True)
+        output = os.path.join(DEFAULT_RESULTS_DIR, f"bench_{time.strftime('%Y%m%d_%H%M%S')}_{rows}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ 결과 저장: {output}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로드킬-날씨 매칭 파이프라인/API 벤치마크")
+    parser.add_argument("--rows", type=int, default=10_000, help="가상 로드킬 행 수 (예: 10000 ~ 10000000)")
+    parser.add_argument("--stations", type=int, default=300, help="관측소 수")
+    parser.add_argument("--operating", type=int, default=150, help="기상 데이터가 있는 관측소 수")
+    parser.add_argument("--days", type=int, default=365, help="기간 (일, 기상 행 수 ≈ 운영 관측소 수 × 일수)")
+    parser.add_argument("--workers", type=int, default=1, help="매칭 프로세스 수 (0이면 CPU 코어 수)")
+    parser.add_argument("--requests", type=int, default=20, help="API 케이스별 요청 횟수")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/bench_<시각>_<행 수>.json)")
+    parser.add_argument("--keep", action="store_true", help="가상 데이터 폴더를 지우지 않음")
+    args = parser.parse_args()
+    run_benchmarks(args.rows, args.stations, args.operating, args.days, args.workers, args.requests,
+                   args.output, args.keep)
+
+
+if __name__ == "__main__":
+    main()
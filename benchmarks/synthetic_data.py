@@ -0,0 +1,96 @@
+"""
+Module: synthetic_data
+Description: 벤치마크용 가상 데이터 생성 (로드킬 신고 지점, 관측소 목록, 기상청 일자료 형식 기상 데이터).
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+from KMA_api import HEADER
+
+# 남한 대략 범위 (위도, 경도)
+LAT_RANGE = (33.2, 38.6)
+LON_RANGE = (126.0, 129.5)
+START_DATE = "2020-08-01"
+N_KMA_VALUES = 54  # 관측일, 지점번호 뒤의 값 개수 (KMA_api.HEADER 기준)
+AGENCIES = ["경기 화성시", "충남 당진시", "충남 아산시", "경기 평택시", "강원 원주시", "전남 해남군", "경북 경주시"]
+
+
+def make_stations(n_stations, seed=0):
+    """관측소 목록 (weather_stations.csv 형식)"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "지점번호": np.arange(100, 100 + n_stations),
+        "지점명": [f"관측소{i}" for i in range(n_stations)],
+        "지점주소": "",
+        "관리관서": "",
+        "위도": np.round(rng.uniform(*LAT_RANGE, n_stations), 4),
+        "경도": np.round(rng.uniform(*LON_RANGE, n_stations), 4),
+    })
+
+
+def make_roadkill(n_rows, n_days, seed=0):
+    """로드킬 신고 (roadkill_merged.csv 형식, 연도별로 일련번호가 1부터 다시 시작)"""
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp(START_DATE) + pd.to_timedelta(np.sort(rng.integers(0, n_days, n_rows)), unit="D")
+    years = dates.year
+    serials = pd.Series(np.ones(n_rows, dtype=np.int64)).groupby(years).cumsum().to_numpy()
+    minutes = rng.integers(0, 24 * 60, n_rows)
+    agencies = np.array(AGENCIES)[rng.integers(0, len(AGENCIES), n_rows)]
+    return pd.DataFrame({
+        "일련번호": serials,
+        "신고구분": "로드킬",
+        "신고내용": [f"{agency}에서 로드킬이 발생하였습니다." for agency in agencies],
+        "접수일자": dates.strftime("%Y-%m-%d"),
+        "접수시각": [f"{m // 60}:{m % 60:02d}" for m in minutes],
+        "관할기관": agencies,
+        "GPS X": np.round(rng.uniform(*LON_RANGE, n_rows), 7),
+        "GPS Y": np.round(rng.uniform(*LAT_RANGE, n_rows), 7),
+    })
+
+
+def weather_lines(station_ids, n_days, seed=0, missing_rate=0.05):
+    """기상청 일자료 형식 데이터 줄 (헤더 제외, 날짜 → 관측소 순서)
+
+    - missing_rate 비율로 관측소-일자 행을 빼고, 일부 값은 -9.0/빈칸 결측으로 채움
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(START_DATE, periods=n_days).strftime("%Y%m%d")
+    for date in dates:
+        present = station_ids[rng.random(len(station_ids)) >= missing_rate]
+        values = np.round(rng.normal(10, 5, (len(present), N_KMA_VALUES)), 1).astype(str)
+        values[rng.random(len(present)) < 0.05, 8] = "-9.0"   # 평균기온 결측
+        values[rng.random(len(present)) < 0.3, 36] = "-9.0"   # 강수량 결측
+        values[rng.random(len(present)) < 0.1, 38] = ""       # 강수계속시간 빈칸
+        for station, row in zip(present, values):
+            yield f"{date},{station}," + ",".join(row) + ",="
+
+
+def write_dataset(base_dir, n_rows, n_stations=300, n_operating=150, n_days=365, seed=0):
+    """프로젝트와 같은 폴더 구조(data/raw/...)에 가상 입력 파일 3개 저장 → 행 수 요약"""
+    roadkill_dir = os.path.join(base_dir, "data", "raw", "roadkill")
+    weather_dir = os.path.join(base_dir, "data", "raw", "weather")
+    os.makedirs(roadkill_dir, exist_ok=True)
+    os.makedirs(weather_dir, exist_ok=True)
+
+    stations = make_stations(n_stations, seed)
+    stations.to_csv(os.path.join(weather_dir, "weather_stations.csv"), index=False, encoding="utf-8-sig")
+
+    roadkill = make_roadkill(n_rows, n_days, seed)
+    roadkill.to_csv(os.path.join(roadkill_dir, "roadkill_merged.csv"), index=False, encoding="utf-8-sig")
+
+    operating = stations["지점번호"].to_numpy()[:n_operating]
+    weather_rows = 0
+    with open(os.path.join(weather_dir, "weather_data.csv"), "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        for line in weather_lines(operating, n_days, seed):
+            f.write(line + "\n")
+            weather_rows += 1
+
+    return {"roadkill_rows": n_rows, "stations": n_stations, "operating_stations": n_operating,
+            "days": n_days, "weather_rows": weather_rows}
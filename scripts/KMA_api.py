@@ -1,11 +1,35 @@
 """
 Module: kma_data_api
-Description: 기상청 일자료 데이터를 API로부터 다운로드하고 단일 CSV로 저장하는 스크립트.
+Description: 기상청 일자료 데이터를 API로부터 다운로드(일자별 캐시)하고 단일 CSV로 저장하는 스크립트.
 """
 
+import argparse
 import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from kma_cache import DayCache
+
+# ✅ 기상청 API 주소 / 인증키
+BASE_URL = "https://apihub.kma.go.kr/api/typ01/url/kma_sfcdd.php"
+AUTH_KEY = os.environ.get("KMA_AUTH_KEY", "u49bQSWmQxKPW0ElpoMSXw")
+
+# ✅ 다운로드 기본 설정
+DEFAULT_WORKERS = 8      # 동시 요청 수
+DEFAULT_RATE = 10.0      # 초당 최대 요청 수
+DEFAULT_RETRIES = 4      # 실패 시 재시도 횟수
+DEFAULT_BACKOFF = 1.0    # 재시도 대기 시간 기준 (초, 시도마다 2배)
+DEFAULT_TIMEOUT = 30     # 요청 타임아웃 (초)
+CACHE_SAVE_EVERY = 50    # 캐시 목록(index.json) 중간 저장 간격 (일)
+RETRY_STATUS = 429       # 이 상태 코드와 5xx만 재시도 (그 외 4xx는 인증키/주소 오류라 바로 실패)
 
 
 # ✅ 기상청 일자료 표준 컬럼 전체 
@@ -30,50 +54,201 @@ def extract_data_only(raw_bytes):
     return "\n".join(data_lines).encode("utf-8")
 
 
-def download_file(file_url):
+def build_url(date_str, base_url=BASE_URL, auth_key=AUTH_KEY):
+    """일자(YYYYMMDD)별 기상청 일자료 요청 URL"""
+    return f"{base_url}?tm={date_str}&stn=0&help=1&authKey={auth_key}"
+
+
+def make_session(pool_size=DEFAULT_WORKERS):
+    """keep-alive 연결을 재사용하는 세션 (동시 요청 수만큼 연결 풀 유지)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class RateLimiter:
+    """초당 요청 수 제한 (여러 스레드가 공유, 요청 시작 간격을 일정하게 유지)"""
+
+    def __init__(self, rate_per_sec):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec and rate_per_sec > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        if self.interval == 0.0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def download_file(file_url, session=None, timeout=DEFAULT_TIMEOUT):
     """URL에서 파일 다운로드"""
-    response = requests.get(file_url)
+    response = (session or requests).get(file_url, timeout=timeout)
     response.raise_for_status()
     return response.content
 
 
-def download_weather_data():
-    """기상청 API에서 데이터를 다운로드하고 단일 CSV로 저장"""
-    start_date = datetime(2020, 8, 1)
-    end_date = datetime(2022, 6, 30)
-    BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-    output_dir = os.path.join(BASE_DIR, "data", "raw", "weather")
-    os.makedirs(output_dir, exist_ok=True)
+def is_retryable(error):
+    """다시 시도할 만한 오류인지 (연결 오류, 타임아웃, 429, 5xx)"""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == RETRY_STATUS or status >= 500
+    return False
+
+
+def download_day(session, date_str, limiter, base_url=BASE_URL, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF, timeout=DEFAULT_TIMEOUT):
+    """하루치 데이터 다운로드 (일시적 오류만 지수 백오프로 재시도, 데이터 행만 반환)"""
+    url = build_url(date_str, base_url)
+    for attempt in range(retries + 1):
+        limiter.wait()
+        try:
+            return extract_data_only(download_file(url, session, timeout))
+        except requests.RequestException as e:
+            if attempt == retries or not is_retryable(e):
+                raise
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random()))
+
+
+def iter_downloads(dates, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, base_url=BASE_URL,
+                   retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, timeout=DEFAULT_TIMEOUT):
+    """여러 날짜를 동시에 다운로드하고 (일자, 데이터, 오류)를 날짜 순서대로 반환
+
+    - 동시 요청 수는 workers, 요청 속도는 rate(초당)로 제한
+    - 진행 중인 요청은 workers * 4개까지만 유지 (메모리 사용량 제한)
+    - 재시도 후에도 실패한 날짜는 데이터 None, 오류 객체와 함께 반환
+    """
+    limiter = RateLimiter(rate)
+    window = max(workers * 4, 1)
+    with make_session(workers) as session, ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        dates = iter(dates)
+        for date_str in dates:
+            pending.append((date_str, executor.submit(
+                download_day, session, date_str, limiter, base_url, retries, backoff, timeout
+            )))
+            if len(pending) >= window:
+                break
+
+        while pending:
+            date_str, future = pending.popleft()
+            try:
+                yield date_str, future.result(), None
+            except Exception as e:
+                yield date_str, None, e
 
-    save_path = os.path.join(output_dir, "weather_data.csv")
+            next_date = next(dates, None)
+            if next_date is not None:
+                pending.append((next_date, executor.submit(
+                    download_day, session, next_date, limiter, base_url, retries, backoff, timeout
+                )))
 
-    with open(save_path, "wb") as f:
-        f.write(HEADER.encode("utf-8"))  # CSV 헤더 작성
 
-        current_date = start_date
-        while current_date <= end_date:
-            date_str = current_date.strftime("%Y%m%d")
-            print(f"Downloading {date_str}...")
+def parse_date(value):
+    """YYYYMMDD 또는 YYYY-MM-DD 문자열 → datetime"""
+    return datetime.strptime(value.replace("-", ""), "%Y%m%d")
 
-            url = (
-                f"https://apihub.kma.go.kr/api/typ01/url/kma_sfcdd.php?"
-                f"tm={date_str}&stn=0&help=1&authKey=u49bQSWmQxKPW0ElpoMSXw"
-            )
 
-            try:
-                content = download_file(url)
-                data_only = extract_data_only(content)
-                if data_only.strip():
-                    f.write(data_only)
-                    if not data_only.endswith(b"\n"):
-                        f.write(b"\n")
-            except Exception as e:
-                print(f"❌ Error downloading {date_str}: {e}")
+def date_range(start_date, end_date):
+    """start_date ~ end_date (포함) 일자 문자열(YYYYMMDD) 목록"""
+    days = []
+    current_date = start_date
+    while current_date <= end_date:
+        days.append(current_date.strftime("%Y%m%d"))
+        current_date += timedelta(days=1)
+    return days
+
 
-            current_date += timedelta(days=1)
+def write_csv_from_cache(cache, dates, save_path):
+    """캐시에 저장된 일자별 응답을 날짜 순서대로 이어 붙여 단일 CSV 생성 (네트워크 사용 없음)
 
+    - 반환: 캐시에 없어 빠진 일자 목록
+    """
+    gaps = []
+    tmp_path = save_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.encode("utf-8"))  # CSV 헤더 작성
+        for date_str in dates:
+            if date_str not in cache:
+                gaps.append(date_str)
+                continue
+            data_only = cache.get(date_str)
+            f.write(data_only)
+            if not data_only.endswith(b"\n"):
+                f.write(b"\n")
+    os.replace(tmp_path, save_path)
+    return gaps
+
+
+def download_weather_data(start_date=datetime(2020, 8, 1), end_date=datetime(2022, 6, 30),
+                          workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, base_url=BASE_URL,
+                          offline=False, output_dir=None):
+    """기상청 API에서 캐시에 없는 일자만 동시에 다운로드하고, 캐시로부터 단일 CSV 생성
+
+    - 성공한 일자는 data/raw/weather/cache/ 에 바로 기록되므로 중단 후 다시 실행하면 빠진 일자부터 이어받음
+    - offline=True: 다운로드 없이 캐시만으로 CSV 생성
+    - output_dir: weather_data.csv와 cache/를 둘 폴더 (기본: data/raw/weather)
+    - 반환: CSV에 빠진 일자 목록 (비어 있으면 전체 성공)
+    """
+    if output_dir is None:
+        BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output_dir = os.path.join(BASE_DIR, "data", "raw", "weather")
+    os.makedirs(output_dir, exist_ok=True)
+
+    save_path = os.path.join(output_dir, "weather_data.csv")
+    cache = DayCache(os.path.join(output_dir, "cache"))
+    dates = date_range(start_date, end_date)
+    missing = cache.missing(dates)
+    print(f"요청 기간 {len(dates)}일 중 캐시 {len(dates) - len(missing)}일, 다운로드 대상 {len(missing)}일")
+
+    if missing and not offline:
+        downloads = iter_downloads(missing, workers=workers, rate=rate, base_url=base_url)
+        for count, (date_str, data_only, error) in enumerate(downloads, start=1):
+            if error is not None:
+                print(f"❌ Error downloading {date_str}: {error}")
+            elif not data_only.strip():
+                print(f"⚠️ 빈 응답 {date_str} (캐시에 저장하지 않음)")
+            else:
+                print(f"Downloaded {date_str}")
+                cache.put(date_str, data_only)
+            if count % CACHE_SAVE_EVERY == 0:
+                cache.save()  # 중간 저장 → 중단돼도 이어받기 가능
+        cache.save()
+
+    gaps = write_csv_from_cache(cache, dates, save_path)
+    if gaps:
+        print(f"❌ {len(gaps)}일 데이터 없음: {', '.join(gaps)}")
     print(f"✅ All data saved to {save_path}")
+    return gaps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기상청 일자료 다운로드")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="동시 요청 수")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="초당 최대 요청 수 (0 = 제한 없음)")
+    parser.add_argument(
+        "--base-url", default=os.environ.get("KMA_API_URL", BASE_URL),
+        help="API 주소 (테스트용 로컬 서버 지정 가능, 환경변수 KMA_API_URL)"
+    )
+    parser.add_argument("--start", type=parse_date, default=datetime(2020, 8, 1), help="시작일 (YYYYMMDD)")
+    parser.add_argument("--end", type=parse_date, default=datetime(2022, 6, 30), help="종료일 (YYYYMMDD)")
+    parser.add_argument("--offline", action="store_true", help="다운로드 없이 캐시만으로 CSV 생성")
+    args = parser.parse_args()
+
+    gaps = download_weather_data(
+        args.start, args.end, workers=args.workers, rate=args.rate,
+        base_url=args.base_url, offline=args.offline
+    )
+    sys.exit(1 if gaps else 0)
 
 
 if __name__ == "__main__":
-    download_weather_data()
+    main()
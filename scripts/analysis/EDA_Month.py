@@ -1,53 +1,60 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
+"""
+Module: EDA_Month
+Description: 월별 로드킬 발생 추이 분석 (report.py에서 그림/요약 생성).
+"""
 
-# ==========================
-# 1️⃣ 데이터 불러오기
-# ==========================
-import os
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-csv_path = os.path.join(BASE_DIR, 'data', 'processed', 'roadkill_data.csv')
+import matplotlib.pyplot as plt
 
-if not os.path.exists(csv_path):
-    print(f"❌ 파일을 찾을 수 없습니다: {csv_path}")
-    print(f"현재 작업 디렉토리: {os.getcwd()}")
-    exit(1)
+# 필요한 결과 테이블과 컬럼 (report.py가 한 번만 읽어서 전달)
+TABLES = {"roadkill_data": ["접수일자"]}
 
-df = pd.read_csv(csv_path, encoding='utf-8-sig')
 
 # ==========================
-# 2️⃣ 날짜 파싱
+# 1️⃣ 월별 집계
 # ==========================
-df["접수일자"] = pd.to_datetime(df["접수일자"], errors="coerce")
+def compute(tables):
+    df = tables["roadkill_data"]
+    # 접수일자는 processed_store가 날짜 타입으로 읽음
+    month = df["접수일자"].dt.to_period("M").dt.to_timestamp()
+    monthly_counts = month.groupby(month).size().rename_axis("년월").reset_index(name="로드킬건수")
+    return {"monthly_counts": monthly_counts}
 
-# ==========================
-# 3️⃣ 월별 집계
-# ==========================
-df["년월"] = df["접수일자"].dt.to_period("M").dt.to_timestamp()
-monthly_counts = df.groupby("년월").size().reset_index(name="로드킬건수")
 
 # ==========================
-# 4️⃣ 한글 폰트 설정 (환경에 맞게 수정 가능)
+# 2️⃣ 시각화
 # ==========================
-plt.rcParams['font.family'] = 'Malgun Gothic'
-plt.rcParams['axes.unicode_minus'] = False
+def plot_monthly(monthly_counts, out_path):
+    plt.figure(figsize=(10, 5))
+    plt.plot(monthly_counts["년월"], monthly_counts["로드킬건수"], marker="o", linewidth=2)
+    plt.title("월별 로드킬 발생 추이", fontsize=14)
+    plt.xlabel("연-월")
+    plt.ylabel("건수")
+    plt.grid(True, linestyle="--", alpha=0.5)
+    plt.tight_layout()
+    plt.savefig(out_path, dpi=300)
+    plt.close()
+
+
+def figures(result):
+    return [("roadkill_monthly_plot.png", plot_monthly, (result["monthly_counts"],))]
 
-# ==========================
-# 5️⃣ 시각화
-# ==========================
-plt.figure(figsize=(10, 5))
-plt.plot(monthly_counts["년월"], monthly_counts["로드킬건수"], marker="o", linewidth=2)
-plt.title("월별 로드킬 발생 추이", fontsize=14)
-plt.xlabel("연-월")
-plt.ylabel("건수")
-plt.grid(True, linestyle="--", alpha=0.5)
-plt.tight_layout()
 
 # ==========================
-# 6️⃣ 파일 저장 (옵션)
+# 3️⃣ 요약
 # ==========================
-plt.savefig("roadkill_monthly_plot.png", dpi=300)
-plt.show()
+def summary(result):
+    monthly_counts = result["monthly_counts"]
+    peak = monthly_counts.loc[monthly_counts["로드킬건수"].idxmax()] if len(monthly_counts) else None
+    return {
+        "월별 건수": {
+            ts.strftime("%Y-%m"): int(count)
+            for ts, count in zip(monthly_counts["년월"], monthly_counts["로드킬건수"])
+        },
+        "최다 발생 월": peak["년월"].strftime("%Y-%m") if peak is not None else None,
+    }
+
 
-print("그래프가 'roadkill_monthly_plot.png' 파일로 저장되었습니다.")
+if __name__ == "__main__":
+    import sys
+    from report import main
+    main(["--only", "EDA_Month"] + sys.argv[1:])
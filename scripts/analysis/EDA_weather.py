@@ -1,61 +1,115 @@
+"""
+Module: EDA_weather
+Description: 날씨 변수 간 강한 상관관계(|r| > 0.5) 변수쌍 추출 및 회귀선 산점도 (report.py에서 그림/요약 생성).
+"""
+
+import numpy as np
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
-# 한글 폰트 설정
-plt.rcParams['font.family'] = 'Malgun Gothic'
-plt.rcParams['axes.unicode_minus'] = False
+# 필요한 결과 테이블과 컬럼 (report.py가 한 번만 읽어서 전달)
+TABLES = {"weather_data": None}
+
+CORR_THRESHOLD = 0.5
+
+# 산점도 그리기 방식 (report.py의 --weather-plot, --max-points로 변경 가능)
+# - auto: 행이 MAX_POINTS 이하면 전체 회귀선 산점도, 넘으면 hexbin
+# - full: 항상 전체 행, sample: MAX_POINTS개 무작위 표본, hexbin: 항상 hexbin
+PLOT_MODE = "auto"
+MAX_POINTS = 20000
+
 
 # -------------------------------
-# 1️⃣ 데이터 불러오기 및 준비
+# 1️⃣ 데이터 준비 + 상관계수 계산
 # -------------------------------
-import os
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-weather_path = os.path.join(BASE_DIR, 'data', 'processed', 'weather_data.csv')
+def strong_pairs(corr, threshold=CORR_THRESHOLD):
+    """상관행렬 위쪽 삼각형에서 |r| > threshold 변수쌍 추출 (|r| 내림차순 표)
 
-if not os.path.exists(weather_path):
-    print(f"❌ 파일을 찾을 수 없습니다: {weather_path}")
-    exit(1)
+    - 변수쌍마다 한 번만 나오고 (변수1, 변수2)는 상관행렬 컬럼 순서를 따름
+    """
+    columns = corr.columns.to_numpy()
+    values = corr.to_numpy()
+    rows, cols = np.triu_indices(len(columns), k=1)
+    r = values[rows, cols]
+    keep = np.abs(r) > threshold  # NaN은 제외됨
+    pairs = pd.DataFrame({"변수1": columns[rows[keep]], "변수2": columns[cols[keep]], "r": r[keep]})
+    pairs["|r|"] = pairs["r"].abs()
+    return pairs.sort_values("|r|", ascending=False, kind="stable").reset_index(drop=True)
 
-weather_df = pd.read_csv(weather_path, encoding='utf-8-sig')
 
-if '일자' in weather_df.columns:
-    weather_df.rename(columns={'일자': '날짜'}, inplace=True)
-weather_df['날짜'] = pd.to_datetime(weather_df['날짜'], errors='coerce')
+def compute(tables):
+    weather_df = tables["weather_data"]
+    num_df = weather_df.select_dtypes(include='number').dropna()
 
-num_df = weather_df.select_dtypes(include='number').dropna()
+    corr = num_df.corr()
+
+    # 특정 기준 이상만 추출 (|r| > 0.5)
+    return {"num_df": num_df, "strong_pairs": strong_pairs(corr)}
 
-# -------------------------------
-# 2️⃣ 상관계수 계산
-# -------------------------------
-corr = num_df.corr()
-
-# 특정 기준 이상만 추출 (|r| > 0.5)
-strong_pairs = []
-for i in corr.columns:
-    for j in corr.columns:
-        if i != j and abs(corr.loc[i, j]) > 0.5:
-            strong_pairs.append((i, j, corr.loc[i, j]))
-
-# 중복 제거
-unique_pairs = set()
-for a, b, r in strong_pairs:
-    pair = tuple(sorted([a, b]))  # 정렬 후 튜플로 저장
-    unique_pairs.add((pair[0], pair[1], r))
-strong_pairs = list(unique_pairs)
-
-print("📈 상관계수 |r| > 0.5 인 변수쌍:")
-for a, b, r in strong_pairs:
-    print(f"{a} ↔ {b} : {r:.2f}")
 
 # -------------------------------
-# 3️⃣ 시각화 (회귀선 + 산점도)
+# 2️⃣ 시각화 (회귀선 + 산점도 / hexbin)
 # -------------------------------
-for a, b, r in strong_pairs:
+def plot_pair(data, a, b, r, out_path, note=""):
     plt.figure(figsize=(6, 5))
-    sns.regplot(x=a, y=b, data=num_df, scatter_kws={'alpha':0.3}, line_kws={'color': 'red'})
-    plt.title(f"{a} vs {b} (r = {r:.2f})")
+    sns.regplot(x=a, y=b, data=data, scatter_kws={'alpha': 0.3}, line_kws={'color': 'red'})
+    plt.title(f"{a} vs {b} (r = {r:.2f}){note}")
     plt.xlabel(a)
     plt.ylabel(b)
     plt.tight_layout()
-    plt.show()
+    plt.savefig(out_path, dpi=150)
+    plt.close()
+
+
+def plot_pair_hexbin(x, y, a, b, r, line, out_path):
+    """행이 많을 때: 점 대신 hexbin 밀도 + 전체 데이터 회귀선"""
+    plt.figure(figsize=(6, 5))
+    plt.hexbin(x, y, gridsize=60, cmap="viridis", mincnt=1, bins="log")
+    plt.colorbar(label="건수 (log)")
+    xs = np.array([x.min(), x.max()])
+    plt.plot(xs, line[0] * xs + line[1], color="red")
+    plt.title(f"{a} vs {b} (r = {r:.2f}, n = {len(x):,})")
+    plt.xlabel(a)
+    plt.ylabel(b)
+    plt.tight_layout()
+    plt.savefig(out_path, dpi=150)
+    plt.close()
+
+
+def pair_figure(num_df, a, b, r, mode=None, max_points=None):
+    """변수쌍 그림 작업 (plot 함수, 인자) - 큰 데이터는 표본 추출/hexbin으로 전달량과 렌더링 시간 제한"""
+    mode = mode or PLOT_MODE
+    max_points = max_points or MAX_POINTS
+    data = num_df[[a, b]]
+    if mode == "full" or (mode != "hexbin" and len(data) <= max_points):
+        return plot_pair, (data, a, b, r)
+    if mode == "sample":
+        return plot_pair, (data.sample(max_points, random_state=0), a, b, r, f", 표본 {max_points:,}/{len(data):,}")
+    x = data[a].to_numpy(dtype=np.float32)
+    y = data[b].to_numpy(dtype=np.float32)
+    return plot_pair_hexbin, (x, y, a, b, r, np.polyfit(x, y, 1))
+
+
+def figures(result):
+    num_df = result["num_df"]
+    tasks = []
+    for i, (a, b, r) in enumerate(result["strong_pairs"][["변수1", "변수2", "r"]].itertuples(index=False)):
+        plot, args = pair_figure(num_df, a, b, r)
+        tasks.append((f"weather_pair_{i + 1}.png", plot, args))
+    return tasks
+
+
+def summary(result):
+    return {
+        "상관계수 |r| > 0.5 변수쌍": [
+            {"변수1": a, "변수2": b, "r": round(float(r), 4)}
+            for a, b, r in result["strong_pairs"][["변수1", "변수2", "r"]].itertuples(index=False)
+        ]
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    from report import main
+    main(["--only", "EDA_weather"] + sys.argv[1:])
@@ -0,0 +1,165 @@
+"""
+Module: report
+Description: EDA 분석 일괄 리포트 (결과 테이블을 한 번만 읽고, 그림은 화면 없이 프로세스 풀에서 PNG로 저장 + 요약 JSON/HTML).
+"""
+
+import argparse
+import html
+import json
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")  # 화면 없는 서버에서도 실행 (plt.show() 사용 안 함)
+import matplotlib.pyplot as plt
+from matplotlib import font_manager
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(BASE_DIR, "scripts"))
+from processed_store import read_table
+
+import EDA_KindOfAnimal
+import EDA_Month
+import EDA_temp_roadkill
+import EDA_weather
+
+REPORT_MODULES = [EDA_Month, EDA_KindOfAnimal, EDA_temp_roadkill, EDA_weather]
+DEFAULT_OUTPUT_DIR = os.path.join(BASE_DIR, "reports", "eda")
+
+# 한글 폰트 후보 (앞에서부터 설치된 것 사용, 모두 없으면 matplotlib 기본 폰트)
+KOREAN_FONTS = ["Malgun Gothic", "AppleGothic", "NanumGothic", "NanumBarunGothic", "Noto Sans CJK KR", "Noto Sans KR"]
+
+
+def setup_korean_font():
+    """설치된 한글 폰트 설정 (사용한 폰트 이름 반환, 없으면 None)"""
+    installed = {font.name for font in font_manager.fontManager.ttflist}
+    plt.rcParams['axes.unicode_minus'] = False
+    for name in KOREAN_FONTS:
+        if name in installed:
+            plt.rcParams['font.family'] = name
+            return name
+    warnings.filterwarnings("ignore", message="Glyph .* missing from font")  # 경고는 시작할 때 한 번만 출력
+    return None
+
+
+def load_tables(modules):
+    """모듈들이 필요로 하는 결과 테이블을 한 번씩만 읽기 (필요한 컬럼만)"""
+    needed = {}
+    for module in modules:
+        for name, columns in module.TABLES.items():
+            if name in needed and (needed[name] is None or columns is None):
+                needed[name] = None
+            else:
+                needed[name] = sorted(set(needed.get(name) or []) | set(columns)) if columns else None
+    return {name: read_table(name, columns=columns) for name, columns in needed.items()}
+
+
+def render_figure(plot, args, out_path):
+    """프로세스 풀 작업: 그림 한 장 저장"""
+    plot(*args, out_path)
+    return out_path
+
+
+def _init_worker():
+    setup_korean_font()
+
+
+def write_html(summary, figure_names, out_path):
+    """요약 + 그림 목록 HTML"""
+    parts = ["<!DOCTYPE html>", '<html lang="ko"><head><meta charset="utf-8"><title>로드킬 EDA 리포트</title></head><body>']
+    parts.append("<h1>로드킬 EDA 리포트</h1>")
+    parts.append(f"<p>생성 시각: {html.escape(summary['생성 시각'])}</p>")
+    for module_name, section in summary["분석"].items():
+        parts.append(f"<h2>{html.escape(module_name)}</h2>")
+        parts.append(f"<pre>{html.escape(json.dumps(section, ensure_ascii=False, indent=2))}</pre>")
+        for name in figure_names.get(module_name, []):
+            parts.append(f'<img src="{html.escape(name)}" alt="{html.escape(name)}" style="max-width:100%">')
+    parts.append("</body></html>")
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+
+
+def run_report(modules=REPORT_MODULES, output_dir=DEFAULT_OUTPUT_DIR, workers=None):
+    """리포트 생성 → 요약 dict 반환
+
+    - workers: 그림 렌더링 프로세스 수 (1이면 직렬, None/0 이하면 CPU 코어 수)
+    """
+    start = time.time()
+    os.makedirs(output_dir, exist_ok=True)
+    font = setup_korean_font()
+    if font is None:
+        print("⚠️ 한글 폰트를 찾지 못했습니다 (기본 폰트 사용, 한글이 깨질 수 있음)")
+
+    # 1️⃣ 데이터 로드 (한 번만)
+    tables = load_tables(modules)
+    print(f"데이터 로드: {time.time() - start:.2f}초")
+
+    # 2️⃣ 분석별 집계 + 그림 작업 목록
+    analyses, tasks, figure_names = {}, [], {}
+    for module in modules:
+        result = module.compute(tables)
+        analyses[module.__name__] = module.summary(result)
+        for name, plot, args in module.figures(result):
+            tasks.append((plot, args, os.path.join(output_dir, name)))
+            figure_names.setdefault(module.__name__, []).append(name)
+    print(f"집계 완료: 그림 {len(tasks)}장")
+
+    # 3️⃣ 그림 렌더링 (프로세스 풀)
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, max(len(tasks), 1))
+    if workers == 1:
+        for plot, args, out_path in tasks:
+            render_figure(plot, args, out_path)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            for future in [executor.submit(render_figure, *task) for task in tasks]:
+                future.result()
+
+    # 4️⃣ 요약 JSON/HTML 저장
+    summary = {
+        "생성 시각": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "폰트": font,
+        "그림": figure_names,
+        "분석": analyses,
+    }
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    write_html(summary, figure_names, os.path.join(output_dir, "index.html"))
+
+    print(f"✅ 리포트 생성 완료 ({time.time() - start:.2f}초, 프로세스 {workers}개): {output_dir}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로드킬 EDA 일괄 리포트 생성")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT_DIR, help="출력 폴더")
+    parser.add_argument("--workers", type=int, default=0, help="그림 렌더링 프로세스 수 (0이면 CPU 코어 수)")
+    parser.add_argument("--only", nargs="+", help="실행할 분석 모듈 이름 (예: EDA_Month)")
+    parser.add_argument("--weather-plot", choices=["auto", "full", "sample", "hexbin"], default=EDA_weather.PLOT_MODE,
+                        help="날씨 변수쌍 그림 방식 (auto: 행이 많으면 hexbin)")
+    parser.add_argument("--max-points", type=int, default=EDA_weather.MAX_POINTS,
+                        help="산점도에 그릴 최대 행 수 (넘으면 표본 추출 또는 hexbin)")
+    args = parser.parse_args(argv)
+
+    EDA_weather.PLOT_MODE = args.weather_plot
+    EDA_weather.MAX_POINTS = args.max_points
+
+    modules = REPORT_MODULES
+    if args.only:
+        modules = [module for module in REPORT_MODULES if module.__name__ in args.only]
+        if not modules:
+            print(f"❌ 분석 모듈을 찾을 수 없습니다: {', '.join(args.only)}")
+            sys.exit(1)
+    try:
+        run_report(modules, args.out, args.workers)
+    except FileNotFoundError as e:
+        print(f"❌ 파일을 찾을 수 없습니다: {e.filename or e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
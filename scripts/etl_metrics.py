@@ -0,0 +1,114 @@
+"""
+Module: etl_metrics
+Description: 병합 파이프라인 단계별 소요 시간·처리량·최대 메모리 기록 (JSON 저장, 선택적 cProfile).
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource  # 유닉스 전용
+except ImportError:
+    resource = None
+
+
+def _rusage_mb(who):
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)  # macOS는 바이트, 리눅스는 KB
+
+
+def peak_rss_mb():
+    """현재 프로세스 최대 RSS (MB, 측정할 수 없으면 None)"""
+    if resource is not None:
+        return round(_rusage_mb(resource.RUSAGE_SELF), 1)
+    try:  # resource가 없는 환경: /proc의 VmHWM (리눅스 계열)
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 2**10, 1)
+    except OSError:
+        pass
+    return None
+
+
+def children_peak_rss_mb():
+    """끝난 하위 프로세스(병렬 매칭 작업) 중 최대 RSS (MB, 측정할 수 없으면 None)"""
+    if resource is None:
+        return None
+    return round(_rusage_mb(resource.RUSAGE_CHILDREN), 1)
+
+
+class ETLMetrics:
+    """단계별 측정값 모음
+
+    - stage(name, rows): with 블록 소요 시간과 처리 행 수(→ 초당 행 수), 단계 종료 시점 최대 RSS 기록
+    - values: 매칭률 등 단계 외 측정값
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.stages = []
+        self.values = {}
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """단계 측정 (rows는 블록 안에서 record["rows"]로 나중에 채워도 됨)"""
+        record = {"name": name, "rows": rows}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - start
+            record["seconds"] = round(seconds, 4)
+            record["rows_per_s"] = round(record["rows"] / seconds, 1) if record["rows"] and seconds > 0 else None
+            record["peak_rss_mb"] = peak_rss_mb()
+            self.stages.append(record)
+
+    def set(self, **values):
+        self.values.update(values)
+
+    def to_dict(self):
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "total_seconds": round(time.time() - self.started, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "workers_peak_rss_mb": children_peak_rss_mb(),
+            "stages": self.stages,
+            **self.values,
+        }
+
+    def write(self, path):
+        """측정값 JSON 저장"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def print_summary(self):
+        print("\n단계별 소요 시간:")
+        for record in self.stages:
+            rate = f"{record['rows_per_s']:>12,.0f}행/s" if record["rows_per_s"] else " " * 15
+            rss = f"  최대 RSS {record['peak_rss_mb']} MB" if record["peak_rss_mb"] is not None else ""
+            print(f"  {record['name']:<18} {record['seconds']:8.2f}초 {rate}{rss}")
+
+
+@contextmanager
+def profiled(path=None, top=20):
+    """path가 있으면 with 블록을 cProfile로 측정해 저장하고 누적 시간 상위 함수 출력"""
+    if not path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"\n프로파일 저장: {path} (누적 시간 상위 {top}개)")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
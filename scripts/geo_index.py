@@ -0,0 +1,93 @@
+"""
+Module: geo_index
+Description: 위경도 좌표용 벡터화 하버사인 거리 계산과 관측소 최근접 탐색 인덱스.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371  # 지구 반지름 (km)
+
+
+def haversine_np(lon1, lat1, lon2, lat2):
+    """두 지점 간의 거리 계산 (하버사인 공식, 배열 입력 브로드캐스팅)"""
+    lon1, lat1, lon2, lat2 = (
+        np.radians(np.asarray(v, dtype=np.float64)) for v in (lon1, lat1, lon2, lat2)
+    )
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return c * EARTH_RADIUS_KM
+
+
+def _to_unit_xyz(lat, lon):
+    """위경도를 단위구 위의 3차원 좌표로 변환 (현 거리 순서 = 대원 거리 순서)"""
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+class StationIndex:
+    """관측소 최근접 탐색 인덱스
+
+    - 관측소 목록으로 한 번만 구축하고, 로드킬 좌표 배열 전체를 한 번에 질의
+    - 좌표가 없는 관측소는 제외, 지점번호가 중복되면 첫 번째 행만 사용
+    """
+
+    def __init__(self, stations_df):
+        stations = stations_df.copy()
+        stations["위도"] = pd.to_numeric(stations["위도"], errors="coerce")
+        stations["경도"] = pd.to_numeric(stations["경도"], errors="coerce")
+        stations = stations.dropna(subset=["지점번호", "위도", "경도"])
+        stations = stations.drop_duplicates(subset="지점번호", keep="first")
+        stations = stations.reset_index(drop=True)
+
+        self.stations = stations
+        self.station_ids = stations["지점번호"].to_numpy(dtype=np.int64)
+        self.lat = stations["위도"].to_numpy(dtype=np.float64)
+        self.lon = stations["경도"].to_numpy(dtype=np.float64)
+        self._tree = cKDTree(_to_unit_xyz(self.lat, self.lon))
+
+    def __len__(self):
+        return len(self.station_ids)
+
+    def query(self, lat, lon, k=1):
+        """좌표 배열에서 가까운 관측소 k개의 인덱스 위치와 거리(km) 반환
+
+        - k=1 이면 (n,) 배열, k>1 이면 가까운 순서의 (n, k) 배열
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        k = min(k, len(self))
+        _, positions = self._tree.query(_to_unit_xyz(lat, lon), k=k)
+        if k == 1:
+            distances = haversine_np(lon, lat, self.lon[positions], self.lat[positions])
+        else:
+            distances = haversine_np(
+                lon[:, None], lat[:, None], self.lon[positions], self.lat[positions]
+            )
+        return positions, distances
+
+    def nearest(self, lat, lon):
+        """좌표 배열마다 가장 가까운 관측소의 지점번호와 거리(km) 배열 반환"""
+        positions, distances = self.query(lat, lon, k=1)
+        return self.station_ids[positions], distances
+
+    def neighbour_chains(self, k, among=None):
+        """관측소마다 가까운 관측소 k개의 위치 배열 (n_stations, k)
+
+        - among: 후보로 삼을 관측소 불리언 마스크 (기본값: 전체, 자기 자신 포함)
+        - 후보가 k개보다 적으면 가능한 만큼만 반환
+        """
+        candidates = np.arange(len(self)) if among is None else np.flatnonzero(among)
+        k = min(k, len(candidates))
+        if k == 0:
+            return np.empty((len(self), 0), dtype=np.int64)
+        tree = self._tree if among is None else cKDTree(
+            _to_unit_xyz(self.lat[candidates], self.lon[candidates])
+        )
+        _, chains = tree.query(_to_unit_xyz(self.lat, self.lon), k=k)
+        return candidates[np.asarray(chains).reshape(len(self), k)]
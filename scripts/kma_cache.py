@@ -0,0 +1,64 @@
+"""
+Module: kma_cache
+Description: 기상청 일자료 일자별 응답(데이터 행만)을 내용 해시로 저장하는 디스크 캐시.
+"""
+
+import hashlib
+import json
+import os
+
+
+class DayCache:
+    """일자별 응답 캐시
+
+    - objects/<sha256>.csv : extract_data_only를 거친 응답 본문 (같은 내용은 한 번만 저장)
+    - index.json           : 성공한 일자 → 본문 해시, 데이터 행 수
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, f"{digest}.csv")
+
+    def __contains__(self, date_str):
+        entry = self.index.get(date_str)
+        return entry is not None and os.path.exists(self._object_path(entry["sha256"]))
+
+    def missing(self, dates):
+        """캐시에 없는 일자 목록 (입력 순서 유지)"""
+        return [d for d in dates if d not in self]
+
+    def put(self, date_str, data):
+        """하루치 본문 저장 (임시 파일에 쓴 뒤 교체, index.json은 save()에서 기록)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        self.index[date_str] = {"sha256": digest, "rows": data.count(b"\n") + 1}
+
+    def get(self, date_str):
+        with open(self._object_path(self.index[date_str]["sha256"]), "rb") as f:
+            return f.read()
+
+    def save(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(self.index.items())), f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.index_path)
@@ -0,0 +1,182 @@
+"""
+Module: merge_manifest
+Description: 증분 병합용 처리 상태 기록 (입력 파일 해시, 처리한 로드킬 행 키/내용 해시)과 결과 테이블 upsert.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from processed_store import read_table, to_csv_frame
+from weather_matcher import order_weather_table
+
+MANIFEST_VERSION = 1
+
+# 증분 병합용 처리 상태 기록 파일
+MANIFEST_FILE = "merge_manifest.json"
+
+# 결과 테이블 (로드킬 / 날씨 / 매칭 순서, processed_store로 CSV + Parquet 저장)
+OUTPUT_TABLES = ["roadkill_data", "weather_data", "roadkill_weather_matching"]
+
+# 행 내용 해시에 포함할 원본 컬럼 (이 값이 바뀌면 다시 매칭)
+ROW_HASH_COLUMNS = ["접수일자", "접수시각", "관할기관", "GPS X", "GPS Y"]
+
+
+def file_sha256(path, block_size=1 << 20):
+    """파일 내용의 SHA-256 (없으면 None)"""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def row_keys(serials, dates):
+    """로드킬 행 키 = 연도 * 10^7 + 일련번호
+
+    - 일련번호는 연도별 원본 파일마다 1부터 다시 시작하므로 연도와 묶어야 유일함
+    - dates: 접수일자 (datetime 또는 "YYYYMMDD"/"YYYY-MM-DD" 문자열)
+    """
+    dates = pd.Series(dates)
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        years = dates.dt.year.to_numpy(dtype=np.int64)
+    else:
+        years = dates.astype(str).str[:4].astype(np.int64).to_numpy()
+    return years * 10_000_000 + np.asarray(serials, dtype=np.int64)
+
+
+def row_hashes(roadkill_df):
+    """행 내용 해시 (uint64 → JSON 저장용 문자열)"""
+    hashed = pd.util.hash_pandas_object(roadkill_df[ROW_HASH_COLUMNS], index=False)
+    return hashed.to_numpy().astype(str)
+
+
+def load_manifest(path):
+    """처리 상태 기록 읽기 (없거나 형식이 다르면 None)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(path, input_hashes, keys, hashes, matched_keys):
+    """처리 상태 기록 저장 (임시 파일에 쓴 뒤 교체)"""
+    matched = set(int(k) for k in matched_keys)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "inputs": input_hashes,
+        "rows": {str(int(k)): h for k, h in zip(keys, hashes)},
+        "unmatched": sorted(str(int(k)) for k in keys if int(k) not in matched),
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def add_manifest_rows(path, inputs, keys, hashes, matched_keys):
+    """다른 경로(API 접수 압축)로 매칭을 끝낸 행을 처리 상태 기록에 추가 (기록이 없으면 False)
+
+    - inputs: 바뀐 입력 파일 해시만 (예: {"roadkill": ...})
+    """
+    manifest = load_manifest(path)
+    if manifest is None:
+        return False
+    matched = set(int(k) for k in matched_keys)
+    unmatched = set(manifest["unmatched"])
+    for k, h in zip(keys, hashes):
+        manifest["rows"][str(int(k))] = h
+        if int(k) in matched:
+            unmatched.discard(str(int(k)))
+        else:
+            unmatched.add(str(int(k)))
+    manifest["unmatched"] = sorted(unmatched)
+    manifest["inputs"].update(inputs)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return True
+
+
+def pending_rows(manifest, keys, hashes, weather_changed):
+    """다시 매칭해야 하는 행 마스크
+
+    - 새 행, 내용이 바뀐 행
+    - 기상 데이터가 바뀌었으면 이전에 매칭되지 않았던 행도 포함
+    """
+    processed = manifest["rows"]
+    key_strings = keys.astype(str)
+    pending = np.array(
+        [processed.get(k) != h for k, h in zip(key_strings, hashes)], dtype=bool
+    )
+    if weather_changed:
+        pending |= np.isin(key_strings, manifest["unmatched"])
+    return pending
+
+
+def upsert_rows(existing, updates, existing_keys, update_keys, order_keys):
+    """키 기준 upsert 후 order_keys(원본 순서)대로 정렬
+
+    - existing 중 updates에 같은 키가 있거나 order_keys에 없는(삭제된) 행은 제거
+    """
+    keep = ~np.isin(existing_keys, update_keys) & np.isin(existing_keys, order_keys)
+    combined = pd.concat([existing[keep], updates], ignore_index=True)
+    combined_keys = np.concatenate([existing_keys[keep], update_keys])
+    rank = pd.Index(order_keys).get_indexer(combined_keys)
+    return combined.iloc[np.argsort(rank, kind="stable")].reset_index(drop=True)
+
+
+def load_processed_outputs(processed_dir, missing_ok=True):
+    """기존 결과 테이블 3개 읽기 (매칭 결과와 같은 CSV 표기로 변환)
+
+    - 테이블마다 따로 읽고, 하나라도 없으면 None (missing_ok=False면 없는 테이블 이름을 담은 FileNotFoundError)
+    """
+    tables, missing = [], []
+    for name in OUTPUT_TABLES:
+        try:
+            tables.append(to_csv_frame(read_table(name, processed_dir=processed_dir), name))
+        except FileNotFoundError:
+            missing.append(name)
+    if missing:
+        if missing_ok:
+            return None
+        raise FileNotFoundError(f"결과 테이블이 없습니다: {', '.join(missing)} ({processed_dir})")
+    roadkill, weather, matching = tables
+    roadkill["접수일자"] = pd.to_datetime(roadkill["접수일자"])
+    return roadkill, weather, matching
+
+
+def merge_incremental(existing, updates, order_keys):
+    """기존 결과에 새로 매칭한 결과를 upsert
+
+    - 로드킬/매칭 테이블: (연도, 일련번호) 키 기준, 원본 파일 순서 유지
+    - 날씨 테이블: (지점번호, 일자) 중복 제거, 매칭 테이블에서 참조하는 행만 첫 등장 순서로 유지
+    """
+    old_roadkill, old_weather, old_matching = existing
+    new_roadkill, new_weather, new_matching = updates
+    update_keys = row_keys(new_roadkill["일련번호"], new_roadkill["접수일자"])
+
+    roadkill = upsert_rows(
+        old_roadkill, new_roadkill,
+        row_keys(old_roadkill["일련번호"], old_roadkill["접수일자"]), update_keys, order_keys
+    )
+    matching = upsert_rows(
+        old_matching, new_matching,
+        row_keys(old_matching["일련번호"], old_matching["접수일자"]), update_keys, order_keys
+    )
+
+    weather = order_weather_table(pd.concat([new_weather, old_weather], ignore_index=True), matching)
+
+    return roadkill, weather, matching
@@ -0,0 +1,176 @@
+"""
+Module: processed_store
+Description: data/processed 결과 테이블 공용 읽기/쓰기 (Parquet 컬럼 저장 + 호환용 CSV).
+"""
+
+import argparse
+import csv
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow가 없으면 CSV만 사용
+    pa = pq = None
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
+
+# 테이블별 날짜 컬럼과 CSV 표기 형식
+DATE_FORMATS = {
+    "roadkill_data": {"접수일자": "%Y-%m-%d"},
+    "weather_data": {"일자": "%Y%m%d"},
+    "roadkill_weather_matching": {"접수일자": "%Y%m%d"},
+    "animalType_data": {},
+    "report_road_type_data": {},
+    "report_road_data": {},
+    "report_month_data": {},
+    "roadkill_merged": {"접수일자": "%Y-%m-%d"},
+}
+
+# 테이블별 날짜 외 컬럼 타입 (목록에 없는 컬럼은 pandas 기본 추론)
+TABLE_DTYPES = {
+    "roadkill_data": {
+        "일련번호": "int64", "접수시각": "str", "관할기관": "category",
+        "위도": "float64", "경도": "float64",
+    },
+    "weather_data": {
+        "지점번호": "int64", "지점명": "category",
+        "일평균기온": "float64", "강수량": "float64", "일평균풍속": "float64", "일조시간": "float64",
+        "전운량": "float64", "강수계속시간": "float64", "습도": "float64",
+    },
+    "roadkill_weather_matching": {
+        "일련번호": "int64", "지점번호": "int64", "접수시각": "str",
+        "거리_km": "float64", "관측소_운영여부": "bool", "일자_오프셋": "int8",
+    },
+    "animalType_data": {"종명": "str", "건수": "int64", "비율(%)": "float64"},
+    "report_road_type_data": {"도로유형": "str", "건수": "int64", "비율(%)": "float64"},
+    "report_road_data": {"도로유형": "category", "도로명": "str", "건수": "int64", "비율(%)": "float64"},
+    "report_month_data": {"월": "str", "건수": "int64", "비율(%)": "float64"},
+    "roadkill_merged": {"일련번호": "int64", "접수시각": "category", "관할기관": "category"},
+}
+
+
+def table_paths(name, processed_dir=PROCESSED_DIR):
+    """테이블 이름 → (CSV 경로, Parquet 경로)"""
+    base = os.path.join(processed_dir, name)
+    return base + ".csv", base + ".parquet"
+
+
+def to_typed(df, name):
+    """CSV 표기 그대로의 DataFrame → 날짜/범주/숫자 타입 DataFrame"""
+    typed = df.copy()
+    for column, fmt in DATE_FORMATS.get(name, {}).items():
+        if column in typed.columns and not pd.api.types.is_datetime64_any_dtype(typed[column]):
+            typed[column] = pd.to_datetime(typed[column].astype("string"), format=fmt, errors="coerce")
+    for column, dtype in TABLE_DTYPES.get(name, {}).items():
+        if column not in typed.columns:
+            continue
+        if dtype == "str":  # 결측값은 "nan" 문자열이 되지 않도록 그대로 유지
+            typed[column] = typed[column].where(typed[column].isna(), typed[column].astype(str))
+        else:
+            typed[column] = typed[column].astype(dtype)
+    return typed
+
+
+def to_csv_frame(df, name):
+    """타입 DataFrame → CSV 표기와 같은 값의 DataFrame (날짜는 문자열, 범주는 일반 문자열)"""
+    frame = df.copy()
+    for column, fmt in DATE_FORMATS.get(name, {}).items():
+        if column in frame.columns and pd.api.types.is_datetime64_any_dtype(frame[column]):
+            frame[column] = frame[column].dt.strftime(fmt).astype(object).where(frame[column].notna(), None)
+    for column in frame.columns:
+        if isinstance(frame[column].dtype, pd.CategoricalDtype):
+            frame[column] = frame[column].astype(object)
+    return frame
+
+
+def write_table(df, name, processed_dir=PROCESSED_DIR):
+    """결과 테이블 저장 (CSV는 기존 형식 그대로, Parquet은 타입을 붙여 함께 저장)"""
+    csv_path, parquet_path = table_paths(name, processed_dir)
+    tmp_path = csv_path + ".tmp"  # API 서버가 쓰는 중인 CSV를 읽지 않도록 임시 파일에 쓴 뒤 교체
+    df.to_csv(tmp_path, index=False, encoding="utf-8-sig")
+    os.replace(tmp_path, csv_path)
+    if pq is not None:
+        tmp_path = parquet_path + ".tmp"
+        pq.write_table(pa.Table.from_pandas(to_typed(df, name), preserve_index=False), tmp_path)
+        os.replace(tmp_path, parquet_path)
+
+
+def append_table(df, name, processed_dir=PROCESSED_DIR):
+    """결과 테이블 끝에 행 추가 (CSV는 이어 쓰기, Parquet은 기존 Parquet과 합쳐 다시 저장)
+
+    - 컬럼은 기존 CSV 헤더 순서에 맞춤 (헤더에 없는 컬럼은 버리고, 없는 컬럼은 빈 값)
+    - Parquet이 CSV보다 오래됐으면(이미 어긋나 있으면) 지우고 CSV만 사용
+    """
+    csv_path, parquet_path = table_paths(name, processed_dir)
+    parquet_fresh = os.path.exists(parquet_path) and os.path.exists(csv_path) and \
+        os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
+    if not os.path.exists(csv_path):
+        write_table(df, name, processed_dir)
+        return
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        header = next(csv.reader(f), None)
+    if header:
+        df = df.reindex(columns=header)
+    df.to_csv(csv_path, mode="a", header=False, index=False, encoding="utf-8")  # BOM은 파일 처음에만
+    if pq is None or not parquet_fresh:
+        if os.path.exists(parquet_path):
+            os.remove(parquet_path)
+        return
+    existing = pq.read_table(parquet_path).to_pandas()
+    combined = to_typed(pd.concat([existing, to_typed(df, name)], ignore_index=True), name)  # 범주 합치기
+    tmp_path = parquet_path + ".tmp"
+    pq.write_table(pa.Table.from_pandas(combined, preserve_index=False), tmp_path)
+    os.replace(tmp_path, parquet_path)
+
+
+def read_table(name, columns=None, processed_dir=PROCESSED_DIR):
+    """결과 테이블 읽기 (타입 DataFrame)
+
+    - CSV보다 오래되지 않은 Parquet이 있으면 메모리 매핑으로 필요한 컬럼만 읽음
+    - 없으면 CSV에서 필요한 컬럼만 읽어 같은 타입으로 변환
+    - 파일이 모두 없으면 FileNotFoundError
+    """
+    csv_path, parquet_path = table_paths(name, processed_dir)
+    if pq is not None and os.path.exists(parquet_path) and (
+        not os.path.exists(csv_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
+    ):
+        return pq.read_table(parquet_path, columns=columns, memory_map=True).to_pandas()
+
+    dates = DATE_FORMATS.get(name, {})
+    dtypes = {column: "str" for column in dates}
+    dtypes.update(TABLE_DTYPES.get(name, {}))
+    frame = pd.read_csv(csv_path, encoding="utf-8-sig", usecols=columns, dtype=dtypes)
+    return to_typed(frame, name)
+
+
+def convert_all(processed_dir=PROCESSED_DIR, names=None):
+    """CSV만 있는 결과 테이블을 Parquet으로 변환"""
+    if pq is None:
+        print("❌ pyarrow가 설치되어 있지 않습니다 (pip install pyarrow)")
+        return
+    for name in names or DATE_FORMATS:
+        csv_path, parquet_path = table_paths(name, processed_dir)
+        if not os.path.exists(csv_path):
+            print(f"⚠️ 파일 없음: {csv_path}")
+            continue
+        typed = read_table(name, processed_dir=processed_dir)
+        tmp_path = parquet_path + ".tmp"
+        pq.write_table(pa.Table.from_pandas(typed, preserve_index=False), tmp_path)
+        os.replace(tmp_path, parquet_path)
+        print(f"✅ {name}: {len(typed):,}행 → {parquet_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="data/processed CSV → Parquet 변환")
+    parser.add_argument("tables", nargs="*", help="변환할 테이블 이름 (기본: 전체)")
+    parser.add_argument("--dir", default=PROCESSED_DIR, help="결과 테이블 폴더")
+    args = parser.parse_args()
+    convert_all(args.dir, args.tables)
+
+
+if __name__ == "__main__":
+    main()
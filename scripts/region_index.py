@@ -0,0 +1,237 @@
+"""
+Module: region_index
+Description: 행정구역 경계(GeoJSON)로 좌표 배열의 소속 지역을 한 번에 찾는 인덱스 (STRtree + 격자 캐시, DB 조회 없음).
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.geometry import shape
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REGIONS_PATH = os.path.join(BASE_DIR, "frontend", "public", "data", "korea_regions.geojson")
+ROADKILL_PATH = os.path.join(BASE_DIR, "data", "processed", "roadkill_data.csv")
+OUTPUT_PATH = os.path.join(BASE_DIR, "data", "processed", "roadkill_region_data.csv")
+
+NAME_PROPERTY = "name"  # 지역 이름이 들어 있는 feature 속성 (프론트엔드 지도와 같은 값)
+REGION_COLUMN = "행정구역"
+CELL_DEG = 0.01         # 격자 칸 크기 (도, 약 1km)
+GRID_BLOCK = 8          # 격자를 처음 판정할 때 묶는 칸 수 (가로·세로)
+CHUNK_ROWS = 200_000
+
+# 격자 칸 값 (0 이상은 지역 위치)
+OUTSIDE = -1   # 어느 지역과도 겹치지 않는 칸
+BOUNDARY = -2  # 경계가 지나가는 칸 (점마다 도형 판정)
+
+
+class RegionIndex:
+    """행정구역 소속 판정 인덱스
+
+    - 경계는 한 번만 읽어 STRtree로 색인하고, 전체 범위를 CELL_DEG 격자로 나눠 칸마다 결과를 미리 계산
+    - 한 지역 안에 완전히 들어가는 칸(대부분)은 도형 판정 없이 격자 값으로 바로 결정
+    - 경계가 지나가는 칸의 점만 STRtree 후보와 점-도형 판정 (경계선 위의 점은 앞쪽 지역)
+    """
+
+    def __init__(self, names, geometries, cell_deg=CELL_DEG):
+        if len(names) != len(geometries) or len(names) == 0:
+            raise ValueError("지역 이름과 경계 도형 수가 같아야 하고 1개 이상이어야 합니다")
+        if cell_deg <= 0:
+            raise ValueError(f"격자 칸 크기는 0보다 커야 합니다: {cell_deg}")
+        self.names = np.asarray(names, dtype=object)
+        self.geometries = np.asarray(geometries, dtype=object)
+        shapely.prepare(self.geometries)
+        self._tree = shapely.STRtree(self.geometries)
+        self.cell_deg = float(cell_deg)
+        self._build_grid()
+
+    @classmethod
+    def from_geojson(cls, path=REGIONS_PATH, name_property=NAME_PROPERTY, cell_deg=CELL_DEG):
+        """GeoJSON FeatureCollection → 인덱스 (경계가 없거나 이름이 없는 feature는 제외)"""
+        with open(path, "r", encoding="utf-8") as f:
+            features = json.load(f)["features"]
+        names, geometries = [], []
+        for feature in features:
+            name = (feature.get("properties") or {}).get(name_property)
+            if name is None or not feature.get("geometry"):
+                continue
+            geometry = shapely.make_valid(shape(feature["geometry"]))
+            if geometry.is_empty:
+                continue
+            names.append(str(name))
+            geometries.append(geometry)
+        return cls(names, geometries, cell_deg)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _classify(self, x0, y0, size):
+        """왼쪽 아래 꼭짓점이 (x0, y0)인 정사각형 칸 배열 → 칸 값 (OUTSIDE / 지역 위치 / BOUNDARY)"""
+        cells = shapely.box(x0, y0, x0 + size, y0 + size)
+        values = np.full(len(cells), OUTSIDE, dtype=np.int32)
+        # STRtree는 경계 상자 후보만 찾고, 판정은 미리 준비(prepare)한 지역 도형 쪽에서 수행
+        cell_pos, region_pos = self._tree.query(cells)
+        hit = shapely.intersects(self.geometries[region_pos], cells[cell_pos])
+        cell_pos, region_pos = cell_pos[hit], region_pos[hit]
+        counts = np.bincount(cell_pos, minlength=len(cells))
+        values[counts > 1] = BOUNDARY
+
+        # 겹치는 지역이 하나뿐인 칸: 그 지역이 칸 전체를 덮는지 확인
+        single = counts[cell_pos] == 1
+        cell_pos, region_pos = cell_pos[single], region_pos[single]
+        covered = shapely.covers(self.geometries[region_pos], cells[cell_pos])
+        values[cell_pos] = np.where(covered, region_pos, BOUNDARY)
+        return values
+
+    def _build_grid(self):
+        """칸마다 (겹치는 지역이 없으면 OUTSIDE, 한 지역이 칸 전체를 덮으면 그 위치, 아니면 BOUNDARY)
+
+        - GRID_BLOCK × GRID_BLOCK 칸 묶음으로 먼저 판정하고, 경계가 지나가는 묶음만 칸 단위로 다시 판정
+        """
+        min_lon, min_lat, max_lon, max_lat = shapely.total_bounds(self.geometries)
+        self.min_lon, self.min_lat = min_lon, min_lat
+        n_blocks_lon = max(int(np.ceil((max_lon - min_lon) / (self.cell_deg * GRID_BLOCK))), 1)
+        n_blocks_lat = max(int(np.ceil((max_lat - min_lat) / (self.cell_deg * GRID_BLOCK))), 1)
+        self.n_lon = n_blocks_lon * GRID_BLOCK
+        self.n_lat = n_blocks_lat * GRID_BLOCK
+
+        # 1) 묶음 단위 판정 → 묶음 안 모든 칸에 같은 값
+        block_x, block_y = np.meshgrid(np.arange(n_blocks_lon), np.arange(n_blocks_lat))
+        block_x, block_y = block_x.ravel(), block_y.ravel()
+        block_deg = self.cell_deg * GRID_BLOCK
+        blocks = self._classify(min_lon + block_x * block_deg, min_lat + block_y * block_deg, block_deg)
+        grid = np.repeat(np.repeat(blocks.reshape(n_blocks_lat, n_blocks_lon), GRID_BLOCK, axis=0), GRID_BLOCK, axis=1)
+
+        # 2) 경계 묶음 안의 칸만 다시 판정
+        split = blocks == BOUNDARY
+        sub_x, sub_y = np.meshgrid(np.arange(GRID_BLOCK), np.arange(GRID_BLOCK))
+        ix = (block_x[split, None] * GRID_BLOCK + sub_x.ravel()).ravel()
+        iy = (block_y[split, None] * GRID_BLOCK + sub_y.ravel()).ravel()
+        grid[iy, ix] = self._classify(min_lon + ix * self.cell_deg, min_lat + iy * self.cell_deg, self.cell_deg)
+        self.grid = grid
+
+    def grid_summary(self):
+        """격자 칸 수 (지역 내부 / 경계 / 바깥)"""
+        return {
+            "cells": int(self.grid.size),
+            "inside": int((self.grid >= 0).sum()),
+            "boundary": int((self.grid == BOUNDARY).sum()),
+            "outside": int((self.grid == OUTSIDE).sum()),
+        }
+
+    def lookup(self, lat, lon):
+        """좌표 배열마다 소속 지역 위치 (어느 지역에도 속하지 않거나 좌표가 없으면 -1)"""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        with np.errstate(invalid="ignore"):
+            ix = np.floor((lon - self.min_lon) / self.cell_deg)
+            iy = np.floor((lat - self.min_lat) / self.cell_deg)
+            in_grid = (ix >= 0) & (ix < self.n_lon) & (iy >= 0) & (iy < self.n_lat)  # NaN은 False
+
+        positions = np.full(len(lat), OUTSIDE, dtype=np.int32)
+        positions[in_grid] = self.grid[iy[in_grid].astype(np.intp), ix[in_grid].astype(np.intp)]
+
+        # 경계 칸의 점만 도형 판정 (여러 지역에 걸리면 가장 앞 지역)
+        exact = np.flatnonzero(positions == BOUNDARY)
+        if len(exact):
+            positions[exact] = OUTSIDE
+            points = shapely.points(lon[exact], lat[exact])
+            point_pos, region_pos = self._tree.query(points)
+            hit = shapely.intersects(self.geometries[region_pos], points[point_pos])
+            point_pos, region_pos = point_pos[hit], region_pos[hit]
+            order = np.lexsort((region_pos, point_pos))
+            point_pos, region_pos = point_pos[order], region_pos[order]
+            first = np.r_[True, point_pos[1:] != point_pos[:-1]]
+            positions[exact[point_pos[first]]] = region_pos[first]
+        return positions
+
+    def assign(self, lat, lon):
+        """좌표 배열마다 소속 지역 이름 (없으면 None)"""
+        positions = self.lookup(lat, lon)
+        names = np.empty(len(positions), dtype=object)
+        found = positions >= 0
+        names[found] = self.names[positions[found]]
+        return names
+
+
+class RegionIndexCache:
+    """경계 파일이 바뀔 때만 인덱스를 다시 만드는 캐시 (API 서버용, 스레드 안전)"""
+
+    def __init__(self, path=REGIONS_PATH, name_property=NAME_PROPERTY, cell_deg=CELL_DEG):
+        self.path = path
+        self.name_property = name_property
+        self.cell_deg = cell_deg
+        self._index = None
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """현재 인덱스 (경계 파일이 없으면 FileNotFoundError)"""
+        stat = os.stat(self.path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if self._index is None or self._signature != signature:
+                self._index = RegionIndex.from_geojson(self.path, self.name_property, self.cell_deg)
+                self._signature = signature
+            return self._index
+
+
+def assign_regions_csv(index, input_path=ROADKILL_PATH, output_path=OUTPUT_PATH,
+                       lat_column="위도", lon_column="경도", region_column=REGION_COLUMN,
+                       chunk_rows=CHUNK_ROWS):
+    """좌표가 있는 CSV를 청크 단위로 읽어 지역 컬럼을 붙여 저장 → (전체 행 수, 지역을 찾은 행 수)"""
+    tmp_path = output_path + ".tmp"
+    n_rows = n_found = 0
+    reader = pd.read_csv(input_path, encoding="utf-8-sig", dtype=str, keep_default_na=False, chunksize=chunk_rows)
+    for i, chunk in enumerate(reader):
+        regions = index.assign(
+            pd.to_numeric(chunk[lat_column], errors="coerce"),
+            pd.to_numeric(chunk[lon_column], errors="coerce"),
+        )
+        chunk[region_column] = regions
+        chunk.to_csv(tmp_path, mode="w" if i == 0 else "a", header=i == 0, index=False,
+                     encoding="utf-8-sig" if i == 0 else "utf-8")
+        n_rows += len(chunk)
+        n_found += int(pd.notna(regions).sum())
+    os.replace(tmp_path, output_path)
+    return n_rows, n_found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="좌표 CSV에 행정구역 이름 일괄 지정 (GeoJSON 경계 기준)")
+    parser.add_argument("--regions", default=REGIONS_PATH, help="행정구역 경계 GeoJSON")
+    parser.add_argument("--name-property", default=NAME_PROPERTY, help="지역 이름 feature 속성")
+    parser.add_argument("--cell-deg", type=float, default=CELL_DEG, help="격자 칸 크기 (도)")
+    parser.add_argument("--input", default=ROADKILL_PATH, help="좌표가 있는 CSV")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="지역 컬럼을 붙여 저장할 CSV")
+    parser.add_argument("--lat", default="위도", help="위도 컬럼")
+    parser.add_argument("--lon", default="경도", help="경도 컬럼")
+    parser.add_argument("--column", default=REGION_COLUMN, help="추가할 지역 컬럼 이름")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.regions):
+        print(f"❌ 행정구역 경계 파일이 없습니다: {args.regions}")
+        return
+
+    # 1️⃣ 경계 읽기 + 격자 캐시 계산
+    start = time.time()
+    index = RegionIndex.from_geojson(args.regions, args.name_property, args.cell_deg)
+    summary = index.grid_summary()
+    print(f"✅ 행정구역 {len(index):,}개, 격자 {index.n_lat}×{index.n_lon} "
+          f"(내부 {summary['inside']:,}칸, 경계 {summary['boundary']:,}칸) - {time.time() - start:.2f}초")
+
+    # 2️⃣ 좌표별 지역 지정
+    start = time.time()
+    n_rows, n_found = assign_regions_csv(
+        index, args.input, args.output, args.lat, args.lon, args.column
+    )
+    print(f"✅ {n_rows:,}건 중 {n_found:,}건 지역 지정 ({time.time() - start:.2f}초) - {args.output}")
+
+
+if __name__ == "__main__":
+    main()
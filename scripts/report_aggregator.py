@@ -0,0 +1,255 @@
+"""
+Module: report_aggregator
+Description: 로드킬 신고 데이터(report_roadkill_data.csv) 종별/도로유형별/도로별/월별 건수를 한 번에 스트리밍 집계.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+
+import pandas as pd
+
+from processed_store import PROCESSED_DIR, read_table, write_table
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT_PATH = os.path.join(BASE_DIR, "data", "raw", "report", "report_roadkill_data.csv")
+STATE_FILE = "report_aggregate_state.json"
+
+STATE_VERSION = 1
+BLOCK_BYTES = 8 << 20      # 한 번에 읽는 바이트 수 (메모리 사용량 상한)
+FINGERPRINT_BYTES = 64 << 10  # 파일이 교체됐는지 확인할 때 비교하는 앞부분 크기
+REPORT_COLUMNS = ["종명", "접수일시", "도로유형", "도로명"]
+
+# 집계 이름 → 결과 테이블 이름, 키 컬럼
+AGGREGATES = {
+    "species": ("animalType_data", ["종명"]),
+    "road_type": ("report_road_type_data", ["도로유형"]),
+    "road": ("report_road_data", ["도로유형", "도로명"]),
+    "month": ("report_month_data", ["월"]),
+}
+
+
+def file_fingerprint(path, length=FINGERPRINT_BYTES):
+    """파일 앞 length바이트 SHA-256 (앞부분이 같고 크기가 줄지 않았으면 뒤에 행만 추가된 것으로 봄)"""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read(length)).hexdigest()
+
+
+class ReportAggregator:
+    """신고 데이터 스트리밍 집계 상태
+
+    - offset: 집계를 끝낸 바이트 위치 (마지막 줄바꿈 다음, 다음 실행은 여기서부터 이어서 읽음)
+    - counts: 집계별 {키: 건수} (처음 나온 순서 유지, 키 개수만큼만 메모리 사용)
+    - bad_lines: 필드 수가 맞지 않아 건너뛴 줄 수
+    - tail_counts, tail_rows: 파일 끝의 줄바꿈 없는 마지막 줄 (결과 테이블에만 더하고 상태에는 저장하지 않음,
+      쓰는 중인 줄일 수 있으므로 다음 실행에서 offset부터 다시 읽음)
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """빈 상태로 초기화 (파일이 교체됐을 때 처음부터 다시 집계)"""
+        self.offset = 0
+        self.rows = 0
+        self.bad_lines = 0
+        self.fingerprint = None
+        self.fingerprint_bytes = 0
+        self.counts = {name: {} for name in AGGREGATES}
+        self.tail_rows = 0
+        self.tail_counts = {name: {} for name in AGGREGATES}
+
+    @classmethod
+    def load(cls, path):
+        """저장된 상태 읽기 (없거나 형식이 다르면 빈 상태)"""
+        aggregator = cls()
+        if not os.path.exists(path):
+            return aggregator
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return aggregator
+        if state.get("version") != STATE_VERSION:
+            return aggregator
+        aggregator.offset = state["offset"]
+        aggregator.rows = state["rows"]
+        aggregator.bad_lines = state.get("bad_lines", 0)
+        aggregator.fingerprint = state["fingerprint"]
+        aggregator.fingerprint_bytes = state.get("fingerprint_bytes", FINGERPRINT_BYTES)
+        aggregator.counts = {
+            name: {tuple(key): count for key, count in state["counts"][name]} for name in AGGREGATES
+        }
+        return aggregator
+
+    def save(self, path):
+        state = {
+            "version": STATE_VERSION,
+            "offset": self.offset,
+            "rows": self.rows,
+            "bad_lines": self.bad_lines,
+            "fingerprint": self.fingerprint,
+            "fingerprint_bytes": self.fingerprint_bytes,
+            "counts": {name: [[list(key), count] for key, count in counts.items()] for name, counts in self.counts.items()},
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _read_lines(self, data):
+        """완전한 줄 묶음 → DataFrame (필드 수가 맞지 않는 줄은 건너뛰고 bad_lines에 더함)"""
+        options = dict(header=None, names=REPORT_COLUMNS, dtype=str, encoding="utf-8")
+        try:
+            return pd.read_csv(io.BytesIO(data), **options)
+        except pd.errors.ParserError:
+            # 잘못된 줄이 있는 블록만 파이썬 엔진으로 다시 읽어 줄 단위로 걸러냄
+            bad = []
+            chunk = pd.read_csv(io.BytesIO(data), engine="python", on_bad_lines=bad.append, **options)
+            self.bad_lines += len(bad)
+            print(f"⚠️ 필드 수가 맞지 않는 줄 {len(bad):,}개 건너뜀 (예: {','.join(bad[0])})")
+            return chunk
+
+    def _add_chunk(self, chunk, tail=False):
+        """데이터 행 청크 하나를 집계에 더함 (tail=True면 줄바꿈 없는 마지막 줄)"""
+        dates = pd.to_datetime(chunk["접수일시"], errors="coerce", format="ISO8601")
+        chunk = chunk.assign(월=dates.dt.strftime("%Y-%m"))
+        for name, (_, keys) in AGGREGATES.items():
+            counts = self.tail_counts[name] if tail else self.counts[name]
+            grouped = chunk.groupby(keys, sort=False, dropna=True).size()  # 키가 비어 있는 행은 제외
+            for key, count in grouped.items():
+                key = key if isinstance(key, tuple) else (key,)
+                counts[key] = counts.get(key, 0) + int(count)
+        if tail:
+            self.tail_rows += len(chunk)
+        else:
+            self.rows += len(chunk)
+
+    def update(self, path, block_bytes=BLOCK_BYTES):
+        """파일에서 아직 집계하지 않은 부분만 읽어 집계 (파일이 교체됐으면 처음부터) → 새로 집계한 행 수 (tail 제외)
+
+        - offset은 마지막 줄바꿈까지만 전진, 줄바꿈 없는 마지막 줄은 tail로만 집계
+        """
+        size = os.path.getsize(path)
+        if size < self.offset or file_fingerprint(path, self.fingerprint_bytes) != self.fingerprint:
+            self.reset()
+        self.tail_rows = 0
+        self.tail_counts = {name: {} for name in AGGREGATES}
+
+        rows_before = self.rows
+        with open(path, "rb") as f:
+            if self.offset == 0:
+                header = f.readline()
+                if header.decode("utf-8-sig").strip().split(",") != REPORT_COLUMNS:
+                    raise ValueError(f"예상한 컬럼이 아닙니다: {header.decode('utf-8-sig').strip()}")
+                self.offset = f.tell()
+            f.seek(self.offset)
+
+            pending = b""
+            while True:
+                block = f.read(block_bytes)
+                if not block:
+                    break
+                # 완전한 줄까지만 처리하고 나머지는 다음 블록과 이어 붙임
+                block = pending + block
+                end = block.rfind(b"\n") + 1
+                pending = block[end:]
+                if end:
+                    self._add_chunk(self._read_lines(block[:end]))
+                    self.offset += end
+
+            # 줄바꿈 없는 마지막 줄: 결과에는 포함하되 offset은 그대로 (쓰는 중이면 다음 실행에서 완성된 줄로 다시 읽음)
+            if pending.strip():
+                self._add_chunk(self._read_lines(pending), tail=True)
+
+        # 지문은 이미 집계한 앞부분으로만 (뒤에 행이 추가돼도 바뀌지 않도록)
+        self.fingerprint_bytes = min(FINGERPRINT_BYTES, self.offset)
+        self.fingerprint = file_fingerprint(path, self.fingerprint_bytes)
+        return self.rows - rows_before
+
+    def tables(self, previous=None):
+        """집계별 결과 DataFrame (건수 내림차순, 비율은 전체 신고 건수 대비 %)
+
+        - 같은 건수는 기존 결과 테이블의 행 순서 (previous: {테이블 이름: {키: 행 위치}}), 새 키는 그 뒤에 처음 나온 순서
+        """
+        previous = previous or {}
+        rows = self.rows + self.tail_rows
+        tables = {}
+        for name, (table_name, keys) in AGGREGATES.items():
+            counts = dict(self.counts[name])
+            for key, count in self.tail_counts[name].items():
+                counts[key] = counts.get(key, 0) + count
+            order = previous.get(table_name, {})
+            frame = pd.DataFrame([list(key) for key in counts], columns=keys)
+            frame["건수"] = pd.Series(list(counts.values()), dtype="int64")
+            frame["비율(%)"] = (frame["건수"] / rows * 100).round(2) if rows else 0.0
+            frame["순서"] = pd.Series(
+                [order.get(key, len(order) + i) for i, key in enumerate(counts)], dtype="int64"
+            )
+            frame = frame.sort_values(["건수", "순서"], ascending=[False, True], kind="stable")
+            tables[table_name] = frame.drop(columns="순서").reset_index(drop=True)
+        return tables
+
+
+def previous_order(processed_dir=PROCESSED_DIR):
+    """기존 결과 테이블별 {키: 행 위치} (같은 건수 정렬 기준, 테이블이 없으면 빈 dict)
+
+    - 기존 animalType_data.csv는 value_counts의 불안정 정렬로 같은 건수 순서가 정해져 있어
+      데이터에서 다시 계산할 수 없으므로 저장된 행 순서를 그대로 이어 감
+    """
+    orders = {}
+    for table_name, keys in AGGREGATES.values():
+        try:
+            table = read_table(table_name, columns=keys, processed_dir=processed_dir)
+        except FileNotFoundError:
+            continue
+        rows = table.astype(str).itertuples(index=False, name=None)
+        orders[table_name] = {key: position for position, key in enumerate(rows)}
+    return orders
+
+
+def aggregate_reports(report_path=REPORT_PATH, processed_dir=PROCESSED_DIR, full=False, block_bytes=BLOCK_BYTES):
+    """신고 데이터 집계 후 결과 테이블 저장
+
+    - full=False: 저장된 상태에 이어서 새로 추가된 행만 집계
+    - full=True: 상태를 버리고 처음부터 다시 집계
+    """
+    start = time.time()
+    state_path = os.path.join(processed_dir, STATE_FILE)
+    if not os.path.exists(report_path):
+        print(f"❌ 파일을 찾을 수 없습니다: {report_path}")
+        return None
+
+    aggregator = ReportAggregator() if full else ReportAggregator.load(state_path)
+    added = aggregator.update(report_path, block_bytes)
+    print(f"새로 집계한 신고: {added:,}건 (전체 {aggregator.rows + aggregator.tail_rows:,}건)")
+    if aggregator.tail_rows:
+        print(f"줄바꿈 없는 마지막 줄 {aggregator.tail_rows:,}건은 결과에만 포함 (다음 실행에서 다시 읽음)")
+    if aggregator.bad_lines:
+        print(f"⚠️ 지금까지 필드 수가 맞지 않아 건너뛴 줄: {aggregator.bad_lines:,}개")
+
+    os.makedirs(processed_dir, exist_ok=True)
+    tables = aggregator.tables(previous_order(processed_dir))
+    for table_name, table in tables.items():
+        write_table(table, table_name, processed_dir)
+        print(f"✅ {table_name}: {len(table):,}행")
+    aggregator.save(state_path)
+
+    print(f"완료 ({time.time() - start:.2f}초)")
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로드킬 신고 데이터 종별/도로별/월별 스트리밍 집계")
+    parser.add_argument("--input", default=REPORT_PATH, help="신고 데이터 CSV")
+    parser.add_argument("--full", action="store_true", help="저장된 집계 상태를 무시하고 처음부터 다시 집계")
+    parser.add_argument("--block-mb", type=int, default=BLOCK_BYTES >> 20, help="한 번에 읽는 크기 (MB)")
+    args = parser.parse_args()
+    aggregate_reports(args.input, full=args.full, block_bytes=args.block_mb << 20)
+
+
+if __name__ == "__main__":
+    main()
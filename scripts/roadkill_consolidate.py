@@ -0,0 +1,199 @@
+"""
+Module: roadkill_consolidate
+Description: 연도별/월별 로드킬 원본 CSV를 하나의 병합 테이블(roadkill_merged)로 통합 (중복 제거, 좌표 검증, 날짜 정렬, 새 파일만 추가).
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from merge_manifest import file_sha256, row_keys
+from processed_store import append_table, read_table, table_paths, to_csv_frame, write_table
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROADKILL_DIR = os.path.join(BASE_DIR, "data", "raw", "roadkill")
+MERGED_TABLE = "roadkill_merged"
+STATE_FILE = "roadkill_merged_state.json"
+STATE_VERSION = 1
+
+# 원본 파일 이름 (roadkill_2020.csv 같은 연도별, roadkill_202301.csv 같은 월별)
+SOURCE_PATTERN = "roadkill_[0-9]*.csv"
+
+# API로 접수한 신고를 모아 두는 원본 파일 (backend/roadkill_ingest.py가 이어 씀, 항상 마지막에 읽음)
+INGEST_SOURCE = "roadkill_ingest.csv"
+
+# 병합 테이블 컬럼 (신고구분/신고내용 같은 긴 문자열은 읽지 않음)
+MERGED_COLUMNS = ["일련번호", "접수일자", "접수시각", "관할기관", "GPS X", "GPS Y"]
+CHUNK_ROWS = 100_000
+
+# 남한 좌표 범위 (마라도 ~ 강원 고성, 백령도 ~ 독도)
+KOREA_LAT = (33.0, 38.7)
+KOREA_LON = (124.5, 132.0)
+
+
+def source_files(roadkill_dir=ROADKILL_DIR):
+    """원본 CSV 목록 (파일 이름 순, API 접수 파일은 마지막)"""
+    paths = sorted(glob.glob(os.path.join(roadkill_dir, SOURCE_PATTERN)))
+    ingest_path = os.path.join(roadkill_dir, INGEST_SOURCE)
+    if os.path.exists(ingest_path):
+        paths.append(ingest_path)
+    return paths
+
+
+def read_source(path, chunk_rows=CHUNK_ROWS):
+    """원본 CSV 하나를 청크 단위로 읽어 (정리된 청크, 읽은 행 수) 반환
+
+    - 필요한 컬럼만 읽고 일련번호/접수일자/좌표를 타입 변환
+    - 일련번호·접수일자가 없거나 좌표가 남한 범위 밖인 행은 제외
+    """
+    text_columns = {column: str for column in MERGED_COLUMNS if not column.startswith("GPS")}
+    reader = pd.read_csv(
+        path, encoding="utf-8-sig", usecols=MERGED_COLUMNS, dtype=text_columns,
+        float_precision="round_trip",  # 좌표는 원본 표기 그대로 (문자열이 섞인 청크만 아래에서 변환)
+        chunksize=chunk_rows
+    )
+    for chunk in reader:
+        serials = pd.to_numeric(chunk["일련번호"], errors="coerce")
+        dates = pd.to_datetime(chunk["접수일자"].str.strip(), format="ISO8601", errors="coerce")
+        lon = pd.to_numeric(chunk["GPS X"], errors="coerce")
+        lat = pd.to_numeric(chunk["GPS Y"], errors="coerce")
+        valid = (
+            serials.notna() & dates.notna()
+            & lat.between(*KOREA_LAT) & lon.between(*KOREA_LON)
+        ).to_numpy()
+        clean = pd.DataFrame({
+            "일련번호": serials[valid].astype(np.int64),
+            "접수일자": dates[valid],
+            "접수시각": chunk["접수시각"][valid],
+            "관할기관": chunk["관할기관"][valid],
+            "GPS X": lon[valid],
+            "GPS Y": lat[valid],
+        })
+        yield clean.reset_index(drop=True), len(chunk)
+
+
+def file_state(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(path)}
+
+
+def load_state(path):
+    """통합 상태 읽기 (없거나 형식이 다르면 None)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == STATE_VERSION else None
+
+
+def save_state(path, sources, rows, last_date):
+    state = {"version": STATE_VERSION, "sources": sources, "rows": rows, "last_date": last_date}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def source_unchanged(path, recorded):
+    """기록된 원본 파일과 같은지 (크기·수정 시각이 같으면 해시 생략)"""
+    if not os.path.exists(path):
+        return False
+    stat = os.stat(path)
+    if stat.st_size == recorded["size"] and stat.st_mtime_ns == recorded["mtime_ns"]:
+        return True
+    return stat.st_size == recorded["size"] and file_sha256(path) == recorded["sha256"]
+
+
+def consolidate(roadkill_dir=ROADKILL_DIR, full=False, chunk_rows=CHUNK_ROWS):
+    """원본 CSV → 병합 테이블
+
+    - 처음이거나 이미 반영한 원본 파일이 바뀌었으면 전체 재생성
+    - 아니면 새로 생긴 원본 파일만 읽어 (연도, 일련번호) 키가 없는 행만 추가
+      (추가분이 기존 마지막 날짜 이후면 CSV 끝에 이어 쓰기, 아니면 날짜 순으로 다시 정렬해 저장)
+    """
+    start = time.time()
+    state_path = os.path.join(roadkill_dir, STATE_FILE)
+    csv_path, _ = table_paths(MERGED_TABLE, roadkill_dir)
+    paths = source_files(roadkill_dir)
+    if not paths:
+        print(f"❌ 원본 파일이 없습니다: {os.path.join(roadkill_dir, SOURCE_PATTERN)}")
+        return None
+
+    # 1️⃣ 기존 병합 결과를 이어서 쓸 수 있는지 확인
+    state = None if full else load_state(state_path)
+    existing = None
+    if state is not None and os.path.exists(csv_path):
+        changed = [
+            name for name, recorded in state["sources"].items()
+            if not source_unchanged(os.path.join(roadkill_dir, name), recorded)
+        ]
+        if changed:
+            print(f"반영한 원본 파일 변경: {', '.join(changed)} → 전체 재생성")
+        else:
+            existing = read_table(MERGED_TABLE, processed_dir=roadkill_dir)
+    sources = dict(state["sources"]) if existing is not None else {}
+    new_paths = [path for path in paths if os.path.basename(path) not in sources]
+    if not new_paths:
+        print(f"새 원본 파일 없음 → 기존 병합 결과 유지 ({len(existing):,}건)")
+        return existing
+
+    # 2️⃣ 새 원본 파일 스트리밍 읽기 (필요한 컬럼만, 잘못된 행 제외)
+    chunks, n_read = [], 0
+    for path in new_paths:
+        file_rows = 0
+        for chunk, n in read_source(path, chunk_rows):
+            chunks.append(chunk)
+            file_rows += len(chunk)
+            n_read += n
+        sources[os.path.basename(path)] = file_state(path)
+        print(f"  {os.path.basename(path)}: {file_rows:,}건")
+    added = pd.concat(chunks, ignore_index=True)
+    n_invalid = n_read - len(added)
+
+    # 3️⃣ (연도, 일련번호) 키 중복 제거 (기존 행과 먼저 읽은 행 우선, 해시 테이블)
+    added_keys = row_keys(added["일련번호"], added["접수일자"])
+    existing_keys = (
+        row_keys(existing["일련번호"], existing["접수일자"]) if existing is not None else np.empty(0, np.int64)
+    )
+    duplicated = pd.Index(np.concatenate([existing_keys, added_keys])).duplicated(keep="first")
+    duplicated = duplicated[len(existing_keys):]
+    added = added[~duplicated].sort_values(["접수일자", "일련번호"], kind="stable").reset_index(drop=True)
+
+    # 4️⃣ 저장 (날짜 순서가 유지되면 이어 쓰기, 아니면 전체 정렬 후 다시 쓰기)
+    if existing is not None and (len(added) == 0 or added["접수일자"].min() >= existing["접수일자"].max()):
+        append_table(to_csv_frame(added, MERGED_TABLE), MERGED_TABLE, roadkill_dir)
+        merged = pd.concat([existing, added], ignore_index=True)
+        mode = "이어 쓰기"
+    else:
+        merged = added if existing is None else pd.concat([existing, added], ignore_index=True)
+        merged = merged.sort_values(["접수일자", "일련번호"], kind="stable").reset_index(drop=True)
+        write_table(to_csv_frame(merged, MERGED_TABLE), MERGED_TABLE, roadkill_dir)
+        mode = "전체 저장"
+
+    last_date = merged["접수일자"].max().strftime("%Y-%m-%d") if len(merged) else None
+    save_state(state_path, sources, len(merged), last_date)
+
+    print(f"읽은 행: {n_read:,}건, 제외(일련번호/접수일자/좌표 오류): {n_invalid:,}건, 중복: {int(duplicated.sum()):,}건")
+    print(f"✅ {MERGED_TABLE}: {len(merged):,}건 ({mode}, 추가 {len(added):,}건, {time.time() - start:.2f}초) - {csv_path}")
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="연도별/월별 로드킬 원본 CSV 통합 (roadkill_merged)")
+    parser.add_argument("--dir", default=ROADKILL_DIR, help="원본 CSV 폴더 (병합 결과도 같은 폴더에 저장)")
+    parser.add_argument("--full", action="store_true", help="통합 상태를 무시하고 처음부터 다시 생성")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="한 번에 읽는 행 수")
+    args = parser.parse_args()
+    consolidate(args.dir, full=args.full, chunk_rows=args.chunk_rows)
+
+
+if __name__ == "__main__":
+    main()
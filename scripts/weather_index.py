@@ -0,0 +1,118 @@
+"""
+Module: weather_index
+Description: (지점번호, 일자) 키로 기상 관측값을 찾는 해시 인덱스.
+"""
+
+import numpy as np
+import pandas as pd
+
+EPOCH = np.datetime64("1970-01-01", "D")
+
+# weather_reader 결과의 일자 컬럼 (1970-01-01 기준 일수, int32)
+DAY_COLUMN = "일수"
+
+
+def to_day_numbers(dates):
+    """날짜(Timestamp 배열 또는 "YYYYMMDD" 문자열)를 1970-01-01 기준 일수(int64)로 변환"""
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(pd.Series(dates).astype(str), format="%Y%m%d", errors="coerce")
+    values = pd.DatetimeIndex(dates).values.astype("datetime64[D]")
+    return (values - EPOCH).astype(np.int64)
+
+
+def from_day_numbers(days):
+    """1970-01-01 기준 일수를 "YYYYMMDD" 문자열 배열로 변환"""
+    dates = EPOCH + np.asarray(days, dtype="timedelta64[D]")
+    return pd.DatetimeIndex(dates).strftime("%Y%m%d").to_numpy()
+
+
+def pack_keys(station_ids, days):
+    """지점번호(상위 32비트)와 일수(하위 32비트)를 int64 키 하나로 묶기"""
+    station_ids = np.asarray(station_ids, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    return (station_ids << 32) | (days & 0xFFFFFFFF)
+
+
+class WeatherIndex:
+    """(지점번호, 일자) → 기상 관측 행 위치 해시 인덱스
+
+    - weather_df: "지점", DAY_COLUMN(일수) 컬럼을 가진 유효 기상 데이터 (weather_reader.read_weather_data 결과)
+    - 같은 키가 여러 번 나오면 파일 순서상 첫 번째 행을 사용
+    """
+
+    def __init__(self, weather_df):
+        keys = pack_keys(weather_df["지점"].to_numpy(), weather_df[DAY_COLUMN].to_numpy())
+        first = ~pd.Index(keys).duplicated(keep="first")
+        frame = weather_df.reset_index(drop=True)
+
+        self.frame = frame[first].reset_index(drop=True)
+        self.keys = keys[first]
+        self._index = pd.Index(self.keys)
+        self._order = np.argsort(self.keys, kind="stable")
+        self._sorted_keys = self.keys[self._order]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, station_ids, days):
+        """지점번호/일수 배열에 해당하는 기상 행 위치 배열 반환 (없으면 -1)"""
+        return self._index.get_indexer(pack_keys(station_ids, days))
+
+    def lookup_nearest_day(self, station_ids, days, tolerance):
+        """같은 관측소에서 가장 가까운 관측일 찾기 (as-of 조인, 정렬된 키 이진 탐색)
+
+        - 지점번호/일수 배열(브로드캐스팅 가능) → (기상 행 위치, 일자 차이) 배열, 없으면 (-1, 0)
+        - tolerance일 이내만 사용, 앞뒤 차이가 같으면 이전 날짜 우선
+        """
+        queries = pack_keys(*np.broadcast_arrays(station_ids, days))
+        n = len(self._sorted_keys)
+        if n == 0:
+            return np.full(queries.shape, -1, dtype=np.int64), np.zeros(queries.shape, dtype=np.int64)
+
+        after = np.searchsorted(self._sorted_keys, queries, side="left")
+        before = after - 1
+        next_keys = self._sorted_keys[np.minimum(after, n - 1)]
+        prev_keys = self._sorted_keys[np.maximum(before, 0)]
+        # 같은 관측소(상위 32비트)면 키 차이 = 일자 차이
+        next_gap = np.where((after < n) & (next_keys >> 32 == queries >> 32), next_keys - queries, tolerance + 1)
+        prev_gap = np.where((before >= 0) & (prev_keys >> 32 == queries >> 32), queries - prev_keys, tolerance + 1)
+
+        use_prev = prev_gap <= next_gap
+        gap = np.where(use_prev, prev_gap, next_gap)
+        found = gap <= tolerance
+        sorted_positions = np.where(use_prev, before, after)
+        positions = np.where(found, self._order[np.clip(sorted_positions, 0, n - 1)], -1)
+        offsets = np.where(found, np.where(use_prev, -gap, gap), 0)
+        return positions, offsets
+
+
+class StationAvailability:
+    """관측소 × 일자 관측값 유무 비트맵
+
+    - 행: station_ids 순서(StationIndex 위치), 열: 첫 관측일부터의 일수 (8일씩 1바이트로 압축)
+    - 해당 날짜에 유효한 기상 행이 있는 관측소만 "운영 중"으로 취급
+    """
+
+    def __init__(self, weather_index, station_ids):
+        keys = weather_index.keys
+        positions = pd.Index(np.asarray(station_ids, dtype=np.int64)).get_indexer(keys >> 32)
+        days = (keys & 0xFFFFFFFF).astype(np.int64)
+        known = positions >= 0
+
+        self.first_day = int(days.min()) if len(days) else 0
+        self.n_days = int(days.max()) - self.first_day + 1 if len(days) else 0
+
+        bitmap = np.zeros((len(station_ids), max(self.n_days, 1)), dtype=bool)
+        bitmap[positions[known], days[known] - self.first_day] = True
+        self.bitmap = np.packbits(bitmap, axis=1)
+
+    def available(self, station_positions, days):
+        """관측소 위치/일수 배열(브로드캐스팅 가능)별 관측값 유무 반환"""
+        station_positions, days = np.broadcast_arrays(
+            np.asarray(station_positions, dtype=np.int64),
+            np.asarray(days, dtype=np.int64) - self.first_day,
+        )
+        in_range = (days >= 0) & (days < self.n_days)
+        offsets = np.where(in_range, days, 0)
+        bits = self.bitmap[station_positions, offsets >> 3] >> (7 - (offsets & 7))
+        return in_range & (bits & 1).astype(bool)
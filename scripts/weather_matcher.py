@@ -0,0 +1,256 @@
+"""
+Module: weather_matcher
+Description: 로드킬 좌표·일자마다 그날 관측값이 있는 가장 가까운 관측소의 날씨를 찾는 매칭 엔진.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from geo_index import StationIndex, haversine_np
+from weather_index import DAY_COLUMN, EPOCH, StationAvailability, WeatherIndex, from_day_numbers, pack_keys, to_day_numbers
+from weather_reader import to_float64
+
+# 날씨 테이블에 저장할 기상 요소
+WEATHER_FIELDS = ["일평균기온", "강수량", "일평균풍속", "일조시간", "전운량", "강수계속시간", "습도"]
+
+# 최근접 관측소에 관측값이 없을 때 대체 후보로 살펴볼 주변 운영 관측소 수
+FALLBACK_NEIGHBOURS = 16
+
+# 후보 관측소 모두 그날 관측값이 없을 때 앞뒤로 살펴볼 최대 일수 (0이면 같은 날만 사용)
+DAY_TOLERANCE = 1
+MAX_DAY_TOLERANCE = 7  # 통계 큐브 셀 키에 일자 차이를 4비트로 저장
+
+
+class WeatherMatcher:
+    """관측소 인덱스 + (지점번호, 일자) 기상 인덱스 + 일자별 운영 비트맵을 한 번 구축해 두고 재사용
+
+    - stations_df: weather_stations.csv (지점번호, 지점명, 위도, 경도)
+    - weather_df_valid: weather_reader.read_weather_data 결과 (일평균기온이 있는 행)
+    - operating_station_ids: 기상 데이터 파일에 등장한 지점번호 set
+    - day_tolerance: 같은 날 관측값이 있는 후보가 없으면 이 일수 이내의 가장 가까운 날 관측값 사용
+    """
+
+    def __init__(self, stations_df, weather_df_valid, operating_station_ids, day_tolerance=DAY_TOLERANCE):
+        if not 0 <= day_tolerance <= MAX_DAY_TOLERANCE:
+            raise ValueError(f"day_tolerance는 0~{MAX_DAY_TOLERANCE}일이어야 합니다: {day_tolerance}")
+        self.day_tolerance = day_tolerance
+        self.station_index = StationIndex(stations_df)
+        self.weather_index = WeatherIndex(weather_df_valid)
+        self.availability = StationAvailability(self.weather_index, self.station_index.station_ids)
+        self.chains = self.station_index.neighbour_chains(
+            FALLBACK_NEIGHBOURS,
+            among=np.isin(self.station_index.station_ids, list(operating_station_ids))
+        )
+
+    def match(self, roadkill_df, verbose=True, stats=None):
+        """전처리된 로드킬 데이터(접수일자 datetime, GPS X/Y 숫자)에 날씨 매칭
+
+        - 반환: (로드킬 테이블, 날씨 테이블(지점번호·일자 중복 제거), 매칭 테이블)
+        - 로드킬/매칭 테이블의 index는 입력 roadkill_df의 index를 그대로 유지
+        - 매칭 테이블 일자_오프셋: 사용한 관측일 - 접수일자 (같은 날이면 0)
+        - stats: dict를 넘기면 건수(최근접/대체/날짜 대체/미매칭)와 단계별 소요 시간을 더해 기록
+        """
+        start = time.perf_counter()
+        station_index = self.station_index
+        lat = roadkill_df["GPS Y"].to_numpy(dtype=np.float64)
+        lon = roadkill_df["GPS X"].to_numpy(dtype=np.float64)
+        report_days = to_day_numbers(roadkill_df["접수일자"])
+
+        # 최근접 관측소 일괄 탐색 (KD-tree 인덱스, 전체 좌표 1회 질의)
+        nearest_positions, _ = station_index.query(lat, lon)
+        nearest_done = time.perf_counter()
+
+        # 최근접 관측소 + 그 주변 운영 관측소 후보(미리 계산)를 로드킬 지점 기준 거리 순으로 정렬
+        candidates = np.column_stack((nearest_positions, self.chains[nearest_positions]))
+        candidate_distances = haversine_np(
+            lon[:, None], lat[:, None],
+            station_index.lon[candidates], station_index.lat[candidates]
+        )
+        order = np.argsort(candidate_distances, axis=1, kind="stable")
+        candidates = np.take_along_axis(candidates, order, axis=1)
+        candidate_distances = np.take_along_axis(candidate_distances, order, axis=1)
+
+        # 운영 안 하거나 데이터 없으면 → 그날 관측값이 있는 다음 이웃 관측소로 대체
+        candidate_available = self.availability.available(candidates, report_days[:, None])
+        is_operating = candidate_available.any(axis=1)
+        choice = candidate_available.argmax(axis=1)
+        rows = np.arange(len(candidates))
+        station_positions = candidates[rows, choice]
+        distances = candidate_distances[rows, choice]
+
+        weather_positions = np.where(
+            is_operating,
+            self.weather_index.lookup(station_index.station_ids[station_positions], report_days),
+            -1
+        )
+        fallback_done = time.perf_counter()
+
+        # 후보 모두 그날 관측값이 없으면 → 허용 일수 이내 가장 가까운 날 (일자 차이가 같으면 가까운 관측소)
+        day_offsets = np.zeros(len(candidates), dtype=np.int64)
+        missing = np.flatnonzero(~is_operating)
+        if self.day_tolerance and len(missing):
+            positions, offsets = self.weather_index.lookup_nearest_day(
+                station_index.station_ids[candidates[missing]], report_days[missing, None], self.day_tolerance
+            )
+            score = np.where(positions >= 0, 2 * np.abs(offsets) + (offsets > 0), np.iinfo(np.int64).max)
+            best = score.argmin(axis=1)
+            picked = np.arange(len(missing))
+            found = positions[picked, best] >= 0
+            rows_found = missing[found]
+            station_positions[rows_found] = candidates[rows_found, best[found]]
+            distances[rows_found] = candidate_distances[rows_found, best[found]]
+            weather_positions[rows_found] = positions[picked, best][found]
+            day_offsets[rows_found] = offsets[picked, best][found]
+        temporal_done = time.perf_counter()
+
+        nearest_count = int((is_operating & (choice == 0)).sum())
+        fallback_count = int((is_operating & (choice > 0)).sum())
+        temporal_count = int((day_offsets != 0).sum())
+        if verbose:
+            print(f"최근접 관측소 매칭: {nearest_count:,}건, 대체 관측소 매칭: {fallback_count:,}건, "
+                  f"날짜 대체 매칭(±{self.day_tolerance}일): {temporal_count:,}건")
+
+        # 결과 테이블 구성 (로드킬 / 날씨(중복 제거) / 매칭)
+        roadkill_result = pd.DataFrame({
+            "일련번호": roadkill_df["일련번호"].to_numpy(),
+            "접수일자": roadkill_df["접수일자"].to_numpy(),
+            "접수시각": roadkill_df["접수시각"].array,
+            "관할기관": roadkill_df["관할기관"].array,  # 범주형이면 그대로 유지
+            "위도": lat,
+            "경도": lon
+        }, index=roadkill_df.index)
+
+        matched_rows = np.flatnonzero(weather_positions >= 0)
+        matched_positions = station_positions[matched_rows]
+        matched_ids = station_index.station_ids[matched_positions]
+        matched_dates = from_day_numbers(report_days[matched_rows])
+        weather_days = report_days[matched_rows] + day_offsets[matched_rows]
+
+        first_seen = ~pd.Series(pack_keys(matched_ids, weather_days)).duplicated().to_numpy()
+        weather_rows = self.weather_index.frame.iloc[weather_positions[matched_rows][first_seen]]
+        weather_result = pd.DataFrame({
+            "지점번호": matched_ids[first_seen],
+            "지점명": station_index.stations["지점명"].to_numpy()[matched_positions[first_seen]],
+            "일자": from_day_numbers(weather_days[first_seen]),
+            **{field: to_float64(weather_rows[field].to_numpy()) for field in WEATHER_FIELDS}
+        })
+
+        matching_result = pd.DataFrame({
+            "일련번호": roadkill_df["일련번호"].to_numpy()[matched_rows],
+            "지점번호": matched_ids,
+            "접수일자": matched_dates,
+            "접수시각": roadkill_df["접수시각"].array[matched_rows],
+            "거리_km": [round(float(d), 2) for d in distances[matched_rows]],
+            "관측소_운영여부": is_operating[matched_rows],
+            "일자_오프셋": day_offsets[matched_rows].astype(np.int8),
+        }, index=roadkill_df.index[matched_rows])
+
+        if stats is not None:
+            add_match_stats(stats, {
+                "rows": len(roadkill_df),
+                "nearest": nearest_count,
+                "fallback": fallback_count,
+                "temporal": temporal_count,
+                "unmatched": len(roadkill_df) - len(matched_rows),
+                "nearest_seconds": nearest_done - start,
+                "fallback_seconds": fallback_done - nearest_done,
+                "temporal_seconds": temporal_done - fallback_done,
+                "build_seconds": time.perf_counter() - temporal_done,
+            })
+        return roadkill_result, weather_result, matching_result
+
+
+def add_match_stats(total, part):
+    """매칭 통계 dict 합산 (월 단위 작업 결과를 하나로 모을 때 사용)"""
+    for key, value in part.items():
+        total[key] = total.get(key, 0) + value
+
+
+def matched_weather_days(matching):
+    """매칭 테이블 행이 사용한 관측일 (접수일자 + 일자_오프셋, 일수)"""
+    days = to_day_numbers(matching["접수일자"])
+    if "일자_오프셋" in matching.columns:
+        days = days + matching["일자_오프셋"].to_numpy(dtype=np.int64)
+    return days
+
+
+def order_weather_table(weather_pool, matching):
+    """날씨 후보 행에서 매칭 테이블이 참조하는 (지점번호, 관측일)만 첫 등장 순서대로 선택 (중복 제거)"""
+    pool_keys = pack_keys(weather_pool["지점번호"], to_day_numbers(weather_pool["일자"]))
+    unique = ~pd.Index(pool_keys).duplicated(keep="first")
+    weather_pool = weather_pool[unique].set_axis(pd.Index(pool_keys[unique]))
+
+    matching_keys = pd.unique(pack_keys(matching["지점번호"], matched_weather_days(matching)))
+    return weather_pool.loc[matching_keys].reset_index(drop=True)
+
+
+def month_numbers(days):
+    """일수 배열 → 1970-01 기준 월 번호 배열 (월 단위 작업 분할용)"""
+    return np.asarray(days, dtype="datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def _match_partition(task):
+    """작업 프로세스: 한 달치 로드킬 행을 그 달의 기상 데이터만으로 매칭"""
+    stations_df, weather_slice, operating_station_ids, roadkill_slice, day_tolerance = task
+    matcher = WeatherMatcher(stations_df, weather_slice, operating_station_ids, day_tolerance)
+    stats = {}
+    return matcher.match(roadkill_slice, verbose=False, stats=stats), stats
+
+
+def match_by_month(roadkill_df, stations_df, weather_df_valid, operating_station_ids, workers=None, stats=None,
+                   day_tolerance=DAY_TOLERANCE):
+    """로드킬 행을 접수 월별로 나눠 프로세스 풀에서 병렬 매칭
+
+    - 각 작업에는 해당 월의 로드킬 행과 그 달(앞뒤 day_tolerance일 포함)의 기상 데이터만 전달
+    - 결과는 입력 순서대로 다시 합치므로 직렬 실행(WeatherMatcher.match)과 동일
+    - workers: 프로세스 수 (None/0 이하면 CPU 코어 수, 1이면 직렬 실행)
+    - stats: dict를 넘기면 매칭 건수/소요 시간 기록 (WeatherMatcher.match 참고, 병렬이면 작업별 합계)
+    """
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+
+    roadkill_df = roadkill_df.reset_index(drop=True)
+    if workers == 1:
+        matcher = WeatherMatcher(stations_df, weather_df_valid, operating_station_ids, day_tolerance)
+        return matcher.match(roadkill_df, stats=stats)
+
+    roadkill_months = month_numbers(to_day_numbers(roadkill_df["접수일자"]))
+    # 일수 순 정렬 위치 → 월 범위(앞뒤 허용 일수 포함)를 이진 탐색으로 잘라냄 (파일 순서는 유지)
+    weather_days = weather_df_valid[DAY_COLUMN].to_numpy()
+    weather_order = np.argsort(weather_days, kind="stable")
+    sorted_days = weather_days[weather_order]
+
+    tasks = []
+    for month, rows in roadkill_df.groupby(roadkill_months, sort=True).indices.items():
+        month_start = np.datetime64(int(month), "M")
+        first_day = (month_start.astype("datetime64[D]") - EPOCH).astype(np.int64) - day_tolerance
+        last_day = ((month_start + 1).astype("datetime64[D]") - EPOCH).astype(np.int64) - 1 + day_tolerance
+        lo = np.searchsorted(sorted_days, first_day, side="left")
+        hi = np.searchsorted(sorted_days, last_day, side="right")
+        weather_rows = np.sort(weather_order[lo:hi])
+        tasks.append((
+            stations_df, weather_df_valid.iloc[weather_rows],
+            operating_station_ids, roadkill_df.iloc[rows], day_tolerance
+        ))
+
+    if len(tasks) <= 1:
+        matcher = WeatherMatcher(stations_df, weather_df_valid, operating_station_ids, day_tolerance)
+        return matcher.match(roadkill_df, stats=stats)
+
+    print(f"병렬 매칭: {len(tasks)}개 월 단위 작업, 프로세스 {min(workers, len(tasks))}개")
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        parts = []
+        for part, part_stats in executor.map(_match_partition, tasks):
+            parts.append(part)
+            if stats is not None:
+                add_match_stats(stats, part_stats)
+
+    roadkill_result = pd.concat([p[0] for p in parts]).sort_index(kind="stable").reset_index(drop=True)
+    matching_result = pd.concat([p[2] for p in parts]).sort_index(kind="stable").reset_index(drop=True)
+    weather_result = order_weather_table(pd.concat([p[1] for p in parts], ignore_index=True), matching_result)
+    print(f"매칭 완료: {len(matching_result):,}/{len(roadkill_result):,}건")
+    return roadkill_result, weather_result, matching_result
@@ -0,0 +1,128 @@
+"""
+Module: weather_reader
+Description: 기상청 일자료 CSV(KMA_api.py 출력)를 필요한 컬럼만 청크 단위로 읽는 단일 패스 파서.
+"""
+
+import numpy as np
+import pandas as pd
+
+from weather_index import DAY_COLUMN, EPOCH
+
+# 원본 컬럼 위치 → 저장 컬럼명 (KMA_api.HEADER 기준)
+WEATHER_COLUMNS = {
+    0: "일자",          # 관측일 (YYYYMMDD)
+    1: "지점",          # 지점번호
+    2: "일평균풍속",    # 평균풍속(m/s)
+    10: "일평균기온",   # 평균기온(°C)
+    18: "습도",         # 평균상대습도(%)
+    31: "전운량",       # 평균전운량(1/10)
+    32: "일조시간",     # 일조합(hr)
+    38: "강수량",       # 일강수량(mm)
+    40: "강수계속시간",  # 강수계속시간(hr)
+}
+
+# 기상청 결측 표기 (강수량은 "-9"도 결측)
+MISSING_SENTINELS = ["-9.0", "-9.00"]
+RAINFALL_SENTINELS = ["-9", "-9.0", "-9.00"]
+
+DEFAULT_CHUNKSIZE = 200_000
+
+# 메모리 절약형 스키마: 일자는 1970-01-01 기준 일수(DAY_COLUMN, int32), 지점번호 int32, 기상 요소 float32
+FIELD_DTYPE = np.float32
+WEATHER_FIELD_COLUMNS = list(WEATHER_COLUMNS.values())[2:]
+
+
+def empty_weather_frame():
+    """기상 데이터가 없을 때 쓰는 빈 DataFrame (read_weather_data와 같은 컬럼/타입)"""
+    return pd.DataFrame({
+        DAY_COLUMN: np.empty(0, dtype=np.int32),
+        "지점": np.empty(0, dtype=np.int32),
+        **{column: np.empty(0, dtype=FIELD_DTYPE) for column in WEATHER_FIELD_COLUMNS},
+    })
+
+
+def to_float64(values):
+    """float32 기상 값 → 원본 소수 표기 그대로의 float64 (12.3f → 12.3, CSV 출력 형식 유지)
+
+    - 유효숫자 6자리로 반올림 (float32 오차보다 충분히 크고, 기상청 값의 자릿수보다 많음)
+    """
+    values = np.asarray(values)
+    if values.dtype != np.float32:
+        return values.astype(np.float64)
+    values = values.astype(np.float64)
+    magnitude = np.abs(values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exponent = np.floor(np.log10(np.where(magnitude > 0, magnitude, 1.0)))
+    scale = 10.0 ** np.clip(5 - exponent, 0, 15)
+    return np.rint(values * scale) / scale
+
+
+def parse_day_numbers(dates):
+    """"YYYYMMDD"(또는 "YYYY-MM-DD") 문자열 → 1970-01-01 기준 일수 (잘못된 날짜는 -1)
+
+    - 문자열 날짜 파싱 대신 정수 연산으로 변환 (청크마다 수십만 행)
+    """
+    digits = dates.str.strip().str.replace("-", "", regex=False)
+    numbers = pd.to_numeric(digits, errors="coerce").to_numpy(dtype=np.float64)
+    numbers = np.where(np.isfinite(numbers) & (numbers >= 19700101) & (numbers <= 99991231), numbers, 0).astype(np.int64)
+    year, month, day = numbers // 10000, numbers // 100 % 100, numbers % 100
+    months = np.where(numbers > 0, (year - 1970) * 12 + month - 1, 0).astype("datetime64[M]")
+    days = (months.astype("datetime64[D]") - EPOCH).astype(np.int64) + day - 1
+    # 월/일 범위 확인 (2월 30일처럼 다음 달로 넘어가면 잘못된 날짜)
+    valid = (numbers > 0) & (month >= 1) & (month <= 12) & (day >= 1) & \
+        ((EPOCH + days.astype("timedelta64[D]")).astype("datetime64[M]") == months)
+    return np.where(valid, days, -1)
+
+
+def iter_weather_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """기상 데이터 파일을 청크 단위 DataFrame으로 읽기
+
+    - 필요한 컬럼만 위치로 읽고, 결측 표기는 NaN으로 일괄 변환 (강수량 결측은 0)
+    - 일자는 일수(int32), 지점은 int32, 기상 요소는 float32로 변환 (일자/지점이 잘못된 행은 제외)
+    """
+    na_values = {pos: MISSING_SENTINELS for pos in WEATHER_COLUMNS}
+    na_values[38] = RAINFALL_SENTINELS
+    reader = pd.read_csv(
+        path,
+        header=None,
+        skiprows=1,  # 첫 줄은 헤더
+        usecols=list(WEATHER_COLUMNS),
+        dtype={0: str, 1: str},
+        na_values=na_values,
+        skipinitialspace=True,
+        on_bad_lines="skip",
+        encoding="utf-8",
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        chunk = chunk.rename(columns=WEATHER_COLUMNS)
+        days = parse_day_numbers(chunk["일자"])
+        stations = pd.to_numeric(chunk["지점"], errors="coerce").to_numpy(dtype=np.float64)
+        valid = (days >= 0) & ~np.isnan(stations)
+
+        compact = pd.DataFrame({
+            DAY_COLUMN: days[valid].astype(np.int32),
+            "지점": stations[valid].astype(np.int32),
+        })
+        for column in WEATHER_FIELD_COLUMNS:
+            values = pd.to_numeric(chunk[column], errors="coerce").to_numpy(dtype=np.float64)[valid]
+            compact[column] = values.astype(FIELD_DTYPE)
+        compact["강수량"] = compact["강수량"].fillna(0.0)
+        yield compact
+
+
+def read_weather_data(path, chunksize=DEFAULT_CHUNKSIZE):
+    """기상 데이터 파일을 한 번만 읽어 (유효 기상 데이터, 운영 관측소 지점번호 set) 반환
+
+    - 유효 기상 데이터: 일평균기온이 있는 행만 유지 (청크마다 걸러서 메모리 사용량 제한)
+    - 운영 관측소: 파일에 한 번이라도 등장한 지점번호
+    """
+    operating_station_ids = set()
+    frames = []
+    for chunk in iter_weather_chunks(path, chunksize):
+        operating_station_ids.update(int(s) for s in chunk["지점"].unique())
+        frames.append(chunk[chunk["일평균기온"].notna()])
+
+    if not frames:
+        return empty_weather_frame(), operating_station_ids
+    return pd.concat(frames, ignore_index=True), operating_station_ids
@@ -3,47 +3,23 @@ Module: weather_roadkill_merged
 Description: 로드킬 데이터와 기상 관측소 데이터를 매칭하여 통합 데이터셋을 생성하는 스크립트.
 """
 
+import argparse
+import os
 import warnings
-from math import radians, cos, sin, asin, sqrt
-from datetime import datetime
 import pandas as pd
-import numpy as np
-import time
 
-warnings.filterwarnings("ignore")
+from etl_metrics import ETLMetrics, profiled
+from merge_manifest import (
+    MANIFEST_FILE, OUTPUT_TABLES, file_sha256, load_manifest, load_processed_outputs, merge_incremental,
+    pending_rows, row_hashes, row_keys, save_manifest
+)
+from processed_store import read_table, table_paths, write_table
+from roadkill_consolidate import MERGED_COLUMNS, MERGED_TABLE
+from weather_matcher import DAY_TOLERANCE, MAX_DAY_TOLERANCE, match_by_month
+from weather_reader import empty_weather_frame, read_weather_data
 
-
-def haversine_distance(lon1, lat1, lon2, lat2):
-    """두 지점 간의 거리 계산 (하버사인 공식)"""
-    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-    c = 2 * asin(sqrt(a))
-    r = 6371  # 지구 반지름 (km)
-    return c * r
-
-
-def find_nearest_station(roadkill_lat, roadkill_lon, stations_df):
-    """로드킬 발생 위치에서 가장 가까운 관측소 찾기"""
-    min_distance = float("inf")
-    nearest_station = None
-
-    for _, station in stations_df.iterrows():
-        try:
-            station_lat = float(station["위도"])
-            station_lon = float(station["경도"])
-            distance = haversine_distance(
-                roadkill_lon, roadkill_lat, station_lon, station_lat
-            )
-
-            if distance < min_distance:
-                min_distance = distance
-                nearest_station = station
-        except Exception:
-            continue
-
-    return nearest_station, min_distance
+# 마지막 실행의 단계별 측정값 (etl_metrics)
+METRICS_FILE = "merge_metrics.json"
 
 
 def parse_weather_line(line):
@@ -134,202 +110,205 @@ def parse_weather_line(line):
         return None
 
 
-def create_full_weather_dataset():
-    """전체 로드킬 데이터에 대해 날씨 매핑 수행"""
+def create_full_weather_dataset(incremental=False, workers=1, metrics_path=None, day_tolerance=DAY_TOLERANCE,
+                                base_dir=None):
+    """전체 로드킬 데이터에 대해 날씨 매핑 수행
+
+    - incremental=True: 처리 상태 기록(merge_manifest.json)과 비교해 새로 추가되거나 바뀐 행만
+      매칭하고 기존 결과 테이블에 upsert (관측소 파일이 바뀌었거나 기록이 없으면 전체 재생성)
+    - workers: 월 단위 병렬 매칭 프로세스 수 (1이면 직렬, 0 이하면 CPU 코어 수)
+    - metrics_path: 단계별 소요 시간·처리량·최대 메모리 JSON 경로 (기본: data/processed/merge_metrics.json)
+    - day_tolerance: 그날 관측값이 있는 관측소가 없을 때 앞뒤로 살펴볼 일수 (매칭 테이블 일자_오프셋에 기록)
+    - base_dir: data/ 폴더가 있는 프로젝트 루트 (기본: 이 스크립트의 상위 폴더)
+    """
     print("전체 로드킬-날씨 데이터셋 생성 시작...")
+    metrics = ETLMetrics()
+    metrics.set(incremental=incremental, workers=workers, day_tolerance=day_tolerance)
 
     # 1️⃣ 데이터 로드
     print("데이터 로드 중...")
-    BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-    roadkill_path = os.path.join(BASE_DIR, "data", "raw", "roadkill", "roadkill_merged.csv")
+    BASE_DIR = base_dir or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    roadkill_dir = os.path.join(BASE_DIR, "data", "raw", "roadkill")
+    roadkill_path = table_paths(MERGED_TABLE, roadkill_dir)[0]
     stations_path = os.path.join(BASE_DIR, "data", "raw", "weather", "weather_stations.csv")
-    
+    weather_data_path = os.path.join(BASE_DIR, "data", "raw", "weather", "weather_data.csv")
+    processed_dir = os.path.join(BASE_DIR, "data", "processed")
+    manifest_path = os.path.join(processed_dir, MANIFEST_FILE)
+    metrics_path = metrics_path or os.path.join(processed_dir, METRICS_FILE)
+
     if not os.path.exists(roadkill_path):
-        print(f"❌ 파일을 찾을 수 없습니다: {roadkill_path}")
+        print(f"❌ 파일을 찾을 수 없습니다: {roadkill_path} (python scripts/roadkill_consolidate.py로 생성)")
         return None, None, None
     if not os.path.exists(stations_path):
         print(f"❌ 파일을 찾을 수 없습니다: {stations_path}")
         return None, None, None
-    
-    roadkill_df = pd.read_csv(roadkill_path, encoding='utf-8-sig')
-    stations_df = pd.read_csv(stations_path, encoding='utf-8-sig')
+
+    with metrics.stage("load") as stage:
+        # 통합 테이블 (roadkill_consolidate.py 결과, 최신 Parquet이 있으면 필요한 컬럼만 메모리 매핑)
+        roadkill_df = read_table(MERGED_TABLE, columns=MERGED_COLUMNS, processed_dir=roadkill_dir)
+        stations_df = pd.read_csv(stations_path, encoding='utf-8-sig')
+        stage["rows"] = len(roadkill_df)
 
     print(f"전체 로드킬 데이터: {len(roadkill_df):,}건")
     print(f"관측소 데이터: {len(stations_df):,}개")
 
-    # 2️⃣ 운영 중인 관측소 수집
-    operating_stations = set()
-    try:
-        # 모든 년도 데이터가 하나의 파일에 저장 (CSV 형식)
-        weather_data_path = os.path.join(BASE_DIR, "data", "raw", "weather", "weather_data.csv")
-        with open(weather_data_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-        for line in lines[1:]:  # 첫 줄은 헤더
-            parts = line.strip().split(",")
-            if len(parts) > 1:
-                operating_stations.add(parts[1])
-    except FileNotFoundError:
-        print("기상 데이터 파일 없음")
-
-    operating_station_ids = {int(s) for s in operating_stations if s.isdigit()}
-    print(f"사용할 관측소 개수: {len(operating_station_ids)}개")
+    # 2️⃣ 로드킬 데이터 전처리
+    with metrics.stage("preprocess", rows=len(roadkill_df)):
+        roadkill_df["접수일자"] = pd.to_datetime(roadkill_df["접수일자"])
+        roadkill_df["GPS X"] = pd.to_numeric(roadkill_df["GPS X"], errors="coerce")
+        roadkill_df["GPS Y"] = pd.to_numeric(roadkill_df["GPS Y"], errors="coerce")
+        roadkill_df = roadkill_df.dropna(subset=["접수일자", "GPS X", "GPS Y"])
+
+        print(f"좌표 유효 데이터: {len(roadkill_df):,}건")
+
+        # 증분 비교용 입력 파일/행 해시
+        input_hashes = {
+            "roadkill": file_sha256(roadkill_path),
+            "stations": file_sha256(stations_path),
+            "weather": file_sha256(weather_data_path),
+            "day_tolerance": day_tolerance,
+        }
+        keys = row_keys(roadkill_df["일련번호"], roadkill_df["접수일자"])
+        hashes = row_hashes(roadkill_df)
+    metrics.set(input_rows=len(roadkill_df))
+
+    # 3️⃣ 증분 모드: 처리 상태 기록과 비교해 다시 매칭할 행 선택
+    existing = None
+
+    if incremental:
+        manifest = load_manifest(manifest_path)
+        existing = load_processed_outputs(processed_dir)
+        if manifest is None or existing is None:
+            print("처리 기록 또는 기존 결과 없음 → 전체 재생성")
+            existing = None
+        elif manifest["inputs"].get("stations") != input_hashes["stations"]:
+            print("관측소 파일 변경 → 전체 재생성")
+            existing = None
+        elif manifest["inputs"].get("day_tolerance") != day_tolerance:
+            print("날짜 허용 범위 변경 → 전체 재생성")
+            existing = None
+        elif not pd.Index(keys).is_unique:
+            print("(연도, 일련번호) 키 중복 → 전체 재생성")
+            existing = None
+        elif manifest["inputs"] == input_hashes:
+            print("입력 파일 변경 없음 → 기존 결과 유지")
+            metrics.set(status="unchanged")
+            metrics.write(metrics_path)
+            return existing
+        else:
+            weather_changed = manifest["inputs"].get("weather") != input_hashes["weather"]
+            pending = pending_rows(manifest, keys, hashes, weather_changed)
+            print(f"증분 처리 대상: {pending.sum():,}건 (전체 {len(pending):,}건)")
+            target_df = roadkill_df[pending]
+
+    if existing is None:
+        target_df = roadkill_df
+
+    # 4️⃣ 기상 데이터 로드 + 운영 중인 관측소 수집 (단일 패스, 청크 단위)
+    with metrics.stage("weather_parse") as stage:
+        if os.path.exists(weather_data_path):
+            print("기상 데이터 처리 중...")
+            weather_df_valid, operating_station_ids = read_weather_data(weather_data_path)
+        else:
+            print("기상 데이터 파일 없음")
+            weather_df_valid, operating_station_ids = empty_weather_frame(), set()
+        stage["rows"] = len(weather_df_valid)
 
-    # 3️⃣ 기상 데이터 로드
-    weather_data = []
-    try:
-        print("기상 데이터 처리 중...")
-        weather_data_path = os.path.join(BASE_DIR, "data", "raw", "weather", "weather_data.csv")
-        with open(weather_data_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        for line in lines[1:]:  # 첫 줄은 헤더
-            parsed = parse_weather_line(line)
-            if parsed:
-                weather_data.append(parsed)
-    except FileNotFoundError:
-        print("기상 데이터 파일 없음")
-
-    weather_df = pd.DataFrame(weather_data)
-    weather_df["지점"] = weather_df["지점"].astype(str).str.strip().str.replace(".0", "", regex=False)
-    weather_df_valid = weather_df[weather_df["일평균기온"].notna()]
+    print(f"사용할 관측소 개수: {len(operating_station_ids)}개")
     print(f"전체 기상 데이터: {len(weather_df_valid):,}행")
 
-    # 4️⃣ 로드킬 데이터 전처리
-    roadkill_df["접수일자"] = pd.to_datetime(roadkill_df["접수일자"])
-    roadkill_df["GPS X"] = pd.to_numeric(roadkill_df["GPS X"], errors="coerce")
-    roadkill_df["GPS Y"] = pd.to_numeric(roadkill_df["GPS Y"], errors="coerce")
-    roadkill_df = roadkill_df.dropna(subset=["GPS X", "GPS Y"])
-
-    print(f"좌표 유효 데이터: {len(roadkill_df):,}건")
-
-    # 5️⃣ 매칭 수행
-    roadkill_results = []
-    weather_dict = {}  # 중복 제거
-    matching_results = []
-    last_print_time = time.time()  # 마지막 출력 시간
-    
-    for idx, row in roadkill_df.iterrows():
-        # 1분(60초)마다 진행률 출력
-        current_time = time.time()
-        if current_time - last_print_time >= 20:
-            print(f"진행률: {idx}/{len(roadkill_df)} ({idx / len(roadkill_df) * 100:.1f}%)")
-            last_print_time = current_time
-
-        nearest_station, distance = find_nearest_station(
-            row["GPS Y"], row["GPS X"], stations_df
+    # 5️⃣ 매칭 수행 - 관측소 × 일자 비트맵으로 "그날 관측값이 있는" 가장 가까운 관측소 선택
+    match_stats = {}
+    with metrics.stage("matching", rows=len(target_df)):
+        results = match_by_month(
+            target_df, stations_df, weather_df_valid, operating_station_ids, workers=workers, stats=match_stats,
+            day_tolerance=day_tolerance
         )
-
-        if nearest_station is None:
-            continue
-
-        is_operating = nearest_station["지점번호"] in operating_station_ids
-        date_str = row["접수일자"].strftime("%Y%m%d")
-        station_num = str(int(nearest_station["지점번호"]))
-        weather_info = None
-
-        # 현재 관측소 날씨 시도
-        if is_operating:
-            weather_match = weather_df_valid[
-                (weather_df_valid["지점"] == station_num)
-                & (weather_df_valid["일자"] == date_str)
-            ]
-            if len(weather_match) > 0:
-                weather_info = weather_match.iloc[0]
-
-        # 운영 안 하거나 데이터 없으면 → 가장 가까운 운영 관측소로 대체
-        if weather_info is None:
-            nearest_operating_station = None
-            min_operating_dist = float("inf")
-
-            for _, s in stations_df.iterrows():
-                try:
-                    if int(s["지점번호"]) not in operating_station_ids:
-                        continue
-                    dist2 = haversine_distance(
-                        row["GPS X"], row["GPS Y"], s["경도"], s["위도"]
-                    )
-                    if dist2 < min_operating_dist:
-                        min_operating_dist = dist2
-                        nearest_operating_station = s
-                except Exception:
-                    continue
-
-            if nearest_operating_station is not None:
-                alt_station_num = str(int(nearest_operating_station["지점번호"]))
-                alt_match = weather_df_valid[
-                    (weather_df_valid["지점"] == alt_station_num)
-                    & (weather_df_valid["일자"] == date_str)
-                ]
-                if len(alt_match) > 0:
-                    weather_info = alt_match.iloc[0]
-                    nearest_station = nearest_operating_station
-                    distance = min_operating_dist
-                    is_operating = True
-
-        # 로드킬 데이터 저장 (생성 ID 제거, 원본 키 포함)
-        roadkill_results.append({
-            "일련번호": row["일련번호"],
-            "접수일자": row["접수일자"],
-            "접수시각": row["접수시각"],
-            "관할기관": row["관할기관"],
-            "위도": row["GPS Y"],
-            "경도": row["GPS X"]
-        })
-        
-        # 날씨 데이터 저장 (중복 제거)
-        if weather_info is not None:
-            weather_id = f"{nearest_station['지점번호']}_{date_str}"
-            if weather_id not in weather_dict:
-                weather_dict[weather_id] = {
-                    "지점번호": nearest_station["지점번호"],
-                    "지점명": nearest_station["지점명"],
-                    "일자": date_str,
-                    "일평균기온": weather_info["일평균기온"],
-                    "강수량": weather_info["강수량"],
-                    "일평균풍속": weather_info.get("일평균풍속"),
-                    "일조시간": weather_info.get("일조시간"),
-                    "전운량": weather_info.get("전운량"),
-                    "강수계속시간": weather_info.get("강수계속시간"),
-                    "습도": weather_info.get("습도")
-                }
-            
-            # 매칭 테이블 저장 (생성 ID 제거, 원본 키 사용)
-            matching_results.append({
-                "일련번호": row["일련번호"],
-                "지점번호": int(nearest_station["지점번호"]),
-                "접수일자": date_str,
-                "접수시각": row["접수시각"],
-                "거리_km": round(distance, 2),
-                "관측소_운영여부": is_operating
-            })
+        if existing is not None:
+            results = merge_incremental(existing, results, keys)
+    roadkill_df_result, weather_df_result, matching_df_result = results
+    record_match_metrics(metrics, match_stats)
 
     # 6️⃣ 결과 저장 (완전 분리)
-    roadkill_df_result = pd.DataFrame(roadkill_results)
-    weather_df_result = pd.DataFrame(list(weather_dict.values()))
-    matching_df_result = pd.DataFrame(matching_results)
-    
-    # 저장 경로 설정
-    processed_dir = os.path.join(BASE_DIR, "data", "processed")
     os.makedirs(processed_dir, exist_ok=True)
-    
-    roadkill_output_path = os.path.join(processed_dir, "roadkill_data.csv")
-    roadkill_df_result.to_csv(roadkill_output_path, index=False, encoding="utf-8-sig")
-    
-    weather_output_path = os.path.join(processed_dir, "weather_data.csv")
-    weather_df_result.to_csv(weather_output_path, index=False, encoding="utf-8-sig")
-    
-    matching_output_path = os.path.join(processed_dir, "roadkill_weather_matching.csv")
-    matching_df_result.to_csv(matching_output_path, index=False, encoding="utf-8-sig")
+    output_paths = [os.path.join(processed_dir, f"{name}.csv") for name in OUTPUT_TABLES]
+    with metrics.stage("write", rows=sum(len(table) for table in results)):
+        for table, name in zip(results, OUTPUT_TABLES):
+            write_table(table, name, processed_dir)
 
+        # 다른 날짜 관측값으로 매칭한 행은 미매칭으로 기록 (기상 데이터가 바뀌면 같은 날 관측값으로 다시 시도)
+        exact = matching_df_result[matching_df_result["일자_오프셋"] == 0]
+        save_manifest(manifest_path, input_hashes, keys, hashes, row_keys(exact["일련번호"], exact["접수일자"]))
+
+    roadkill_output_path, weather_output_path, matching_output_path = output_paths
     print(f"\n완료!")
     print(f"로드킬 데이터: {len(roadkill_df_result):,}건 - {roadkill_output_path}")
     print(f"날씨 데이터: {len(weather_df_result):,}건 - {weather_output_path}")
     print(f"매칭 테이블: {len(matching_df_result):,}건 - {matching_output_path}")
     print(f"- 평균 거리: {matching_df_result['거리_km'].mean():.2f}km")
-    print(f"- 날씨 매칭률: {len(matching_results)/len(roadkill_results)*100:.1f}% ({len(matching_results)}/{len(roadkill_results)}건)")
+    print(f"- 날씨 매칭률: {len(matching_df_result)/len(roadkill_df_result)*100:.1f}% ({len(matching_df_result)}/{len(roadkill_df_result)}건)")
+    print(f"- 날짜 대체 매칭(±{day_tolerance}일): {(matching_df_result['일자_오프셋'] != 0).sum():,}건")
+
+    metrics.set(
+        status="incremental" if existing is not None else "full",
+        output_rows={name: len(table) for name, table in zip(OUTPUT_TABLES, results)},
+    )
+    metrics.write(metrics_path)
+    metrics.print_summary()
+    print(f"측정값 저장: {metrics_path}")
 
     return roadkill_df_result, weather_df_result, matching_df_result
 
 
+def record_match_metrics(metrics, match_stats):
+    """매칭 통계 → 최근접/대체 탐색 세부 단계 + 매칭률/대체율 (이번에 매칭한 행 기준)"""
+    rows = match_stats.get("rows", 0)
+    for name in ("nearest", "fallback", "temporal"):
+        seconds = match_stats.get(f"{name}_seconds", 0.0)
+        metrics.stages.append({
+            "name": f"matching.{name}",
+            "rows": rows,
+            "seconds": round(seconds, 4),
+            "rows_per_s": round(rows / seconds, 1) if rows and seconds > 0 else None,
+            "peak_rss_mb": None,
+        })
+    matched = match_stats.get("nearest", 0) + match_stats.get("fallback", 0) + match_stats.get("temporal", 0)
+    metrics.set(
+        matched_rows=rows,
+        nearest_matches=match_stats.get("nearest", 0),
+        fallback_matches=match_stats.get("fallback", 0),
+        temporal_matches=match_stats.get("temporal", 0),
+        unmatched=match_stats.get("unmatched", 0),
+        match_rate=round(matched / rows, 4) if rows else None,
+        fallback_rate=round(match_stats.get("fallback", 0) / matched, 4) if matched else None,
+        temporal_rate=round(match_stats.get("temporal", 0) / matched, 4) if matched else None,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로드킬-날씨 통합 데이터셋 생성")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="새로 추가되거나 바뀐 로드킬 행만 매칭해 기존 결과에 반영"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="월 단위 병렬 매칭 프로세스 수 (기본 1 = 직렬, 0 = CPU 코어 수)"
+    )
+    parser.add_argument(
+        "--day-tolerance", type=int, default=DAY_TOLERANCE, choices=range(MAX_DAY_TOLERANCE + 1), metavar="N",
+        help=f"그날 관측값이 있는 관측소가 없을 때 앞뒤 N일 이내 관측값 사용 (기본 {DAY_TOLERANCE}, 0~{MAX_DAY_TOLERANCE}, 0이면 사용 안 함)"
+    )
+    parser.add_argument("--metrics", help="단계별 측정값 JSON 경로 (기본: data/processed/merge_metrics.json)")
+    parser.add_argument("--profile", help="cProfile 결과 저장 경로 (예: merge.prof, 지정하면 상위 함수 출력)")
+    args = parser.parse_args()
+    with profiled(args.profile):
+        create_full_weather_dataset(
+            incremental=args.incremental, workers=args.workers, metrics_path=args.metrics,
+            day_tolerance=args.day_tolerance
+        )
+
+
 if __name__ == "__main__":
-    create_full_weather_dataset()
+    warnings.filterwarnings("ignore")
+    main()
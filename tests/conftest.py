@@ -0,0 +1,13 @@
+"""
+Module: conftest
+Description: pytest 공통 설정 (scripts/, backend/ 모듈을 스크립트 실행 때와 같은 방식으로 import, 가상 데이터는 benchmarks/).
+"""
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for path in (os.path.join(BASE_DIR, name) for name in ("scripts", "backend", "benchmarks")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
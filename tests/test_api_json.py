@@ -0,0 +1,113 @@
+"""
+Module: test_api_json
+Description: 결측값이 있는 결과 테이블로 API 응답을 만들어 표준 JSON(NaN 없음)인지, 압축 응답이 같은 JSON인지, 기간 파라미터 이름(start/end, startDate/endDate)이 같은 결과인지, 잘못된 bbox를 400으로 거부하는지 확인.
+"""
+
+import gzip
+import json
+
+import brotli
+
+import pytest
+
+import app as app_module
+from roadkill_dataset import RoadkillDataset
+from roadkill_statistics import RoadkillStatistics
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """임시 폴더의 결과 테이블을 읽는 테스트 클라이언트 (강수량/강수계속시간/관할기관 결측 포함)"""
+    (tmp_path / "roadkill_data.csv").write_text(
+        "일련번호,접수일자,접수시각,관할기관,위도,경도\n"
+        "1,2020-08-01,0:20,경기 부천시,37.52,126.78\n"
+        "2,2020-08-02,9:10,,37.40,\n",
+        encoding="utf-8-sig"
+    )
+    (tmp_path / "roadkill_weather_matching.csv").write_text(
+        "일련번호,지점번호,접수일자,접수시각,거리_km,관측소_운영여부\n"
+        "1,112,20200801,0:20,15.29,True\n",
+        encoding="utf-8-sig"
+    )
+    (tmp_path / "weather_data.csv").write_text(
+        "지점번호,지점명,일자,일평균기온,강수량,일평균풍속,일조시간,전운량,강수계속시간,습도\n"
+        "112,인천,20200801,24.4,,3.0,0.1,10.0,,93.6\n"
+        "112,인천,20200802,25.1,1.5,2.0,,8.0,3.5,90.0\n",
+        encoding="utf-8-sig"
+    )
+    dataset = RoadkillDataset(
+        str(tmp_path / "roadkill_data.csv"),
+        encode=lambda records: app_module.app.json.dumps(records, separators=(",", ":")) + "\n"
+    )
+    monkeypatch.setattr(app_module, "roadkill_dataset", dataset)
+    monkeypatch.setattr(app_module, "roadkill_statistics", RoadkillStatistics(str(tmp_path)))
+    return app_module.app.test_client()
+
+
+def test_weather_missing_values_are_null(client):
+    response = client.get("/api/roadkill/weather")
+    assert b"NaN" not in response.data
+    rows = json.loads(response.data)["data"]
+    assert rows[0]["일자"] == "20200802" and rows[0]["일조시간"] is None
+    assert rows[1]["강수량"] is None and rows[1]["강수계속시간"] is None
+
+
+def test_roadkill_missing_values_are_null(client):
+    for query in ("", "?start=2020-08-01", "?format=ndjson"):
+        response = client.get("/api/roadkill" + query)
+        assert b"NaN" not in response.data
+        text = response.get_data(as_text=True)
+        rows = [json.loads(line) for line in text.splitlines()] if "ndjson" in query else json.loads(text)
+        rows = rows["data"] if isinstance(rows, dict) else rows
+        assert rows[1]["경도"] is None and rows[1]["관할기관"] is None
+
+
+@pytest.mark.parametrize("encoding, decompress", [("br", brotli.decompress), ("gzip", gzip.decompress)])
+def test_compressed_body_matches_json(client, encoding, decompress):
+    plain = client.get("/api/roadkill", headers={"Accept-Encoding": "identity"})
+    response = client.get("/api/roadkill", headers={"Accept-Encoding": encoding})
+    assert "Content-Encoding" not in plain.headers
+    assert response.headers["Content-Encoding"] == encoding
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert decompress(response.data) == plain.data
+    assert json.loads(decompress(response.data))[0]["일련번호"] == 1
+
+    # 압축본별 ETag로 조건부 요청
+    repeat = client.get("/api/roadkill", headers={"Accept-Encoding": encoding, "If-None-Match": response.headers["ETag"]})
+    assert repeat.status_code == 304
+
+
+def test_brotli_preferred_over_gzip(client):
+    response = client.get("/api/roadkill", headers={"Accept-Encoding": "gzip, deflate, br"})
+    assert response.headers["Content-Encoding"] == "br"
+
+
+@pytest.mark.parametrize("path", ["/api/roadkill", "/api/roadkill/statistics/by-region", "/api/roadkill/statistics/by-date"])
+def test_date_param_names_are_equivalent(client, path):
+    short = client.get(path + "?start=2020-08-02&end=2020-08-02")
+    long = client.get(path + "?startDate=2020-08-02&endDate=2020-08-02")
+    assert short.status_code == long.status_code == 200
+    assert short.get_json() == long.get_json()
+    assert long.get_json() != client.get(path).get_json()
+
+    # 같은 쪽을 두 이름으로 다르게 주면 400, 같은 값이면 허용
+    assert client.get(path + "?start=2020-08-01&startDate=2020-08-02").status_code == 400
+    assert client.get(path + "?start=2020-08-02&startDate=2020-08-02&endDate=2020-08-02").get_json() == long.get_json()
+
+
+@pytest.mark.parametrize("path", ["/api/roadkill", "/api/roadkill/clusters", "/api/roadkill/hotspots"])
+@pytest.mark.parametrize("bbox", [
+    "126,37", "126,37,127,38,1", "a,37,127,38", "nan,37,127,38", "126,37,inf,38",
+    "127,37,126,38", "126,38,127,37",
+])
+def test_invalid_bbox_rejected(client, path, bbox):
+    response = client.get(f"{path}?bbox={bbox}")
+    assert response.status_code == 400
+    assert response.get_json()["error"].startswith("잘못된 조회 조건")
+
+
+@pytest.mark.parametrize("path", ["/api/roadkill", "/api/roadkill/clusters", "/api/roadkill/hotspots"])
+def test_valid_bbox_accepted(client, path):
+    # 최소값 = 최대값(한 점)도 허용
+    assert client.get(f"{path}?bbox=126,37,127,38").status_code == 200
+    assert client.get(f"{path}?bbox=126.78,37.52,126.78,37.52").status_code == 200
@@ -0,0 +1,64 @@
+"""
+Module: test_incremental_merge
+Description: 증분 병합(--incremental)이 추가/변경된 행만 다시 매칭하고 전체 재생성과 같은 결과를 내는지 확인.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from merge_manifest import OUTPUT_TABLES
+from synthetic_data import write_dataset
+from weather_roadkill_marged import create_full_weather_dataset
+
+
+def run_merge(base_dir, incremental):
+    """병합 실행 → 측정값 (status, matched_rows 등)"""
+    create_full_weather_dataset(incremental=incremental, base_dir=str(base_dir))
+    with open(os.path.join(base_dir, "data", "processed", "merge_metrics.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_outputs(base_dir):
+    processed_dir = os.path.join(base_dir, "data", "processed")
+    outputs = {}
+    for name in OUTPUT_TABLES:
+        with open(os.path.join(processed_dir, f"{name}.csv"), "rb") as f:
+            outputs[name] = f.read()
+    return outputs
+
+
+def test_incremental_rematches_only_changed_rows(tmp_path):
+    incremental_dir = tmp_path / "incremental"
+    write_dataset(str(incremental_dir), n_rows=2000, n_stations=60, n_operating=30, n_days=120, seed=5)
+    roadkill_path = incremental_dir / "data" / "raw" / "roadkill" / "roadkill_merged.csv"
+
+    metrics = run_merge(incremental_dir, incremental=True)
+    assert metrics["status"] == "full" and metrics["matched_rows"] == 2000
+
+    # 뒤에 30행 추가 + 기존 행 하나의 좌표 수정
+    roadkill = pd.read_csv(roadkill_path, encoding="utf-8-sig")
+    added = roadkill.tail(30).copy()
+    added["일련번호"] = roadkill["일련번호"].max() + 1 + np.arange(30)
+    roadkill.loc[100, "GPS X"] = round(roadkill.loc[100, "GPS X"] + 0.3, 7)
+    roadkill = pd.concat([roadkill, added], ignore_index=True)
+    roadkill.to_csv(roadkill_path, index=False, encoding="utf-8-sig")
+
+    metrics = run_merge(incremental_dir, incremental=True)
+    assert metrics["status"] == "incremental"
+    assert metrics["matched_rows"] == 31
+
+    # 같은 입력으로 처음부터 다시 만든 결과와 바이트 단위로 같음
+    full_dir = tmp_path / "full"
+    shutil.copytree(incremental_dir / "data" / "raw", full_dir / "data" / "raw")
+    run_merge(full_dir, incremental=False)
+    assert read_outputs(incremental_dir) == read_outputs(full_dir)
+
+    # 입력이 그대로면 다시 매칭하지 않음
+    before = read_outputs(incremental_dir)
+    metrics = run_merge(incremental_dir, incremental=True)
+    assert metrics["status"] == "unchanged"
+    assert read_outputs(incremental_dir) == before
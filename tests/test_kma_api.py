@@ -0,0 +1,114 @@
+"""
+Module: test_kma_api
+Description: 로컬 HTTP 서버를 기상청 API 대신 띄워 일자료 다운로드(순서, 재시도, 캐시 이어받기)를 확인.
+"""
+
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from KMA_api import date_range, download_weather_data, iter_downloads
+
+
+class FakeKMAServer:
+    """일자별 응답을 돌려주는 로컬 서버
+
+    - failures: 일자 → 앞쪽 요청에 돌려줄 상태 코드 목록 (다 쓰면 정상 응답)
+    - requests: 일자별 요청 횟수
+    """
+
+    def __init__(self):
+        self.failures = {}
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                date_str = parse_qs(urlparse(self.path).query)["tm"][0]
+                with server._lock:
+                    server.requests[date_str] += 1
+                    statuses = server.failures.get(date_str)
+                    status = statuses.pop(0) if statuses else 200
+                # 앞 날짜일수록 늦게 응답 (완료 순서가 날짜 순서와 달라지도록)
+                time.sleep((31 - int(date_str[-2:])) * 0.002)
+                body = f"#START7777\n{date_str},  108,2.1,15.0\n#7777END\n".encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}/api/typ01/url/kma_sfcdd.php"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    with FakeKMAServer() as fake:
+        yield fake
+
+
+DATES = date_range(datetime(2020, 8, 1), datetime(2020, 8, 12))
+
+
+def test_results_are_date_ordered_and_503_is_retried(server):
+    server.failures["20200803"] = [503, 503]
+    results = list(iter_downloads(DATES, workers=4, rate=0, base_url=server.base_url, backoff=0.001))
+
+    assert [date_str for date_str, _, _ in results] == DATES
+    assert all(error is None for _, _, error in results)
+    assert [data for _, data, _ in results] == [f"{d},  108,2.1,15.0".encode("utf-8") for d in DATES]
+    assert server.requests["20200803"] == 3
+
+
+def test_client_error_fails_without_retry(server):
+    server.failures["20200802"] = [404]
+    results = dict((d, (data, error)) for d, data, error in iter_downloads(
+        DATES[:3], workers=2, rate=0, base_url=server.base_url, retries=4, backoff=0.001
+    ))
+
+    data, error = results["20200802"]
+    assert data is None and isinstance(error, requests.HTTPError)
+    assert server.requests["20200802"] == 1
+    assert results["20200803"][1] is None
+
+
+def test_resumed_backfill_reads_cached_days(server, tmp_path):
+    start, end = datetime(2020, 8, 1), datetime(2020, 8, 12)
+    server.failures["20200805"] = [403]
+
+    # 1️⃣ 첫 실행: 한 날짜는 403 (재시도 없이 실패) → 빠진 일자로 보고
+    gaps = download_weather_data(start, end, workers=4, rate=0, base_url=server.base_url, output_dir=str(tmp_path))
+    assert gaps == ["20200805"]
+    assert sum(server.requests.values()) == len(DATES)
+
+    # 2️⃣ 이어받기: 캐시에 없는 날짜만 요청
+    server.requests.clear()
+    gaps = download_weather_data(start, end, workers=4, rate=0, base_url=server.base_url, output_dir=str(tmp_path))
+    assert gaps == [] and dict(server.requests) == {"20200805": 1}
+
+    # 3️⃣ 전부 캐시에 있으면 서버에 요청하지 않음
+    server.requests.clear()
+    assert download_weather_data(start, end, workers=4, rate=0, base_url=server.base_url, output_dir=str(tmp_path)) == []
+    assert not server.requests
+
+    lines = (tmp_path / "weather_data.csv").read_text(encoding="utf-8").splitlines()
+    assert [line[:8] for line in lines[1:]] == DATES
@@ -0,0 +1,90 @@
+"""
+Module: test_report_aggregator
+Description: 신고 데이터 집계 결과가 저장소의 animalType_data.csv와 같은지, 이어서 집계할 때 쓰는 중인 줄/잘못된 줄 처리 확인.
+"""
+
+import os
+import shutil
+
+from report_aggregator import BASE_DIR, REPORT_PATH, ReportAggregator, aggregate_reports
+
+TRACKED_TABLE = os.path.join(BASE_DIR, "data", "processed", "animalType_data.csv")
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_species_table_matches_tracked_file(tmp_path):
+    """전체 집계 → 이어서 집계 모두 기존 파일과 바이트 단위로 같음 (같은 건수의 행 순서 포함)"""
+    shutil.copy(TRACKED_TABLE, tmp_path / "animalType_data.csv")
+
+    aggregate_reports(REPORT_PATH, processed_dir=str(tmp_path), full=True)
+    assert read_bytes(tmp_path / "animalType_data.csv") == read_bytes(TRACKED_TABLE)
+
+    aggregate_reports(REPORT_PATH, processed_dir=str(tmp_path))
+    assert read_bytes(tmp_path / "animalType_data.csv") == read_bytes(TRACKED_TABLE)
+
+
+def test_ties_follow_previous_table_order(tmp_path):
+    """같은 건수는 기존 테이블 순서, 새 키는 그 뒤에 처음 나온 순서"""
+    report = tmp_path / "report.csv"
+    report.write_text(
+        "종명,접수일시,도로유형,도로명\n"
+        "고라니,2022-01-01,국도,1\n"
+        "너구리,2022-01-02,국도,1\n"
+        "고양이,2022-01-03,국도,1\n"
+        "고양이,2022-01-04,국도,1\n"
+        "삵,2022-01-05,국도,1\n",
+        encoding="utf-8"
+    )
+    (tmp_path / "animalType_data.csv").write_text(
+        "종명,건수,비율(%)\n너구리,1,50.0\n고라니,1,50.0\n", encoding="utf-8-sig"
+    )
+
+    tables = aggregate_reports(str(report), processed_dir=str(tmp_path), full=True)
+    assert list(tables["animalType_data"]["종명"]) == ["고양이", "너구리", "고라니", "삵"]
+
+
+def species_counts(aggregator):
+    table = aggregator.tables()["animalType_data"]
+    return dict(zip(table["종명"], table["건수"]))
+
+
+def test_partial_last_line_is_read_again(tmp_path):
+    """쓰는 중인 마지막 줄은 offset을 넘기지 않고, 줄이 완성되면 한 번만 집계"""
+    report = tmp_path / "report.csv"
+    report.write_bytes("종명,접수일시,도로유형,도로명\n고라니,2022-01-01,국도,1\n너구".encode("utf-8"))
+    aggregator = ReportAggregator()
+    assert aggregator.update(str(report)) == 1
+    offset = aggregator.offset
+    assert aggregator.tail_rows == 1 and aggregator.rows == 1
+
+    state = tmp_path / "state.json"
+    aggregator.save(str(state))
+    aggregator = ReportAggregator.load(str(state))
+    with open(report, "ab") as f:
+        f.write("리,2022-02-01,국도,2\n고라니,2022-02-02,고속도로,3".encode("utf-8"))
+    assert aggregator.update(str(report)) == 1
+    assert aggregator.offset > offset
+    assert species_counts(aggregator) == {"고라니": 2, "너구리": 1}
+    assert "너구" not in species_counts(aggregator)
+
+
+def test_bad_lines_are_counted(tmp_path):
+    report = tmp_path / "report.csv"
+    report.write_text(
+        "종명,접수일시,도로유형,도로명\n"
+        "고라니,2022-01-01,국도,1\n"
+        "고라니,2022-01-02,국도,1,남는 필드\n"
+        "삵,2022-01-03,국도,1\n",
+        encoding="utf-8"
+    )
+    aggregator = ReportAggregator()
+    assert aggregator.update(str(report)) == 2
+    assert aggregator.bad_lines == 1
+    assert species_counts(aggregator) == {"고라니": 1, "삵": 1}
+
+    aggregator.save(str(tmp_path / "state.json"))
+    assert ReportAggregator.load(str(tmp_path / "state.json")).bad_lines == 1
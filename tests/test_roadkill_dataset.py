@@ -0,0 +1,80 @@
+"""
+Module: test_roadkill_dataset
+Description: 행을 덧붙인 스냅샷이 파일 인덱스를 다시 만들지 않고도 전체를 다시 읽은 결과와 같은지 확인.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from roadkill_dataset import RoadkillDataset
+from roadkill_hotspots import RoadkillHotspots
+
+COLUMNS = ["일련번호", "접수일자", "접수시각", "관할기관", "위도", "경도"]
+
+
+def encode(records):
+    return json.dumps(records, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def make_rows(n, seed, first_serial):
+    rng = np.random.default_rng(seed)
+    agencies = np.array(["경기 부천시", "강원 춘천시", "충남 공주시", None], dtype=object)
+    return pd.DataFrame({
+        "일련번호": np.arange(first_serial, first_serial + n),
+        "접수일자": (np.datetime64("2021-01-01") + rng.integers(0, 400, n)).astype(str),
+        "접수시각": "9:00",
+        "관할기관": agencies[rng.integers(0, len(agencies), n)],
+        "위도": rng.uniform(34.0, 38.0, n).round(6),
+        "경도": rng.uniform(126.0, 129.0, n).round(6),
+    })[COLUMNS]
+
+
+def write_csv(frame, path):
+    frame.to_csv(path, index=False, encoding="utf-8-sig")
+
+
+def test_appended_snapshot_matches_full_reload(tmp_path):
+    file_rows = make_rows(500, seed=1, first_serial=1)
+    batches = [make_rows(n, seed=10 + n, first_serial=5_000_001 + 10 * n) for n in (1, 3, 7)]
+    (tmp_path / "appended").mkdir()
+    (tmp_path / "full").mkdir()
+    write_csv(file_rows, tmp_path / "appended" / "roadkill_data.csv")
+    write_csv(pd.concat([file_rows, *batches], ignore_index=True), tmp_path / "full" / "roadkill_data.csv")
+
+    dataset = RoadkillDataset(str(tmp_path / "appended" / "roadkill_data.csv"), encode)
+    hotspots = RoadkillHotspots()
+    base = dataset.load()
+    hotspots.load(base)
+    for batch in batches:
+        snapshot = dataset.append_rows(batch)
+        hotspots.load(snapshot)
+    full = RoadkillDataset(str(tmp_path / "full" / "roadkill_data.csv"), encode).load()
+
+    # 파일 인덱스/클러스터 레벨은 다시 만들지 않고 공유
+    assert snapshot.index.base is base.index
+    assert snapshot.clusters.levels is base.clusters.levels
+    assert snapshot.lineage == base.lineage and snapshot.size == full.size
+
+    assert snapshot.body == full.body
+    assert [snapshot.records[i] for i in range(snapshot.size)] == full.records
+    for query in (
+        {},
+        {"start_day": 18800, "end_day": 18900},
+        {"bbox": [126.5, 35.0, 127.5, 36.5]},
+        {"agency": "경기"},
+        {"bbox": [126.0, 34.0, 129.0, 38.0], "start_day": 18700, "agency": "강원 춘천시"},
+    ):
+        rows = snapshot.index.query(**query)
+        np.testing.assert_array_equal(rows, full.index.query(**query))
+        pd.testing.assert_frame_equal(
+            snapshot.take(rows).reset_index(drop=True), full.frame.iloc[rows].reset_index(drop=True)
+        )
+    for zoom, bbox in ((0, None), (8, [126.5, 35.0, 127.5, 36.5]), (14, None)):
+        for ours, expected in zip(snapshot.clusters.query(zoom, bbox), full.clusters.query(zoom, bbox)):
+            np.testing.assert_allclose(ours, expected)
+
+    cube, expected = hotspots.cube, RoadkillHotspots().load(full)
+    assert cube.week0 == expected.week0
+    np.testing.assert_array_equal(cube.counts, expected.counts)
@@ -0,0 +1,118 @@
+"""
+Module: test_roadkill_ingest
+Description: 신고 형식 검증, WAL 복구 실패 처리, 결과 테이블이 없을 때 압축이 아무것도 쓰지 않는지 확인.
+"""
+
+import json
+import time
+
+import pandas as pd
+import pytest
+
+import app as app_module
+from roadkill_dataset import RoadkillDataset
+from roadkill_ingest import INGEST_SOURCE, ReportIngestor, parse_report
+
+REPORT = {"latitude": 37.5, "longitude": 127.0, "incident_date": "2022-06-15", "incident_time": "8:05"}
+
+
+@pytest.mark.parametrize("date", [
+    "now", "today", "20240101", "2024-1-5", "2024-02-30", " 2024-01-05", "2024-01-05T00:00",
+    "2024-06-02", "2030-01-01", "2019-12-31", "1990-05-05",
+])
+def test_report_date_rejected(date):
+    now = pd.Timestamp("2024-06-01 12:00")
+    with pytest.raises(ValueError, match="incident_date"):
+        parse_report({**REPORT, "incident_date": date}, now)
+
+
+def test_report_date_accepted():
+    now = pd.Timestamp("2024-06-01 12:00")
+    assert parse_report({**REPORT, "incident_date": "2024-06-01"}, now)["접수일자"] == "2024-06-01"
+    assert parse_report({**REPORT, "incident_date": "2020-01-01"}, now)["접수일자"] == "2020-01-01"
+    assert parse_report({"latitude": 37.5, "longitude": 127.0}, now)["접수일자"] == "2024-06-01"
+
+
+def write_roadkill_data(path):
+    pd.DataFrame({
+        "일련번호": [1, 2], "접수일자": ["2022-01-01", "2022-01-02"], "접수시각": ["9:00", "10:30"],
+        "관할기관": ["서울 강남구", None], "위도": [37.5, 36.1], "경도": [127.0, 128.1],
+    }).to_csv(path, index=False, encoding="utf-8-sig")
+
+
+def make_ingestor(tmp_path, **options):
+    """임시 폴더 (processed/roadkill_data.csv는 만들지 않음) 기준 접수기"""
+    processed_dir = tmp_path / "processed"
+    roadkill_dir = tmp_path / "roadkill"
+    processed_dir.mkdir()
+    roadkill_dir.mkdir()
+    dataset = RoadkillDataset(str(processed_dir / "roadkill_data.csv"), lambda records: json.dumps(records) + "\n")
+    return ReportIngestor(
+        dataset, str(processed_dir), str(roadkill_dir),
+        str(tmp_path / "stations.csv"), str(tmp_path / "weather.csv"), **options
+    )
+
+
+def test_failed_recovery_is_reported_and_retried(tmp_path):
+    ingestor = make_ingestor(tmp_path, batch_seconds=0.05)
+    records = [{"seq": 1, "일련번호": 5_000_001, "접수일자": "2022-06-15", "접수시각": "8:05",
+                "관할기관": None, "GPS X": 127.0, "GPS Y": 37.5}]
+    ingestor.log.append(records)
+
+    # 데이터셋 파일이 없어 복구 실패 → 예외 없이 last_error, 접수는 거부
+    ingestor.ensure_started()
+    try:
+        assert not ingestor.ready
+        assert "FileNotFoundError" in ingestor.status()["last_error"]
+        with pytest.raises(RuntimeError):
+            ingestor.ingest([REPORT])
+
+        # 파일이 생기면 백그라운드 스레드가 다시 복구
+        write_roadkill_data(tmp_path / "processed" / "roadkill_data.csv")
+        deadline = time.monotonic() + 5
+        while not ingestor.ready and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert ingestor.ready
+        assert ingestor.dataset.overlay_rows == 1
+        assert ingestor.ingest([REPORT])[0]["일련번호"] == 5_000_002
+    finally:
+        ingestor.stop()
+
+
+def test_failed_recovery_does_not_break_read_endpoints(tmp_path, monkeypatch):
+    ingestor = make_ingestor(tmp_path)
+    ingestor.log.append([{"seq": 1, "일련번호": 5_000_001, "접수일자": "2022-06-15"}])
+    monkeypatch.setattr(app_module, "roadkill_dataset", ingestor.dataset)
+    monkeypatch.setattr(app_module, "report_ingestor", ingestor)
+    monkeypatch.setattr(ingestor, "batch_seconds", 3600)
+    app_module.start_report_ingestor()
+    client = app_module.app.test_client()
+    try:
+        assert client.get("/api/roadkill").status_code == 404
+        assert client.post("/api/roadkill/reports", json=REPORT).status_code == 503
+        status = client.get("/api/roadkill/reports/status").get_json()["data"]
+        assert not status["recovered"] and "WAL 복구 실패" in status["last_error"]
+    finally:
+        ingestor.stop()
+
+
+def test_compaction_keeps_tables_when_output_missing(tmp_path):
+    ingestor = make_ingestor(tmp_path)
+    processed_dir = tmp_path / "processed"
+    roadkill_dir = tmp_path / "roadkill"
+    data_path = processed_dir / "roadkill_data.csv"
+    write_roadkill_data(data_path)
+    before = data_path.read_bytes()
+
+    records = [{"seq": 1, "일련번호": 5_000_001, "접수일자": "2022-06-15", "위도": 37.5, "경도": 127.0}]
+    ingestor.log.append(records)
+    ingestor._matched = [(records, None)]
+
+    # weather_data / roadkill_weather_matching이 없으면 접수 신고만으로 덮어쓰지 않고 실패
+    with pytest.raises(FileNotFoundError, match="weather_data"):
+        ingestor.process(compact=True)
+
+    assert data_path.read_bytes() == before
+    assert not (roadkill_dir / INGEST_SOURCE).exists()
+    assert ingestor.log.read() == records
+    assert ingestor.status()["awaiting_compaction"] == 1
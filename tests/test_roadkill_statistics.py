@@ -0,0 +1,115 @@
+"""
+Module: test_roadkill_statistics
+Description: 행을 덧붙인 스냅샷의 통계 큐브가 결과 테이블을 다시 읽지 않고도 전체를 다시 만든 큐브와 같은지 확인.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from roadkill_dataset import RoadkillDataset
+from roadkill_statistics import RoadkillStatistics
+
+COLUMNS = ["일련번호", "접수일자", "접수시각", "관할기관", "위도", "경도"]
+AGENCIES = np.array(["경기 부천시", "강원 춘천시", "충남 공주시", None], dtype=object)
+
+
+def encode(records):
+    return json.dumps(records, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def make_rows(n, seed, first_serial, first_day="2021-01-01", n_days=300, agencies=AGENCIES):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "일련번호": np.arange(first_serial, first_serial + n),
+        "접수일자": (np.datetime64(first_day) + rng.integers(0, n_days, n)).astype(str),
+        "접수시각": "9:00",
+        "관할기관": agencies[rng.integers(0, len(agencies), n)],
+        "위도": rng.uniform(34.0, 38.0, n).round(6),
+        "경도": rng.uniform(126.0, 129.0, n).round(6),
+    })[COLUMNS]
+
+
+def write_tables(directory, roadkill, matching, weather):
+    directory.mkdir()
+    roadkill.to_csv(directory / "roadkill_data.csv", index=False, encoding="utf-8-sig")
+    matching.to_csv(directory / "roadkill_weather_matching.csv", index=False, encoding="utf-8-sig")
+    weather.to_csv(directory / "weather_data.csv", index=False, encoding="utf-8-sig")
+
+
+def summaries(cube):
+    return (
+        cube.by_region(), cube.by_month(), cube.by_month(18700, 18800, "경기"),
+        cube.weather_by_month(), cube.weather_by_month(18600, 18700),
+    )
+
+
+def assert_same(ours, expected):
+    if isinstance(ours, float):
+        assert ours == pytest.approx(expected, abs=0.011)  # 소수 둘째 자리 반올림 경계
+    elif isinstance(ours, (list, tuple)):
+        assert len(ours) == len(expected)
+        for a, b in zip(ours, expected):
+            assert_same(a, b)
+    elif isinstance(ours, dict):
+        assert ours.keys() == expected.keys()
+        for key in ours:
+            assert_same(ours[key], expected[key])
+    else:
+        assert ours == expected
+
+
+def test_appended_rows_update_cube_without_rereading_tables(tmp_path, monkeypatch):
+    file_rows = make_rows(300, seed=1, first_serial=1)
+    batches = [
+        make_rows(2, seed=2, first_serial=5_000_001),
+        make_rows(3, seed=3, first_serial=5_000_011, first_day="2022-03-01", n_days=10),  # 범위 뒤 일자
+        make_rows(2, seed=4, first_serial=5_000_021, first_day="2020-06-01", n_days=5),   # 범위 앞 일자
+        make_rows(2, seed=5, first_serial=5_000_031, agencies=np.array(["제주 제주시"], dtype=object)),  # 새 시도
+        make_rows(2, seed=6, first_serial=5_000_041, agencies=np.array([None], dtype=object)),
+    ]
+    matched = file_rows.iloc[:150]
+    matching = pd.DataFrame({
+        "일련번호": matched["일련번호"],
+        "지점번호": np.where(np.arange(150) % 2, 112, 202),
+        "접수일자": matched["접수일자"].str.replace("-", ""),
+        "접수시각": matched["접수시각"],
+        "거리_km": 10.0,
+        "관측소_운영여부": True,
+        "일자_오프셋": 0,
+    })
+    dates = pd.date_range("2021-01-01", periods=300).strftime("%Y%m%d")
+    rng = np.random.default_rng(7)
+    weather = pd.DataFrame({
+        "지점번호": np.repeat([112, 202], len(dates)),
+        "지점명": np.repeat(["인천", "양평"], len(dates)),
+        "일자": np.tile(dates, 2),
+        "일평균기온": rng.uniform(-5, 30, 2 * len(dates)).round(1),
+        "강수량": rng.uniform(0, 20, 2 * len(dates)).round(1),
+        "일평균풍속": rng.uniform(0, 5, 2 * len(dates)).round(1),
+        "일조시간": rng.uniform(0, 10, 2 * len(dates)).round(1),
+        "전운량": rng.uniform(0, 10, 2 * len(dates)).round(1),
+        "강수계속시간": np.where(rng.random(2 * len(dates)) < 0.3, np.nan, 2.0),
+        "습도": rng.uniform(30, 100, 2 * len(dates)).round(1),
+    })
+    write_tables(tmp_path / "appended", file_rows, matching, weather)
+    write_tables(tmp_path / "full", pd.concat([file_rows, *batches], ignore_index=True), matching, weather)
+
+    dataset = RoadkillDataset(str(tmp_path / "appended" / "roadkill_data.csv"), encode)
+    statistics = RoadkillStatistics(str(tmp_path / "appended"))
+    statistics.load(dataset.load())
+
+    reads = []
+    original_read = statistics._read
+    monkeypatch.setattr(statistics, "_read", lambda name: reads.append(name) or original_read(name))
+    for batch in batches:
+        cube = statistics.load(dataset.append_rows(batch))
+    assert reads == []  # 결과 테이블은 다시 읽지 않음
+
+    full_dataset = RoadkillDataset(str(tmp_path / "full" / "roadkill_data.csv"), encode)
+    expected = RoadkillStatistics(str(tmp_path / "full")).load(full_dataset.load())
+    assert cube.n_rows == expected.n_rows
+    assert (cube.first_day, cube.n_days) == (expected.first_day, expected.n_days)
+    assert_same(summaries(cube), summaries(expected))
@@ -0,0 +1,166 @@
+"""
+Module: test_weather_matching
+Description: 관측소 최근접 탐색, (지점번호, 일자) 기상 인덱스, 대체 관측소/날짜 대체 매칭, 월 단위 병렬 매칭 확인.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from geo_index import StationIndex, haversine_np
+from weather_index import DAY_COLUMN, WeatherIndex, pack_keys, to_day_numbers
+from weather_matcher import WeatherMatcher, match_by_month
+from weather_reader import FIELD_DTYPE, WEATHER_FIELD_COLUMNS
+
+DAY = int(to_day_numbers(pd.to_datetime(["2021-03-10"]))[0])
+
+
+def make_stations(ids, lat, lon):
+    return pd.DataFrame({
+        "지점번호": ids, "지점명": [f"관측소{i}" for i in ids], "위도": lat, "경도": lon,
+    })
+
+
+def make_weather(station_ids, days):
+    """weather_reader.read_weather_data와 같은 형식 (기온 = 지점번호 + 일수 끝자리로 행 구분)"""
+    station_ids = np.asarray(station_ids, dtype=np.int32)
+    days = np.asarray(days, dtype=np.int32)
+    frame = pd.DataFrame({DAY_COLUMN: days, "지점": station_ids})
+    for column in WEATHER_FIELD_COLUMNS:
+        frame[column] = np.zeros(len(days), dtype=FIELD_DTYPE)
+    frame["일평균기온"] = (station_ids + (days % 100) / 100).astype(FIELD_DTYPE)
+    return frame
+
+
+def make_roadkill(lat, lon, days):
+    n = len(lat)
+    return pd.DataFrame({
+        "일련번호": np.arange(1, n + 1),
+        "접수일자": pd.to_datetime(np.asarray(days, dtype="datetime64[D]")),
+        "접수시각": "9:00",
+        "관할기관": "경기 부천시",
+        "GPS X": np.asarray(lon, dtype=np.float64),
+        "GPS Y": np.asarray(lat, dtype=np.float64),
+    })
+
+
+def test_station_index_matches_brute_force():
+    rng = np.random.default_rng(7)
+    stations = make_stations(np.arange(100, 160), rng.uniform(33.5, 38.5, 60), rng.uniform(125.5, 130.0, 60))
+    # 좌표 없는 관측소, 중복 지점번호(첫 행만 사용)
+    stations.loc[5, "위도"] = np.nan
+    stations = pd.concat([stations, stations.iloc[[10]].assign(위도=33.0, 경도=125.0)], ignore_index=True)
+    index = StationIndex(stations)
+    assert len(index) == 59
+
+    lat = rng.uniform(33.0, 39.0, 2000)
+    lon = rng.uniform(125.0, 131.0, 2000)
+    ids, distances = index.nearest(lat, lon)
+
+    valid = stations.dropna(subset=["위도"]).drop_duplicates("지점번호")
+    brute = haversine_np(lon[:, None], lat[:, None], valid["경도"].to_numpy(), valid["위도"].to_numpy())
+    np.testing.assert_array_equal(ids, valid["지점번호"].to_numpy()[brute.argmin(axis=1)])
+    np.testing.assert_allclose(distances, brute.min(axis=1), rtol=1e-12)
+
+    positions, k_distances = index.query(lat, lon, k=3)
+    np.testing.assert_allclose(k_distances, np.sort(brute, axis=1)[:, :3], rtol=1e-12)
+    assert positions.shape == (2000, 3)
+
+
+def test_weather_index_lookup_hits_and_misses():
+    weather = make_weather([108, 108, 112, 108], [DAY, DAY + 1, DAY, DAY])  # 마지막 행은 중복 키
+    index = WeatherIndex(weather)
+    assert len(index) == 3
+
+    positions = index.lookup([108, 108, 112, 112, 999], [DAY, DAY + 1, DAY, DAY + 1, DAY])
+    np.testing.assert_array_equal(positions, [0, 1, 2, -1, -1])
+    assert index.frame.loc[0, "일평균기온"] == weather.loc[0, "일평균기온"]
+
+    # 지점번호는 상위 32비트, 일수는 하위 32비트 (서로 다른 지점/일자는 다른 키)
+    keys = pack_keys([108, 108, 109], [DAY, DAY + 1, DAY])
+    assert len(set(keys.tolist())) == 3
+    assert keys[0] >> 32 == 108 and keys[0] & 0xFFFFFFFF == DAY
+
+
+@pytest.mark.parametrize("query_day, tolerance, expected_day, expected_offset", [
+    (DAY, 0, DAY, 0),           # 같은 날
+    (DAY + 1, 1, DAY, -1),      # 앞뒤 한쪽만 허용 범위
+    (DAY + 3, 2, DAY + 4, 1),   # 다음 날이 더 가까움
+    (DAY + 2, 2, DAY, -2),      # 앞뒤 차이가 같으면 이전 날짜
+    (DAY + 2, 1, None, 0),      # 허용 범위 밖
+    (DAY - 5, 7, DAY, 5),       # 첫 관측일 이전
+])
+def test_lookup_nearest_day(query_day, tolerance, expected_day, expected_offset):
+    # 108: DAY, DAY+4 / 90: DAY+2 (다른 관측소 키는 사용하지 않아야 함)
+    index = WeatherIndex(make_weather([108, 108, 90], [DAY, DAY + 4, DAY + 2]))
+    positions, offsets = index.lookup_nearest_day(np.array([108]), np.array([query_day]), tolerance)
+    if expected_day is None:
+        assert positions[0] == -1
+    else:
+        assert index.frame.loc[positions[0], DAY_COLUMN] == expected_day
+    assert offsets[0] == expected_offset
+
+
+def line_stations():
+    """경도 127.0 / 127.1 / 127.2 / 127.3에 관측소 1~4 (로드킬 지점은 127.0, 가까운 순서 = 번호 순서)"""
+    return make_stations([1, 2, 3, 4], [37.0] * 4, [127.0, 127.1, 127.2, 127.3])
+
+
+def test_fallback_picks_next_operating_station():
+    # 1: 그날 관측값 없음(다음 날만), 2: 관측값은 있지만 운영 관측소 목록에 없음, 3, 4: 그날 관측값 있음
+    weather = make_weather([1, 2, 3, 4], [DAY + 1, DAY, DAY, DAY])
+    matcher = WeatherMatcher(line_stations(), weather, {1, 3, 4}, day_tolerance=1)
+    roadkill, weather_table, matching = matcher.match(make_roadkill([37.0], [127.0], [DAY]), verbose=False)
+
+    row = matching.iloc[0]
+    assert row["지점번호"] == 3 and row["일자_오프셋"] == 0 and bool(row["관측소_운영여부"])
+    assert row["거리_km"] == round(float(haversine_np(127.0, 37.0, 127.2, 37.0)), 2)
+    assert weather_table.loc[0, "일자"] == pd.Timestamp(np.datetime64(DAY, "D")).strftime("%Y%m%d")
+
+
+def test_day_tolerance_prefers_earlier_day_then_nearer_station():
+    # 그날 관측값이 있는 관측소 없음 → 1: 다음 날, 3: 전날, 4: 전날 → 전날 중 가까운 3
+    weather = make_weather([1, 3, 4], [DAY + 1, DAY - 1, DAY - 1])
+    stations = line_stations()
+    report = make_roadkill([37.0], [127.0], [DAY])
+
+    _, _, matching = WeatherMatcher(stations, weather, {1, 3, 4}, day_tolerance=1).match(report, verbose=False)
+    row = matching.iloc[0]
+    assert row["지점번호"] == 3 and row["일자_오프셋"] == -1 and not bool(row["관측소_운영여부"])
+
+    # 허용 일수 0이면 미매칭
+    _, _, matching = WeatherMatcher(stations, weather, {1, 3, 4}, day_tolerance=0).match(report, verbose=False)
+    assert matching.empty
+
+    # 전날 관측값이 없으면 다음 날 (가장 가까운 1)
+    weather = make_weather([1, 3], [DAY + 1, DAY + 2])
+    _, _, matching = WeatherMatcher(stations, weather, {1, 3}, day_tolerance=2).match(report, verbose=False)
+    assert matching.iloc[0]["지점번호"] == 1 and matching.iloc[0]["일자_오프셋"] == 1
+
+
+def test_match_by_month_parallel_equals_serial():
+    rng = np.random.default_rng(3)
+    stations = make_stations(np.arange(1, 41), rng.uniform(34.0, 38.0, 40), rng.uniform(126.0, 129.0, 40))
+    # 관측소마다 관측일 일부가 빠진 기상 데이터 (대체 관측소/날짜 대체 매칭이 모두 나오도록)
+    station_ids, days = np.meshgrid(np.arange(1, 41), np.arange(DAY - 5, DAY + 95), indexing="ij")
+    keep = rng.random(station_ids.size) < 0.6
+    # 모든 관측소가 관측값이 없는 날 (월 첫날 포함, 앞뒤 달 기상 데이터로 날짜 대체 매칭)
+    month_starts = to_day_numbers(pd.date_range("2021-03-01", periods=4, freq="MS"))
+    keep &= ~np.isin(days.ravel(), np.concatenate([month_starts, DAY + np.arange(0, 90, 7)]))
+    weather = make_weather(station_ids.ravel()[keep], days.ravel()[keep])
+    weather = weather.iloc[rng.permutation(len(weather))].reset_index(drop=True)
+    operating = set(range(1, 36))
+
+    n = 3000
+    roadkill = make_roadkill(rng.uniform(34.0, 38.0, n), rng.uniform(126.0, 129.0, n), rng.integers(DAY, DAY + 90, n))
+    roadkill = roadkill.iloc[rng.permutation(n)].reset_index(drop=True)
+
+    serial_stats, parallel_stats = {}, {}
+    serial = match_by_month(roadkill, stations, weather, operating, workers=1, stats=serial_stats)
+    parallel = match_by_month(roadkill, stations, weather, operating, workers=3, stats=parallel_stats)
+
+    for serial_table, parallel_table in zip(serial, parallel):
+        pd.testing.assert_frame_equal(serial_table, parallel_table)
+    for key in ("nearest", "fallback", "temporal", "unmatched"):
+        assert serial_stats[key] == parallel_stats[key]
+    assert serial_stats["fallback"] > 0 and serial_stats["temporal"] > 0